@@ -0,0 +1,39 @@
+"""coin price candles
+
+Revision ID: coin_candles
+Revises: coin_latest
+Create Date: 2024-03-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'coin_candles'
+down_revision = 'coin_latest'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled from existing history by scripts/backfill_candles.py
+    op.create_table(
+        'coin_candles',
+        sa.Column('coin_id', sa.String(), nullable=False),
+        sa.Column('resolution', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('open', sa.Float(), nullable=True),
+        sa.Column('high', sa.Float(), nullable=True),
+        sa.Column('low', sa.Float(), nullable=True),
+        sa.Column('close', sa.Float(), nullable=True),
+        sa.Column('volume', sa.Float(), nullable=True),
+        sa.Column('market_cap', sa.Float(), nullable=True),
+        sa.Column('open_at', sa.DateTime(), nullable=False),
+        sa.Column('close_at', sa.DateTime(), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('coin_id', 'resolution', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('coin_candles')
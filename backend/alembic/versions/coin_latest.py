@@ -0,0 +1,62 @@
+"""latest snapshot per coin
+
+Revision ID: coin_latest
+Revises: coin_prices_partitioned
+Create Date: 2024-03-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'coin_latest'
+down_revision = 'coin_prices_partitioned'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "coin_id, symbol, name, current_price, market_cap, market_cap_rank, "
+    "total_volume, price_change_24h, price_change_percentage_24h, "
+    "market_dominance, volume_to_market_cap_ratio, last_updated, created_at"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'coin_latest',
+        sa.Column('coin_id', sa.String(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('current_price', sa.Float(), nullable=True),
+        sa.Column('market_cap', sa.Float(), nullable=True),
+        sa.Column('market_cap_rank', sa.Integer(), nullable=True),
+        sa.Column('total_volume', sa.Float(), nullable=True),
+        sa.Column('price_change_24h', sa.Float(), nullable=True),
+        sa.Column('price_change_percentage_24h', sa.Float(), nullable=True),
+        sa.Column('market_dominance', sa.Float(), nullable=True),
+        sa.Column('volume_to_market_cap_ratio', sa.Float(), nullable=True),
+        sa.Column('last_updated', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('coin_id')
+    )
+    op.create_index('idx_coin_latest_rank', 'coin_latest', ['market_cap_rank'])
+
+    # Newest stored snapshot of every coin
+    op.execute(
+        f"""
+        INSERT INTO coin_latest ({COLUMNS})
+        SELECT {COLUMNS} FROM (
+            SELECT {COLUMNS}, ROW_NUMBER() OVER (
+                PARTITION BY coin_id
+                ORDER BY last_updated DESC, created_at DESC
+            ) AS position
+            FROM coin_prices
+        ) ranked
+        WHERE position = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_coin_latest_rank', table_name='coin_latest')
+    op.drop_table('coin_latest')
@@ -0,0 +1,37 @@
+"""coin_prices id of the latest snapshot per coin
+
+Revision ID: coin_latest_price_id
+Revises: coin_candles
+Create Date: 2024-04-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'coin_latest_price_id'
+down_revision = 'coin_candles'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('coin_latest', sa.Column('price_id', sa.Integer(),
+                                           nullable=True))
+
+    # The coin_prices row each coin_latest row was copied from; created_at
+    # limits the lookup to one partition
+    op.execute(
+        """
+        UPDATE coin_latest SET price_id = (
+            SELECT max(p.id) FROM coin_prices p
+            WHERE p.coin_id = coin_latest.coin_id
+              AND p.last_updated = coin_latest.last_updated
+              AND p.created_at = coin_latest.created_at
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('coin_latest', 'price_id')
@@ -0,0 +1,33 @@
+"""unique coin price snapshots
+
+Revision ID: coin_price_snapshot_unique
+Revises: initial_migration
+Create Date: 2024-03-04 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'coin_price_snapshot_unique'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the first stored row of every duplicated snapshot
+    op.execute(
+        """
+        DELETE FROM coin_prices
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM coin_prices GROUP BY coin_id, last_updated
+        )
+        """
+    )
+
+    op.create_unique_constraint(
+        'uq_coin_price_snapshot', 'coin_prices', ['coin_id', 'last_updated'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_coin_price_snapshot', 'coin_prices', type_='unique')
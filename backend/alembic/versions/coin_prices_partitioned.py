@@ -0,0 +1,147 @@
+"""partition coin_prices by created_at
+
+Revision ID: coin_prices_partitioned
+Revises: coin_price_snapshot_unique
+Create Date: 2024-03-11 10:00:00.000000
+
+"""
+import os
+from datetime import datetime, timezone
+
+from alembic import op
+
+from src.database.partitions import (
+    create_partition_sql,
+    next_partition_start,
+    partition_ranges,
+    partition_start,
+)
+
+# revision identifiers, used by Alembic.
+revision = 'coin_prices_partitioned'
+down_revision = 'coin_price_snapshot_unique'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, coin_id, symbol, name, current_price, market_cap, market_cap_rank, "
+    "total_volume, price_change_24h, price_change_percentage_24h, "
+    "market_dominance, volume_to_market_cap_ratio, last_updated, created_at"
+)
+
+COLUMN_DEFINITIONS = """
+    id integer NOT NULL DEFAULT nextval('coin_prices_id_seq'),
+    coin_id varchar NOT NULL,
+    symbol varchar NOT NULL,
+    name varchar NOT NULL,
+    current_price double precision,
+    market_cap double precision,
+    market_cap_rank integer,
+    total_volume double precision,
+    price_change_24h double precision,
+    price_change_percentage_24h double precision,
+    market_dominance double precision,
+    volume_to_market_cap_ratio double precision,
+    last_updated timestamp without time zone NOT NULL,
+    created_at timestamp without time zone NOT NULL
+"""
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_coin_prices_coin_id', 'coin_prices', ['coin_id'])
+    op.create_index('idx_coin_price_date', 'coin_prices',
+                    ['coin_id', 'created_at'])
+    op.create_index('idx_market_cap_rank', 'coin_prices', ['market_cap_rank'])
+    op.create_index('idx_coin_price_snapshot', 'coin_prices',
+                    ['coin_id', 'last_updated'])
+    op.create_index('idx_coin_price_created_at', 'coin_prices',
+                    ['created_at'])
+
+
+def _drop_indexes() -> None:
+    for index in ('ix_coin_prices_coin_id', 'idx_coin_price_date',
+                  'idx_market_cap_rank', 'idx_coin_price_snapshot',
+                  'idx_coin_price_created_at'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def upgrade() -> None:
+    # Partitioning is PostgreSQL only; other databases keep the plain table
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    interval = os.getenv("PARTITION_INTERVAL", "month")
+    precreate = int(os.getenv("PARTITION_PRECREATE", "3"))
+
+    # A unique constraint must include the partition key, so the
+    # (coin_id, last_updated) constraint of coin_price_snapshot_unique
+    # becomes the plain idx_coin_price_snapshot index. The database no longer
+    # rejects duplicate snapshots: inserts take a per-coin advisory lock and
+    # skip them with NOT EXISTS, which only looks SNAPSHOT_MATCH_WINDOW
+    # (services.py) back on created_at, so a snapshot stored again more than
+    # that after its last_updated is kept twice.
+    op.execute("ALTER TABLE coin_prices "
+               "DROP CONSTRAINT IF EXISTS uq_coin_price_snapshot")
+    _drop_indexes()
+    op.execute("ALTER TABLE coin_prices RENAME TO coin_prices_unpartitioned")
+    op.execute("ALTER TABLE coin_prices_unpartitioned "
+               "RENAME CONSTRAINT coin_prices_pkey "
+               "TO coin_prices_unpartitioned_pkey")
+
+    op.execute(
+        f"CREATE TABLE coin_prices ({COLUMN_DEFINITIONS}, "
+        "PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE coin_prices_id_seq OWNED BY coin_prices.id")
+
+    # Partitions for the stored rows up to PARTITION_PRECREATE periods ahead
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    first = bind.exec_driver_sql(
+        "SELECT min(created_at) FROM coin_prices_unpartitioned").scalar()
+    last = partition_start(now, interval)
+    for _ in range(precreate):
+        last = next_partition_start(last, interval)
+    for start, end in partition_ranges(min(first or now, now), last, interval):
+        op.execute(create_partition_sql('coin_prices', start, end, interval))
+
+    op.execute(
+        f"INSERT INTO coin_prices ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM coin_prices_unpartitioned"
+    )
+    op.execute("DROP TABLE coin_prices_unpartitioned")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    _drop_indexes()
+    op.execute("ALTER TABLE coin_prices RENAME TO coin_prices_partitioned")
+    op.execute(
+        f"CREATE TABLE coin_prices ({COLUMN_DEFINITIONS}, "
+        "CONSTRAINT coin_prices_pkey PRIMARY KEY (id))"
+    )
+    op.execute("ALTER SEQUENCE coin_prices_id_seq OWNED BY coin_prices.id")
+    op.execute(
+        f"INSERT INTO coin_prices ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM coin_prices_partitioned"
+    )
+    op.execute("DROP TABLE coin_prices_partitioned")
+
+    op.create_index('ix_coin_prices_coin_id', 'coin_prices', ['coin_id'])
+    op.create_index('idx_coin_price_date', 'coin_prices',
+                    ['coin_id', 'created_at'])
+    op.create_index('idx_market_cap_rank', 'coin_prices', ['market_cap_rank'])
+    op.execute(
+        """
+        DELETE FROM coin_prices
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM coin_prices GROUP BY coin_id, last_updated
+        )
+        """
+    )
+    op.create_unique_constraint(
+        'uq_coin_price_snapshot', 'coin_prices', ['coin_id', 'last_updated'])
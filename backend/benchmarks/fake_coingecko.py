@@ -0,0 +1,192 @@
+"""
+Local stand-in for the CoinGecko API.
+
+Serves deterministic synthetic coins on /coins/markets and /ping with
+configurable latency, error rate and 429 rate, so the service can be tested
+and benchmarked without touching the real API:
+
+    python benchmarks/fake_coingecko.py --port 8001 --latency-ms 50
+    COINGECKO_API_URL=http://localhost:8001 uvicorn src.main:app
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeCoinGeckoConfig:
+    """Behaviour of the fake API."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    total_coins: int = 2500
+    update_interval: int = 60
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> "FakeCoinGeckoConfig":
+        """Read the configuration from FAKE_COINGECKO_* environment variables."""
+        return cls(
+            latency_ms=float(os.getenv("FAKE_COINGECKO_LATENCY_MS", "0")),
+            latency_jitter_ms=float(
+                os.getenv("FAKE_COINGECKO_LATENCY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("FAKE_COINGECKO_ERROR_RATE", "0")),
+            rate_limit_rate=float(
+                os.getenv("FAKE_COINGECKO_RATE_LIMIT_RATE", "0")),
+            retry_after=int(os.getenv("FAKE_COINGECKO_RETRY_AFTER", "1")),
+            total_coins=int(os.getenv("FAKE_COINGECKO_TOTAL_COINS", "2500")),
+            update_interval=int(
+                os.getenv("FAKE_COINGECKO_UPDATE_INTERVAL", "60")),
+            seed=int(os.getenv("FAKE_COINGECKO_SEED", "42")),
+        )
+
+
+def synthetic_coin(
+    rank: int,
+    vs_currency: str,
+    bucket: int,
+    config: FakeCoinGeckoConfig,
+    sparkline: bool = False
+) -> Dict[str, Any]:
+    """
+    Build one deterministic coin for a market cap rank and time bucket.
+
+    Values only change when ``bucket`` changes, mimicking CoinGecko's update
+    interval, so repeated calls within one interval return identical data.
+    """
+    rng = random.Random(f"{config.seed}:{vs_currency}:{rank}:{bucket}")
+    base_price = 50000.0 / rank ** 1.2
+    current_price = round(base_price * rng.uniform(0.95, 1.05), 8)
+    supply = 2e7 * rank ** 0.3
+    market_cap = round(current_price * supply, 2)
+    change_pct = round(rng.uniform(-10, 10), 4)
+    updated_at = datetime.fromtimestamp(
+        bucket * config.update_interval, timezone.utc)
+
+    coin = {
+        "id": f"coin-{rank}",
+        "symbol": f"c{rank}",
+        "name": f"Coin {rank}",
+        "image": f"https://example.com/coin-{rank}.png",
+        "current_price": current_price,
+        "market_cap": market_cap,
+        "market_cap_rank": rank,
+        "fully_diluted_valuation": None,
+        "total_volume": round(market_cap * rng.uniform(0.01, 0.3), 2),
+        "high_24h": round(current_price * 1.05, 8),
+        "low_24h": round(current_price * 0.95, 8),
+        "price_change_24h": round(current_price * change_pct / 100, 8),
+        "price_change_percentage_24h": change_pct,
+        "circulating_supply": supply,
+        "last_updated": updated_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+    }
+    if sparkline:
+        coin["sparkline_in_7d"] = {
+            "price": [
+                round(current_price * (1 + 0.02 * math.sin(i / 6)), 8)
+                for i in range(168)
+            ]
+        }
+    return coin
+
+
+def create_app(config: FakeCoinGeckoConfig = None) -> FastAPI:
+    """Create the fake CoinGecko application."""
+    config = config or FakeCoinGeckoConfig.from_env()
+    app = FastAPI(title="Fake CoinGecko")
+    app.state.config = config
+    app.state.requests = 0
+    failure_rng = random.Random(config.seed)
+
+    async def _simulate() -> Optional[JSONResponse]:
+        app.state.requests += 1
+        delay = config.latency_ms + failure_rng.uniform(
+            0, config.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = failure_rng.random()
+        if roll < config.rate_limit_rate:
+            return JSONResponse(
+                status_code=429,
+                content={"status": {"error_code": 429,
+                                    "error_message": "Rate limit exceeded"}},
+                headers={"Retry-After": str(config.retry_after)}
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            return JSONResponse(status_code=500,
+                                content={"error": "Internal server error"})
+        return None
+
+    @app.get("/ping")
+    async def ping():
+        failure = await _simulate()
+        if failure is not None:
+            return failure
+        return {"gecko_says": "(V3) To the Moon!"}
+
+    @app.get("/coins/markets")
+    async def markets(
+        vs_currency: str = "usd",
+        page: int = Query(1, ge=1),
+        per_page: int = Query(100, ge=1, le=250),
+        sparkline: bool = False,
+        order: str = "market_cap_desc"
+    ):
+        failure = await _simulate()
+        if failure is not None:
+            return failure
+        bucket = int(time.time()) // config.update_interval
+        first = (page - 1) * per_page + 1
+        last = min(first + per_page - 1, config.total_coins)
+        return [
+            synthetic_coin(rank, vs_currency.lower(), bucket, config, sparkline)
+            for rank in range(first, last + 1)
+        ]
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--total-coins", type=int, default=2500)
+    parser.add_argument("--update-interval", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeCoinGeckoConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        total_coins=args.total_coins,
+        update_interval=args.update_interval,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+End-to-end load benchmark for the CoinGecko API Service.
+
+Drives /coingecko/markets, /coingecko/stored-data and the /db/coins CRUD routes
+of a running service at a target concurrency and reports throughput and
+p50/p95/p99 latency per scenario. Point the service at the local stand-in
+(benchmarks/fake_coingecko.py) to avoid touching the real CoinGecko API:
+
+    python benchmarks/fake_coingecko.py --port 8001 --latency-ms 80 &
+    COINGECKO_API_URL=http://localhost:8001 uvicorn src.main:app --port 8000 &
+    python benchmarks/load_test.py --base-url http://localhost:8000 \\
+        --concurrency 50 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+Scenario = Callable[[httpx.AsyncClient], Awaitable[List[tuple]]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def _timed(
+    client: httpx.AsyncClient,
+    name: str,
+    method: str,
+    url: str,
+    **kwargs: Any
+) -> tuple:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    return name, time.perf_counter() - start, ok
+
+
+async def markets(client: httpx.AsyncClient) -> List[tuple]:
+    page = random.choice([1, 1, 1, 2, 3])
+    return [await _timed(client, "GET /coingecko/markets", "GET",
+                         "/coingecko/markets",
+                         params={"vs_currency": "usd", "page": page})]
+
+
+async def stored_data(client: httpx.AsyncClient) -> List[tuple]:
+    return [await _timed(client, "GET /coingecko/stored-data", "GET",
+                         "/coingecko/stored-data")]
+
+
+async def crud(client: httpx.AsyncClient) -> List[tuple]:
+    coin_id = f"bench-{uuid.uuid4().hex[:12]}"
+    record = {
+        "coin_id": coin_id,
+        "symbol": "BNCH",
+        "name": "Benchmark Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": datetime.now(timezone.utc).isoformat(),
+    }
+    return [
+        await _timed(client, "POST /db/coins", "POST", "/db/coins",
+                     json=record),
+        await _timed(client, "GET /db/coins/{id}", "GET",
+                     f"/db/coins/{coin_id}"),
+        await _timed(client, "PUT /db/coins/{id}", "PUT",
+                     f"/db/coins/{coin_id}", json={"current_price": 101.0}),
+        await _timed(client, "DELETE /db/coins/{id}", "DELETE",
+                     f"/db/coins/{coin_id}"),
+    ]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "markets": markets,
+    "stored-data": stored_data,
+    "crud": crud,
+}
+
+
+async def run(
+    base_url: str,
+    scenarios: List[str],
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> Dict[str, Any]:
+    """
+    Run the selected scenarios with ``concurrency`` workers for ``duration``.
+
+    Returns:
+        Dict with per-endpoint request counts, error counts, throughput and
+        latency percentiles in milliseconds
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency,
+                          max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                                 timeout=60.0) as client:
+        warmup_end = time.perf_counter() + warmup
+        while time.perf_counter() < warmup_end:
+            for name in scenarios:
+                await SCENARIOS[name](client)
+
+        stop_at = time.perf_counter() + duration
+
+        async def worker(worker_id: int):
+            while time.perf_counter() < stop_at:
+                scenario = SCENARIOS[scenarios[worker_id % len(scenarios)]]
+                for name, elapsed, ok in await scenario(client):
+                    latencies[name].append(elapsed)
+                    if not ok:
+                        errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        report[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = (f"{'endpoint':<26}{'requests':>10}{'errors':>8}{'req/s':>10}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for name, row in report.items():
+        print(f"{name:<26}{row['requests']:>10}{row['errors']:>8}"
+              f"{row['throughput_rps']:>10}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenarios", default="markets,stored-data,crud",
+                        help="Comma-separated: " + ",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0,
+                        help="Unmeasured seconds before the run")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the report as JSON")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args.base_url, scenarios, args.concurrency,
+                             args.duration, args.warmup))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Startup time benchmark for the CoinGecko API Service.
+
+Starts a fresh interpreter per run and measures how long ``import src.main``
+takes and the time to first request: import, application startup (lifespan)
+and one GET /health through the ASGI app. Also lists heavy modules (Polars,
+database drivers) that were loaded by then; importing and starting the app
+should load none of them, nor connect to a database:
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependency -> module that only exists once it was really imported
+# (Polars is imported lazily, so the package itself is registered early)
+HEAVY_MODULES = {
+    "polars": "polars.dataframe",
+    "pyarrow": "pyarrow.lib",
+    "asyncpg": "asyncpg",
+    "aiosqlite": "aiosqlite",
+    "psycopg2": "psycopg2",
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(src.main.app) as client:
+    status = client.get("/health").status_code
+    first_request = time.perf_counter()
+heavy = json.loads(sys.argv[1])
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (first_request - start) * 1000,
+    "status": status,
+    "heavy_modules": sorted(
+        name for name, module in heavy.items() if module in sys.modules),
+}))
+"""
+
+# Background work that would touch the network or the database at startup
+PROBE_ENV = {
+    "INGESTION_ENABLED": "false",
+    "HEALTH_PROBE_ENABLED": "false",
+    "PARTITION_MAINTENANCE_ENABLED": "false",
+    "DB_CREATE_ON_STARTUP": "false",
+}
+
+
+def measure_startup() -> Dict[str, Any]:
+    """Import and start the app once in a fresh interpreter."""
+    env = {**PROBE_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median/min/max of each timing and the heavy modules seen."""
+    report: Dict[str, Any] = {"runs": len(runs)}
+    for key in ("import_ms", "first_request_ms"):
+        values = [run[key] for run in runs]
+        report[key] = {
+            "median": round(statistics.median(values), 1),
+            "min": round(min(values), 1),
+            "max": round(max(values), 1),
+        }
+    report["heavy_modules"] = sorted(
+        {name for run in runs for name in run["heavy_modules"]})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true",
+                        help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarize([measure_startup() for _ in range(args.runs)])
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'metric':<18}{'median':>10}{'min':>10}{'max':>10}")
+    for key in ("import_ms", "first_request_ms"):
+        row = report[key]
+        print(f"{key:<18}{row['median']:>10}{row['min']:>10}{row['max']:>10}")
+    print(f"heavy modules loaded: {', '.join(report['heavy_modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
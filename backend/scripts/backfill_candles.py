@@ -0,0 +1,45 @@
+import path_setup
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from src.database.services import CoinPriceService
+from src.database.session import dispose_engines, get_async_session_factory
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_candles(coin_id=None, since=None):
+    """Rebuild coin_candles from the stored coin_prices history."""
+    try:
+        async with get_async_session_factory()() as db:
+            read = await CoinPriceService.rebuild_candles(
+                db, coin_id=coin_id, since=since)
+            await db.commit()
+    finally:
+        await dispose_engines()
+    return read
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild coin_candles from coin_prices")
+    parser.add_argument("--coin-id", help="Only rebuild this coin")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="Only rebuild from this UTC day on, "
+                             "e.g. 2024-02-01")
+    args = parser.parse_args()
+
+    try:
+        read = asyncio.run(backfill_candles(args.coin_id, args.since))
+        logger.info(f"Rebuilt candles from {read} coin_prices rows")
+    except Exception as e:
+        logger.error(f"Error backfilling candles: {e}")
+        sys.exit(1)
@@ -4,7 +4,6 @@ import logging
 import sys
 from alembic.config import Config
 from alembic import command
-from src.database.session import engine
 from src.database.models import Base
 from src.database.create_db import create_database
 
@@ -1,23 +1,51 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-import os
+import time
+from typing import Hashable, Literal
+
 import httpx
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response
 from src.models import BaseResponse
 from src.models import (
     CoinMarketData,
-    MarketDataRequest,
     MarketDataResponse,
+    MarketUniverseResponse,
     ErrorResponse
 )
 from src.reporting.coingecko_reporter import ReporterSingleton
-from src.transformers.market_data import MarketDataTransformer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.replicas import get_read_db, reads_own_writes
 from src.database.session import get_db
 from src.database.services import CoinPriceService
-from datetime import datetime
-import time
+from src.core.config import get_settings
+from src.core.circuit_breaker import CircuitOpenError
+from src.core.rate_limiter import RateLimitExceeded
+from src.core.health import STATUS_UP, coingecko_health
+from src.core.cache import (
+    CACHE_FALLBACK,
+    CACHE_MISS,
+    CACHE_STALE,
+    market_data_cache,
+)
+from src.core.conditional import (
+    STORED_DATA_KEY,
+    Validators,
+    cache_control,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    payload_etag,
+    validator_cache,
+)
+from src.transformers.export import encode_frames, export_response
+from src.transformers.market_data import COIN_PRICE_COLUMNS, coin_price_schema
+from src.ingestion.market_data import (
+    fetch_market_data,
+    fetch_market_universe,
+    refresh_market_data,
+)
 
 # Create router with prefix and tags
 coingecko_route = APIRouter(
@@ -25,8 +53,174 @@ coingecko_route = APIRouter(
     tags=["CoinGecko Operations"],
 )
 
-# Constants
-COINGECKO_API_URL = os.getenv("COINGECKO_API_URL")
+settings = get_settings()
+
+
+def _upstream_error(e: Exception, details: dict) -> HTTPException:
+    """
+    Report an error raised while loading market data and map it to a response.
+
+    Rate limiting and upstream failures become 503 (with Retry-After when
+    known); anything else becomes 500.
+    """
+    reporter = ReporterSingleton().get_instance()
+
+    if isinstance(e, CircuitOpenError):
+        reporter.on_error(
+            "CoinGecko circuit breaker is open",
+            cause=e,
+            stack=None,
+            details=details
+        )
+        return HTTPException(
+            status_code=503,
+            detail=ErrorResponse(
+                message="CoinGecko API is temporarily unavailable",
+                details={"error": str(e)}
+            ).model_dump(),
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
+
+    if isinstance(e, RateLimitExceeded):
+        reporter.on_error(
+            "CoinGecko rate limit exceeded",
+            cause=e,
+            stack=None,
+            details=details
+        )
+        return HTTPException(
+            status_code=503,
+            detail=ErrorResponse(
+                message="CoinGecko API rate limit exceeded",
+                details={"error": str(e)}
+            ).model_dump(),
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
+
+    if isinstance(e, httpx.HTTPError):
+        reporter.on_error(
+            "Error fetching market data from CoinGecko",
+            cause=e,
+            stack=None,
+            details=details
+        )
+        headers = None
+        if (isinstance(e, httpx.HTTPStatusError)
+                and e.response.status_code == 429):
+            headers = {
+                "Retry-After": e.response.headers.get("Retry-After", "60")}
+        return HTTPException(
+            status_code=503,
+            detail=ErrorResponse(
+                message="CoinGecko API service unavailable",
+                details={"error": str(e)}
+            ).model_dump(),
+            headers=headers
+        )
+
+    reporter.on_error(
+        "Unexpected error fetching market data",
+        cause=e,
+        stack=None,
+        details=details
+    )
+    return HTTPException(
+        status_code=500,
+        detail=ErrorResponse(
+            message="Internal server error",
+            details={"error": str(e)}
+        ).model_dump()
+    )
+
+
+def _market_response(
+    request: Request,
+    cache_key: Hashable,
+    payload: bytes,
+    cache_state: str
+) -> Response:
+    """
+    Respond with a market data payload, or 304 if the client has it.
+
+    The ETag is a hash of the cached payload, so a polling client whose copy
+    is current gets a 304 without the data being fetched or transformed
+    again. Clients and CDNs may reuse the payload until its cache entry goes
+    stale, and for MARKET_CACHE_STALE_TTL more seconds while revalidating.
+    """
+    max_age, stale = 0.0, 0.0
+    if settings.MARKET_CACHE_ENABLED:
+        entry = market_data_cache.get_entry(cache_key)
+        if entry is not None:
+            max_age = entry.fresh_until - time.monotonic()
+        stale = settings.MARKET_CACHE_STALE_TTL
+    validators = Validators(
+        etag=payload_etag(payload),
+        cache_control=cache_control(max_age, stale)
+    )
+    if is_not_modified(request, validators):
+        response = not_modified(validators)
+        response.headers["X-Cache"] = cache_state
+        return response
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={"X-Cache": cache_state, **validators.headers()}
+    )
+
+
+async def _stored_market_data(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    db: AsyncSession,
+    error: CircuitOpenError
+) -> Response:
+    """
+    Answer from the most recent stored rows while the circuit is open.
+
+    Stored rows carry no currency, so this is only done for
+    STORED_DATA_CURRENCY; other currencies get the 503.
+    """
+    details = {"vs_currency": vs_currency, "page": page}
+    if vs_currency != settings.STORED_DATA_CURRENCY:
+        raise _upstream_error(error, details=details)
+
+    rows = await CoinPriceService.get_latest_snapshot(
+        db, limit=per_page, offset=(page - 1) * per_page)
+    if not rows:
+        raise _upstream_error(error, details=details)
+
+    payload = MarketDataResponse(
+        data=[
+            CoinMarketData(
+                id=row.coin_id,
+                symbol=row.symbol,
+                name=row.name,
+                current_price=row.current_price,
+                market_cap=row.market_cap,
+                market_cap_rank=row.market_cap_rank,
+                total_volume=row.total_volume,
+                price_change_24h=row.price_change_24h,
+                price_change_percentage_24h=row.price_change_percentage_24h,
+                last_updated=row.last_updated.isoformat()
+            )
+            for row in rows
+        ],
+        total_count=len(rows),
+        page=page,
+        per_page=per_page,
+        stale=True,
+        as_of=max(row.created_at for row in rows).isoformat()
+    ).model_dump_json()
+
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={
+            "X-Cache": CACHE_FALLBACK,
+            "Retry-After": str(max(int(error.retry_after), 1))
+        }
+    )
 
 
 @coingecko_route.get(
@@ -39,15 +233,25 @@ COINGECKO_API_URL = os.getenv("COINGECKO_API_URL")
     }
 )
 async def get_market_data(
+    request: Request,
     vs_currency: str = "usd",
     page: int = 1,
     per_page: int = 100,
     sparkline: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current cryptocurrency market data from CoinGecko.
 
+    Responses are cached per (vs_currency, page, per_page, sparkline) for
+    MARKET_CACHE_TTL seconds; entries within MARKET_CACHE_STALE_TTL after
+    that are served stale while being refreshed in the background. The
+    X-Cache response header reports HIT, STALE or MISS. Responses carry an
+    ETag and a 304 is returned when If-None-Match matches it.
+
+    While the CoinGecko circuit breaker is open, the latest stored record of
+    each coin is returned immediately with stale=true and X-Cache: FALLBACK.
+
     Args:
         vs_currency: The target currency (e.g., usd, eur)
         page: Page number for pagination
@@ -57,93 +261,89 @@ async def get_market_data(
     Returns:
         MarketDataResponse: List of cryptocurrency market data
     """
-    reporter = ReporterSingleton().get_instance()
-    start_time = time.time()
+    vs_currency = vs_currency.lower()
+    cache_key = (vs_currency, page, per_page, sparkline)
+
+    if settings.MARKET_CACHE_ENABLED:
+        payload, cache_state = market_data_cache.get(cache_key)
+        if cache_state == CACHE_STALE:
+            market_data_cache.refresh(
+                cache_key,
+                lambda: refresh_market_data(*cache_key),
+                store=False
+            )
+        if payload is not None:
+            return _market_response(request, cache_key, payload, cache_state)
 
     try:
-        # Log the request
-        reporter.on_request(
-            endpoint="/coins/markets",
-            params={"vs_currency": vs_currency,
-                    "page": page, "per_page": per_page}
-        )
+        payload = await fetch_market_data(
+            vs_currency, page, per_page, sparkline)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{COINGECKO_API_URL}/coins/markets",
-                params={
-                    "vs_currency": vs_currency,
-                    "per_page": per_page,
-                    "page": page,
-                    "sparkline": sparkline,
-                    "order": "market_cap_desc"
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            raw_data = response.json()
-
-            # Transform data using Polars
-            transformer = MarketDataTransformer()
-            df = transformer.transform_market_data(raw_data)
-
-            market_data = [
-                CoinMarketData(**record)
-                for record in df.to_dicts()
-            ]
-            
-            # store the data
-            try:
-                await CoinPriceService.create_coin_prices(db, raw_data)
-            except Exception as e:
-                reporter.on_error(
-                    "Error storing market data in database",
-                    cause=e,
-                    stack=None
-                )
-            
-            # Log the response
-            reporter.on_response(
-                endpoint="/coins/markets",
-                status_code=response.status_code,
-                response_time=time.time() - start_time
-            )
+    except CircuitOpenError as e:
+        return await _stored_market_data(vs_currency, page, per_page, db, e)
+
+    except Exception as e:
+        raise _upstream_error(
+            e, details={"vs_currency": vs_currency, "page": page})
+
+    return _market_response(request, cache_key, payload, CACHE_MISS)
+
+
+@coingecko_route.get(
+    "/markets/universe",
+    summary="Get market data for the top coins across several pages",
+    response_model=MarketUniverseResponse,
+    responses={
+        503: {"model": ErrorResponse},
+        500: {"model": ErrorResponse}
+    }
+)
+async def get_market_universe(
+    request: Request,
+    vs_currency: str = "usd",
+    pages: int = Query(4, ge=1, le=settings.FANOUT_MAX_PAGES),
+    per_page: int = Query(250, ge=1, le=250),
+    on_page_error: Literal["retry", "partial"] = "retry"
+):
+    """
+    Get the top pages x per_page coins with metrics over the whole set.
+
+    Pages 1..pages are fetched concurrently (at most FANOUT_CONCURRENCY at a
+    time) and market dominance and volume/market cap ratios are computed over
+    all returned coins rather than per page.
 
-            return MarketDataResponse(
-                data=market_data,
-                total_count=len(market_data),
-                page=page,
-                per_page=per_page
+    Args:
+        vs_currency: The target currency (e.g., usd, eur)
+        pages: Number of pages to fetch, starting at page 1
+        per_page: Number of results per page
+        on_page_error: "retry" to retry failed pages once and fail if they
+            still fail, "partial" to return the pages that succeeded
+
+    Returns:
+        MarketUniverseResponse: Coins of all fetched pages with their metrics
+    """
+    vs_currency = vs_currency.lower()
+    cache_key = ("universe", vs_currency, pages, per_page, on_page_error)
+
+    if settings.MARKET_CACHE_ENABLED:
+        payload, cache_state = market_data_cache.get(cache_key)
+        if cache_state == CACHE_STALE:
+            market_data_cache.refresh(
+                cache_key,
+                lambda: fetch_market_universe(*cache_key[1:]),
+                store=False
             )
+        if payload is not None:
+            return _market_response(request, cache_key, payload, cache_state)
 
-    except httpx.HTTPError as e:
-        reporter.on_error(
-            "Error fetching market data from CoinGecko",
-            cause=e,
-            stack=None,
-            details={"vs_currency": vs_currency, "page": page}
-        )
-        raise HTTPException(
-            status_code=503,
-            detail=ErrorResponse(
-                message="CoinGecko API service unavailable",
-                details={"error": str(e)}
-            ).model_dump()
-        )
+    try:
+        payload = await fetch_market_universe(
+            vs_currency, pages, per_page, on_page_error)
     except Exception as e:
-        reporter.on_error(
-            "Unexpected error fetching market data",
-            cause=e,
-            stack=None,
-            details={"vs_currency": vs_currency, "page": page}
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=ErrorResponse(
-                message="Internal server error",
-                details={"error": str(e)}
-            ).model_dump()
-        )
+        raise _upstream_error(
+            e, details={"vs_currency": vs_currency, "pages": pages})
+
+    return _market_response(request, cache_key, payload, CACHE_MISS)
 
 
 @coingecko_route.get(
@@ -153,36 +353,88 @@ async def get_market_data(
     responses={503: {"model": ErrorResponse}}
 )
 async def check_api_status():
-    """Check if the CoinGecko API is operational."""
+    """
+    Check if the CoinGecko API is operational.
+
+    Answers from the result of the background health probe; upstream is only
+    called when that result is older than HEALTH_PROBE_MAX_AGE.
+    """
     reporter = ReporterSingleton().get_instance()
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{COINGECKO_API_URL}/ping")
-            response.raise_for_status()
-            return BaseResponse(status="CoinGecko API is operational")
+    if await coingecko_health.ensure_fresh() == STATUS_UP:
+        return BaseResponse(status="CoinGecko API is operational")
 
-    except Exception as e:
-        reporter.on_error(
-            "Error checking CoinGecko API status",
-            cause=e,
-            stack=None
-        )
-        raise HTTPException(
-            status_code=503,
-            detail=ErrorResponse(
-                message="CoinGecko API is not available",
-                details={"error": str(e)}
-            ).model_dump()
-        )
+    health = coingecko_health.get_status()
+    reporter.on_error(
+        "Error checking CoinGecko API status",
+        stack=None,
+        details=health
+    )
+    raise HTTPException(
+        status_code=503,
+        detail=ErrorResponse(
+            message="CoinGecko API is not available",
+            details={
+                "error": health["last_error"],
+                "last_checked_at": health["last_checked_at"],
+                "last_success_at": health["last_success_at"],
+            }
+        ).model_dump()
+    )
 
 
 @coingecko_route.get("/stored-data")
-async def get_stored_data(db: Session = Depends(get_db)):
-    """Get the latest stored cryptocurrency data"""
-    latest_prices = await CoinPriceService.get_latest_prices(db, limit=10)
+async def get_stored_data(
+    request: Request,
+    response: Response,
+    format: Literal["json", "ndjson", "csv"] = "json",
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the latest stored cryptocurrency data.
+
+    The JSON response holds the first 10 coins. With format=ndjson or csv
+    every coin of the latest snapshot is streamed, read through a
+    server-side cursor, so memory use does not grow with the row count.
+    """
+    if format != "json":
+        chunks = encode_frames(
+            CoinPriceService.stream_latest_snapshot(db),
+            format,
+            coin_price_schema()
+        )
+        return export_response(chunks, format, "stored_data", db.close)
+
+    cache_key = STORED_DATA_KEY
+    if not reads_own_writes(request):
+        cached = validator_cache.check(request, cache_key)
+        if cached is not None:
+            return cached
+
+    generation = validator_cache.generation
+    latest_prices = await CoinPriceService.get_latest_snapshot(db, limit=10)
+    validators = Validators(
+        etag=make_etag(cache_key, [
+            (price.price_id,) + tuple(
+                getattr(price, column) for column in COIN_PRICE_COLUMNS)
+            for price in latest_prices
+        ]),
+        cache_control=cache_control(settings.HTTP_CACHE_MAX_AGE),
+        last_modified=(
+            max(price.created_at for price in latest_prices)
+            if latest_prices else None
+        )
+    )
+    validator_cache.remember(cache_key, validators, generation)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    response.headers.update(validators.headers())
     return {
         "count": len(latest_prices),
-        "latest_update": latest_prices[0].created_at if latest_prices else None,
+        "latest_update": (
+            max(price.created_at for price in latest_prices)
+            if latest_prices else None
+        ),
         "data": [price.to_dict() for price in latest_prices]
     }
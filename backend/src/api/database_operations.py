@@ -1,10 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict
+from datetime import datetime
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
 
+from src.database.replicas import get_read_db, reads_own_writes
 from src.database.session import get_db
-from src.database.models import CoinPrice
-from src.schemas import CoinPriceCreate, CoinPriceUpdate
+from src.database.models import CoinPrice, to_naive_utc
+from src.database.pagination import decode_cursor, encode_cursor
+from src.database.services import (
+    HISTORY_FIELDS,
+    CoinPriceService,
+    history_schema,
+)
+from src.core.conditional import (
+    Validators,
+    cache_control,
+    coin_key,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    validator_cache,
+)
+from src.core.config import get_settings
+from src.schemas import CoinPriceBatchUpdate, CoinPriceCreate, CoinPriceUpdate
+from src.transformers.export import (
+    ARROW_FORMATS,
+    EXPORT_FORMATS,
+    encode_frames,
+    export_response,
+    pyarrow_available,
+)
+from src.transformers.market_data import CANDLE_INTERVALS, COIN_PRICE_COLUMNS
+
+settings = get_settings()
 
 database_route = APIRouter(
     prefix="/db",
@@ -12,10 +49,22 @@ database_route = APIRouter(
 )
 
 @database_route.post("/coins")
-def create_coin_price(
+async def create_coin_price(
     coin_data: CoinPriceCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    existing = await db.execute(
+        select(CoinPrice.id).where(
+            CoinPrice.coin_id == coin_data.coin_id,
+            CoinPrice.last_updated == coin_data.last_updated
+        ).limit(1)
+    )
+    if existing.first() is not None:
+        raise HTTPException(
+            status_code=409,
+            detail="A record for this coin and last_updated already exists"
+        )
+
     db_coin = CoinPrice(
         coin_id=coin_data.coin_id,
         symbol=coin_data.symbol,
@@ -31,41 +80,261 @@ def create_coin_price(
         last_updated=coin_data.last_updated
     )
     db.add(db_coin)
-    db.commit()
-    db.refresh(db_coin)
+    await db.flush()
+    await CoinPriceService.update_rollups(
+        db, CoinPriceService.price_rows([db_coin]))
+    await db.commit()
+    validator_cache.forget_coins([db_coin.coin_id])
+    await db.refresh(db_coin)
     return {"message": "Record created successfully", "data": db_coin.to_dict()}
 
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """HISTORY_FIELDS named in a comma-separated parameter (default: all)."""
+    if not fields:
+        return HISTORY_FIELDS
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(selected) - set(HISTORY_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return selected
+
+def check_batch_size(items: list) -> None:
+    """Reject batches larger than DB_BATCH_MAX_SIZE."""
+    if len(items) > settings.DB_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} items exceeds the limit of "
+                   f"{settings.DB_BATCH_MAX_SIZE}"
+        )
+
+# Batch routes are declared before /coins/{coin_id}, which would match them
+@database_route.post("/coins/batch")
+async def create_coin_prices_batch(
+    items: List[CoinPriceCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many records in one transaction, with a result per item"""
+    check_batch_size(items)
+    created = await CoinPriceService.batch_create_coin_prices(
+        db, [item.model_dump() for item in items])
+    results = [
+        {"index": index, "status": "created", "data": price.to_dict()}
+        if price is not None else
+        {"index": index, "status": "conflict",
+         "detail": "A record for this coin and last_updated already exists"}
+        for index, price in enumerate(created)
+    ]
+    return {
+        "message": "Batch processed",
+        "created": sum(price is not None for price in created),
+        "results": results
+    }
+
+@database_route.put("/coins/batch")
+async def update_coin_prices_batch(
+    items: List[CoinPriceBatchUpdate],
+    db: AsyncSession = Depends(get_db)
+):
+    """Update many records by id in one transaction, with a result per item"""
+    check_batch_size(items)
+    changes, first_index = {}, {}
+    for index, item in enumerate(items):
+        if item.id not in first_index:
+            first_index[item.id] = index
+            changes[item.id] = item.model_dump(
+                exclude_unset=True, exclude={"id"})
+
+    updated = await CoinPriceService.batch_update_coin_prices(db, changes)
+    results = []
+    for index, item in enumerate(items):
+        if first_index[item.id] != index:
+            results.append({"index": index, "status": "duplicate",
+                            "detail": "Record id repeated in the batch"})
+        elif item.id in updated:
+            results.append({"index": index, "status": "updated",
+                            "data": updated[item.id].to_dict()})
+        else:
+            results.append({"index": index, "status": "not_found",
+                            "detail": "Record not found"})
+    return {
+        "message": "Batch processed",
+        "updated": len(updated),
+        "results": results
+    }
+
+@database_route.delete("/coins/batch")
+async def delete_coin_prices_batch(
+    ids: List[int] = Body(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete many records by id in one transaction, with a result per id"""
+    check_batch_size(ids)
+    deleted = await CoinPriceService.batch_delete_coin_prices(
+        db, list(dict.fromkeys(ids)))
+    results = [
+        {"index": index, "id": row_id,
+         "status": "deleted" if row_id in deleted else "not_found"}
+        for index, row_id in enumerate(ids)
+    ]
+    return {
+        "message": "Batch processed",
+        "deleted": len(deleted),
+        "results": results
+    }
+
 @database_route.get("/coins/{coin_id}")
-def read_coin_price(coin_id: str, db: Session = Depends(get_db)):
-    db_coin = db.query(CoinPrice).filter(CoinPrice.coin_id == coin_id).first()
+async def read_coin_price(
+    coin_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    cache_key = coin_key(coin_id)
+    if not reads_own_writes(request):
+        cached = validator_cache.check(request, cache_key)
+        if cached is not None:
+            return cached
+
+    generation = validator_cache.generation
+    db_coin = await CoinPriceService.get_coin_latest(db, coin_id)
     if db_coin is None:
         raise HTTPException(status_code=404, detail="Coin not found")
+
+    validators = Validators(
+        etag=make_etag(cache_key, db_coin.price_id, tuple(
+            getattr(db_coin, column) for column in COIN_PRICE_COLUMNS)),
+        cache_control=cache_control(settings.HTTP_CACHE_MAX_AGE),
+        last_modified=db_coin.created_at
+    )
+    validator_cache.remember(cache_key, validators, generation)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    response.headers.update(validators.headers())
     return db_coin.to_dict()
 
 @database_route.put("/coins/{coin_id}")
-def update_coin_price(
+async def update_coin_price(
     coin_id: str,
     coin_data: CoinPriceUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_coin = db.query(CoinPrice).filter(CoinPrice.coin_id == coin_id).first()
+    db_coin = await CoinPriceService.get_newest_price(db, coin_id)
     if db_coin is None:
         raise HTTPException(status_code=404, detail="Coin not found")
     
+    since = db_coin.last_updated
     update_data = coin_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_coin, key, value)
+    if update_data.get("last_updated") is not None:
+        since = min(since, to_naive_utc(update_data["last_updated"]))
     
-    db.commit()
-    db.refresh(db_coin)
+    await db.flush()
+    await CoinPriceService.sync_coin_latest(db, coin_id)
+    await CoinPriceService.rebuild_candles(db, coin_id, since=since)
+    await db.commit()
+    validator_cache.forget_coins([coin_id])
+    await db.refresh(db_coin)
     return {"message": "Record updated successfully", "data": db_coin.to_dict()}
 
 @database_route.delete("/coins/{coin_id}")
-def delete_coin_price(coin_id: str, db: Session = Depends(get_db)):
-    db_coin = db.query(CoinPrice).filter(CoinPrice.coin_id == coin_id).first()
+async def delete_coin_price(coin_id: str, db: AsyncSession = Depends(get_db)):
+    db_coin = await CoinPriceService.get_newest_price(db, coin_id)
     if db_coin is None:
         raise HTTPException(status_code=404, detail="Coin not found")
     
-    db.delete(db_coin)
-    db.commit()
+    await db.delete(db_coin)
+    await db.flush()
+    await CoinPriceService.sync_coin_latest(db, coin_id)
+    await CoinPriceService.rebuild_candles(
+        db, coin_id, since=db_coin.last_updated)
+    await db.commit()
+    validator_cache.forget_coins([coin_id])
     return {"message": "Record deleted successfully"}
+
+@database_route.get("/coins/{coin_id}/candles")
+async def read_coin_candles(
+    coin_id: str,
+    interval: str = Query("1h", pattern=f"^({'|'.join(CANDLE_INTERVALS)})$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get OHLC candles of a coin from the coin_candles rollups"""
+    candles = await CoinPriceService.get_candles(
+        db, coin_id, interval, start=start, end=end, limit=limit)
+    return {
+        "coin_id": coin_id,
+        "interval": interval,
+        "count": len(candles),
+        "data": [candle.to_dict() for candle in candles]
+    }
+
+@database_route.get("/coins/{coin_id}/history")
+async def read_coin_history(
+    coin_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns (default: all)"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a coin's stored snapshots by created_at, keyset paginated"""
+    selected = parse_fields(fields)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = await CoinPriceService.get_price_history(
+        db, coin_id, selected, start=start, end=end, after=after,
+        limit=limit + 1, descending=order == "desc")
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+    return {
+        "coin_id": coin_id,
+        "count": len(page),
+        "next_cursor": next_cursor,
+        "data": page
+    }
+
+@database_route.get("/export")
+async def export_coin_prices(
+    format: str = Query("parquet", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    coin_ids: Optional[str] = Query(
+        None, description="Comma-separated coins (default: all)"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns (default: all)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stream stored snapshots as Arrow IPC, Parquet, NDJSON or CSV"""
+    if format in ARROW_FORMATS and not pyarrow_available():
+        raise HTTPException(
+            status_code=501,
+            detail=f"{format} export needs pyarrow (install the 'export' extra)"
+        )
+    selected = parse_fields(fields)
+    coins = None
+    if coin_ids:
+        coins = [coin.strip() for coin in coin_ids.split(",") if coin.strip()]
+
+    chunks = encode_frames(
+        CoinPriceService.iter_price_frames(
+            db, selected, coin_ids=coins, start=start, end=end),
+        format,
+        history_schema(selected)
+    )
+    return export_response(chunks, format, "coin_prices", db.close)
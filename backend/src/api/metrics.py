@@ -0,0 +1,116 @@
+from fastapi import APIRouter
+
+from src.core.cache import market_data_cache
+from src.core.coalescing import market_data_flight
+from src.core.http_client import http_client_manager
+from src.core.upstream import coingecko_circuit_breaker, coingecko_client
+from src.database.dedup import coin_price_snapshots
+from src.database.partitions import partition_maintenance
+from src.database.pool import db_pool_monitor
+from src.database.replicas import replica_router
+from src.ingestion.market_data import coin_price_writer
+from src.ingestion.scheduler import ingestion_scheduler
+
+metrics_route = APIRouter(
+    prefix="/metrics",
+    tags=["Monitoring"]
+)
+
+
+@metrics_route.get(
+    "/http-client",
+    summary="Upstream HTTP client pool statistics",
+)
+async def get_http_client_stats():
+    """Get connection pool state and request counters of the shared client."""
+    return http_client_manager.get_stats()
+
+
+@metrics_route.get(
+    "/cache",
+    summary="Market data cache statistics",
+)
+async def get_cache_stats():
+    """Get size and hit/miss counters of the market data response cache."""
+    return market_data_cache.get_stats()
+
+
+@metrics_route.get(
+    "/coalescing",
+    summary="Upstream request coalescing statistics",
+)
+async def get_coalescing_stats():
+    """Get in-flight fetches and leader/follower counts of request coalescing."""
+    return market_data_flight.get_stats()
+
+
+@metrics_route.get(
+    "/rate-limiter",
+    summary="Upstream rate limiter and retry statistics",
+)
+async def get_rate_limiter_stats():
+    """Get token bucket state, queued waiters and retry counters."""
+    return coingecko_client.get_stats()
+
+
+@metrics_route.get(
+    "/ingestion",
+    summary="Background ingestion scheduler status",
+)
+async def get_ingestion_status():
+    """Get scheduler state and per-job timing of background ingestion."""
+    return ingestion_scheduler.get_status()
+
+
+@metrics_route.get(
+    "/circuit-breaker",
+    summary="CoinGecko circuit breaker state",
+)
+async def get_circuit_breaker_state():
+    """Get the circuit state, rolling failure rate and recent transitions."""
+    return coingecko_circuit_breaker.get_stats()
+
+
+@metrics_route.get(
+    "/write-behind",
+    summary="Write-behind persistence queue statistics",
+)
+async def get_write_behind_stats():
+    """Get queue depth, dropped snapshots and flush latency of DB writes."""
+    return coin_price_writer.get_stats()
+
+
+@metrics_route.get(
+    "/deduplication",
+    summary="Snapshot deduplication statistics",
+)
+async def get_deduplication_stats():
+    """Get inserted rows and rows skipped as already stored snapshots."""
+    return coin_price_snapshots.get_stats()
+
+
+@metrics_route.get(
+    "/partitions",
+    summary="coin_prices partition maintenance status",
+)
+async def get_partition_status():
+    """Get the partition and retention settings and the last maintenance run."""
+    return partition_maintenance.get_status()
+
+
+@metrics_route.get(
+    "/db-pool",
+    summary="Database connection pool statistics",
+)
+async def get_db_pool_stats():
+    """Get checked out connections, overflow and checkout wait times."""
+    return db_pool_monitor.get_stats()
+
+
+@metrics_route.get(
+    "/replicas",
+    summary="Read replica routing status",
+)
+async def get_replica_status():
+    """Get which read replicas are up and how reads were routed."""
+    return replica_router.get_status()
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CACHE_HIT = "HIT"
+CACHE_STALE = "STALE"
+CACHE_MISS = "MISS"
+CACHE_FALLBACK = "FALLBACK"
+
+
+@dataclass
+class CacheEntry:
+    """A cached value together with its freshness deadlines."""
+
+    value: Any
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a TTL and a stale-while-revalidate window.
+
+    Entries younger than ``ttl`` are served as hits. Entries past ``ttl`` but
+    within ``ttl + stale_ttl`` are served as stale while a single background
+    refresh replaces them. Older entries are treated as misses.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (value or None, one of CACHE_HIT/CACHE_STALE/CACHE_MISS)
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is None or now >= entry.stale_until:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, CACHE_MISS
+
+        self._entries.move_to_end(key)
+        if now < entry.fresh_until:
+            self.hits += 1
+            return entry.value, CACHE_HIT
+
+        self.stale_hits += 1
+        return entry.value, CACHE_STALE
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get the raw entry for a key without touching counters or LRU order."""
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(
+            value=value,
+            stored_at=now,
+            fresh_until=now + self.ttl,
+            stale_until=now + self.ttl + self.stale_ttl,
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        store: bool = True
+    ) -> None:
+        """
+        Refresh a key in the background unless a refresh is already running.
+
+        Args:
+            key: Cache key to refresh
+            loader: Zero-argument coroutine factory producing the new value
+            store: Cache the loader's result; False for loaders that cache
+                what they load themselves (and may decide not to)
+        """
+        if key in self._refreshing:
+            return
+
+        async def _run():
+            try:
+                value = await loader()
+                if store:
+                    self.set(key, value)
+                self.refreshes += 1
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(
+                    "Background cache refresh failed",
+                    extra={"key": str(key), "error": str(e)}
+                )
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_run())
+
+    def delete(self, key: Hashable) -> None:
+        """Drop one entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+
+    async def close(self) -> None:
+        """Cancel pending background refreshes."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters for monitoring."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 4)
+                if lookups else None
+            ),
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+        }
+
+
+market_data_cache = TTLCache(
+    ttl=settings.MARKET_CACHE_TTL,
+    stale_ttl=settings.MARKET_CACHE_STALE_TTL,
+    max_entries=settings.MARKET_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,159 @@
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+StateChangeCallback = Callable[[str, str, str, Dict[str, Any]], None]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker driven by a rolling failure rate.
+
+    While closed, the outcome of the last ``window_size`` calls is kept; once
+    at least ``minimum_calls`` are recorded and the failure rate reaches
+    ``failure_rate_threshold`` the circuit opens and calls fail fast for
+    ``open_duration`` seconds. Then up to ``half_open_max_calls`` trial calls
+    are let through: a success closes the circuit, a failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        window_size: int,
+        open_duration: float,
+        half_open_max_calls: int = 1,
+        on_state_change: Optional[StateChangeCallback] = None,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self.state = STATE_CLOSED
+        self._outcomes: deque = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.state_changed_at = datetime.now(timezone.utc)
+        self.rejected_calls = 0
+        self.transitions: List[Dict[str, Any]] = []
+
+    @property
+    def failure_rate(self) -> Optional[float]:
+        if not self._outcomes:
+            return None
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _transition(self, new_state: str, reason: str) -> None:
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        self.state_changed_at = datetime.now(timezone.utc)
+        details = {
+            "reason": reason,
+            "failure_rate": self.failure_rate,
+            "calls_in_window": len(self._outcomes),
+        }
+        self.transitions.append({
+            "from": old_state,
+            "to": new_state,
+            "at": self.state_changed_at.isoformat(),
+            **details,
+        })
+        del self.transitions[:-20]
+        if self.on_state_change is not None:
+            self.on_state_change(self.name, old_state, new_state, details)
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a trial call through."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(self._opened_at + self.open_duration - time.monotonic(), 0.0)
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                trial slots taken
+        """
+        if self.state == STATE_OPEN:
+            if self.retry_after() > 0:
+                self.rejected_calls += 1
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._half_open_calls = 0
+            self._transition(STATE_HALF_OPEN, "open duration elapsed")
+
+        if self.state == STATE_HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected_calls += 1
+                raise CircuitOpenError(self.name, self.open_duration)
+            self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        if self.state == STATE_HALF_OPEN:
+            self._outcomes.clear()
+            self._transition(STATE_CLOSED, "trial call succeeded")
+            return
+        self._outcomes.append(True)
+
+    def record_ignored(self) -> None:
+        """Release a trial slot for a call that never reached upstream."""
+        if self.state == STATE_HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if the rate is too high."""
+        if self.state == STATE_HALF_OPEN:
+            self._open("trial call failed")
+            return
+        self._outcomes.append(False)
+        if (len(self._outcomes) >= self.minimum_calls
+                and self.failure_rate >= self.failure_rate_threshold):
+            self._open("failure rate threshold reached")
+
+    def _open(self, reason: str) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(STATE_OPEN, reason)
+
+    def reset(self) -> None:
+        """Close the circuit and forget recorded outcomes."""
+        self._outcomes.clear()
+        self._half_open_calls = 0
+        self._transition(STATE_CLOSED, "reset")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current state, failure rate and recent transitions."""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "state_changed_at": self.state_changed_at.isoformat(),
+            "retry_after_seconds": round(self.retry_after(), 3),
+            "failure_rate": self.failure_rate,
+            "calls_in_window": len(self._outcomes),
+            "failure_rate_threshold": self.failure_rate_threshold,
+            "minimum_calls": self.minimum_calls,
+            "open_duration_seconds": self.open_duration,
+            "rejected_calls": self.rejected_calls,
+            "transitions": list(self.transitions),
+        }
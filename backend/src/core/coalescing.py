@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight execution.
+
+    The first caller for a key (the leader) starts the work in its own task;
+    callers arriving while it runs (followers) await the same task and receive
+    the same result or exception. The task is shielded, so a cancelled caller
+    does not cancel the work other callers are waiting for.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine factory doing the actual work
+
+        Returns:
+            The result of ``fn``; its exception is raised to every caller
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            self.followers += 1
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception so it is not reported as unhandled when
+        # every caller has gone away before the task finished.
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get in-flight and coalescing counters for monitoring."""
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "errors": self.errors,
+        }
+
+
+market_data_flight = SingleFlight()
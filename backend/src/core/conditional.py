@@ -0,0 +1,172 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from fastapi import Request, Response
+
+from .cache import TTLCache
+from .config import get_settings
+
+settings = get_settings()
+
+# Validators of database-backed responses remembered at once
+VALIDATOR_CACHE_ENTRIES = 1024
+
+# Validator cache key of the stored-data response
+STORED_DATA_KEY = ("stored-data",)
+
+
+def coin_key(coin_id: str) -> tuple:
+    """Validator cache key of a coin's stored record response."""
+    return ("coin", coin_id)
+
+
+@dataclass
+class Validators:
+    """ETag, Last-Modified and Cache-Control of one response."""
+
+    etag: str
+    cache_control: str
+    last_modified: Optional[datetime] = None
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers carrying the validators."""
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+
+def payload_etag(payload: bytes) -> str:
+    """Strong ETag of a response body."""
+    return f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag of the values a response is built from.
+
+    Cheaper than hashing the body: ``parts`` (e.g. request parameters and
+    stored rows) only need a stable repr, not JSON serialization.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def cache_control(max_age: float, stale_while_revalidate: float = 0) -> str:
+    """Cache-Control value letting clients and CDNs reuse a response."""
+    value = f"public, max-age={max(int(max_age), 0)}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={int(stale_while_revalidate)}"
+    return value
+
+
+def http_date(moment: datetime) -> str:
+    """Format a datetime (naive values are UTC) as an HTTP date."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """
+    Whether the client's copy is current, so a 304 can be sent.
+
+    If-None-Match is compared with weak comparison; If-Modified-Since is
+    only used when the request has no If-None-Match (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque(validators.etag) in map(_opaque, tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    modified = validators.last_modified
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return modified.replace(microsecond=0) <= since
+
+
+def not_modified(validators: Validators) -> Response:
+    """Empty 304 response carrying the validators."""
+    return Response(status_code=304, headers=validators.headers())
+
+
+class ValidatorCache:
+    """
+    Remembers the validators last sent for database-backed responses.
+
+    For up to HTTP_CACHE_MAX_AGE seconds, the time clients and CDNs are
+    allowed to reuse a response anyway, a request whose If-None-Match or
+    If-Modified-Since matches the remembered validators is answered with a
+    304 without querying the database. Writes forget the validators of the
+    coins they changed (``forget_coins``); validators computed from a read
+    that started before such a write are not remembered.
+    """
+
+    def __init__(self, max_age: float, max_entries: int):
+        self._cache = TTLCache(
+            ttl=max_age, stale_ttl=0, max_entries=max_entries)
+        self.generation = 0
+
+    def check(self, request: Request, key: Hashable) -> Optional[Response]:
+        """A 304 for the request if its copy matches the remembered one."""
+        if self._cache.ttl <= 0:
+            return None
+        validators, _ = self._cache.get(key)
+        if validators is not None and is_not_modified(request, validators):
+            return not_modified(validators)
+        return None
+
+    def remember(
+        self,
+        key: Hashable,
+        validators: Validators,
+        generation: int
+    ) -> None:
+        """
+        Store the validators just computed for a response.
+
+        Args:
+            key: Cache key of the response
+            validators: Its validators
+            generation: ``generation`` read before the database was queried;
+                if a write was seen since, the validators may be outdated
+        """
+        if self._cache.ttl > 0 and generation == self.generation:
+            self._cache.set(key, validators)
+
+    def forget_coins(self, coin_ids: Iterable[str]) -> None:
+        """Forget validators of responses built from the given coins."""
+        self.generation += 1
+        for coin_id in coin_ids:
+            self._cache.delete(coin_key(coin_id))
+        self._cache.delete(STORED_DATA_KEY)
+
+    def clear(self) -> None:
+        """Forget all remembered validators."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss counters for monitoring."""
+        return self._cache.get_stats()
+
+
+validator_cache = ValidatorCache(
+    max_age=settings.HTTP_CACHE_MAX_AGE,
+    max_entries=VALIDATOR_CACHE_ENTRIES,
+)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import get_settings
+from .upstream import coingecko_client
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+STATUS_UNKNOWN = "unknown"
+STATUS_UP = "up"
+STATUS_DOWN = "down"
+
+Probe = Callable[[], Awaitable[Any]]
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+async def ping_coingecko() -> None:
+    """
+    Call CoinGecko's /ping once.
+
+    Raises:
+        httpx.HTTPError: If the call fails or returns an error status
+    """
+    response = await coingecko_client.get(
+        "/ping",
+        timeout=settings.COINGECKO_PING_TIMEOUT
+    )
+    response.raise_for_status()
+
+
+class UpstreamHealthProbe:
+    """
+    Periodically probes an upstream and keeps the outcome for health checks.
+
+    Every ``interval`` seconds ``probe`` is awaited and the status, latency
+    and time of the last success are recorded, so health endpoints answer
+    from memory instead of calling upstream per request. When the recorded
+    result is older than ``max_age`` (e.g. the loop is not running), the next
+    caller of ``ensure_fresh`` triggers a single probe shared by all waiters.
+    """
+
+    def __init__(self, probe: Probe, interval: float, max_age: float):
+        self.probe = probe
+        self.interval = interval
+        self.max_age = max_age
+        self.status = STATUS_UNKNOWN
+        self.checks = 0
+        self.consecutive_failures = 0
+        self.last_checked_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._check_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last probe, or None if never probed."""
+        if self.last_checked_at is None:
+            return None
+        return max(time.time() - self.last_checked_at, 0.0)
+
+    def start(self) -> None:
+        """Start the probe loop in the background."""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the probe loop and any probe still running."""
+        tasks = [t for t in (self._task, self._check_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._check_task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> str:
+        """
+        Probe upstream now, sharing a probe that is already running.
+
+        Returns:
+            The resulting status
+        """
+        if self._check_task is None or self._check_task.done():
+            self._check_task = asyncio.create_task(self._run_probe())
+        await asyncio.shield(self._check_task)
+        return self.status
+
+    async def ensure_fresh(self) -> str:
+        """
+        Get the status, probing first if the last result is too old.
+
+        Returns:
+            The current status
+        """
+        age = self.age
+        if age is None or age > self.max_age:
+            return await self.check()
+        return self.status
+
+    async def _run_probe(self) -> None:
+        start = time.perf_counter()
+        try:
+            await self.probe()
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = str(e) or type(e).__name__
+            if self.status != STATUS_DOWN:
+                logger.warning(
+                    "Upstream health probe failed",
+                    extra={"error": self.last_error}
+                )
+            self.status = STATUS_DOWN
+        else:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_success_at = time.time()
+            self.status = STATUS_UP
+        finally:
+            self.checks += 1
+            self.last_latency = time.perf_counter() - start
+            self.last_checked_at = time.time()
+
+    def reset(self) -> None:
+        """Forget the recorded result so the next caller probes again."""
+        self.status = STATUS_UNKNOWN
+        self.consecutive_failures = 0
+        self.last_checked_at = None
+        self.last_success_at = None
+        self.last_latency = None
+        self.last_error = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the last recorded probe result."""
+        return {
+            "status": self.status,
+            "last_checked_at": _isoformat(self.last_checked_at),
+            "last_success_at": _isoformat(self.last_success_at),
+            "last_latency_ms": (
+                round(self.last_latency * 1000, 2)
+                if self.last_latency is not None else None
+            ),
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "checks": self.checks,
+            "probe_running": self.is_running,
+            "interval_seconds": self.interval,
+        }
+
+
+coingecko_health = UpstreamHealthProbe(
+    probe=ping_coingecko,
+    interval=settings.HEALTH_PROBE_INTERVAL,
+    max_age=settings.HEALTH_PROBE_MAX_AGE,
+)
@@ -0,0 +1,166 @@
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientManager:
+    """Owns the application-wide pooled HTTP client used for upstream calls."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._started_at: Optional[float] = None
+        self._http2 = False
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+
+    @property
+    def is_started(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def start(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        base_url: Optional[str] = None,
+    ) -> httpx.AsyncClient:
+        """
+        Create the shared client.
+
+        Args:
+            transport: Optional transport override (used by tests and benchmarks)
+            base_url: Optional base URL override, defaults to COINGECKO_API_URL
+
+        Returns:
+            The shared httpx.AsyncClient
+        """
+        if self.is_started:
+            return self._client
+
+        self._http2 = settings.HTTP2_ENABLED
+        if self._http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed, "
+                           "falling back to HTTP/1.1")
+            self._http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.COINGECKO_MARKETS_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        )
+
+        client_kwargs: Dict[str, Any] = {
+            "base_url": base_url or settings.COINGECKO_API_URL,
+            "limits": limits,
+            "timeout": timeout,
+            "http2": self._http2,
+        }
+        if transport is not None:
+            client_kwargs["transport"] = transport
+
+        self._client = httpx.AsyncClient(**client_kwargs)
+        self._started_at = time.time()
+        logger.info(
+            "HTTP client started",
+            extra={
+                "max_connections": settings.HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": (
+                    settings.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+                "http2": self._http2,
+            }
+        )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the shared client and release pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            logger.info("HTTP client closed")
+        self._client = None
+        self._started_at = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the shared client, starting it lazily if the lifespan did not."""
+        if not self.is_started:
+            return self.start()
+        return self._client
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Issue a GET request through the shared client.
+
+        Args:
+            url: Path relative to the base URL, or an absolute URL
+            **kwargs: Extra arguments forwarded to httpx (params, timeout, ...)
+
+        Returns:
+            httpx.Response
+        """
+        client = self.get_client()
+        self.requests_total += 1
+        self.in_flight += 1
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.HTTPError:
+            self.errors_total += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        if response.status_code >= 400:
+            self.errors_total += 1
+        return response
+
+    def _pool_connections(self) -> Dict[str, int]:
+        # httpx does not expose pool state publicly; read it from httpcore.
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        return {
+            "total": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+            "active": sum(1 for c in connections
+                          if not c.is_idle() and not c.is_closed()),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool and request counters for monitoring."""
+        return {
+            "started": self.is_started,
+            "uptime_seconds": (
+                round(time.time() - self._started_at, 3)
+                if self._started_at else None
+            ),
+            "http2": self._http2,
+            "limits": {
+                "max_connections": settings.HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": (
+                    settings.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+                "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+            },
+            "connections": self._pool_connections() if self.is_started else {},
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "in_flight": self.in_flight,
+        }
+
+
+http_client_manager = HTTPClientManager()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the application-wide upstream HTTP client."""
+    return http_client_manager.get_client()
@@ -0,0 +1,30 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module when one of its attributes is first used.
+
+    Keeps heavy dependencies (e.g. Polars) out of application import and
+    startup until a code path needs them. Module-level code of the caller
+    must not touch the module, or it is loaded right away.
+
+    Args:
+        name: Absolute module name, e.g. "polars"
+
+    Returns:
+        The module, loaded on first attribute access
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
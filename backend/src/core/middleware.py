@@ -9,6 +9,10 @@ from .config import get_settings
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Cookie holding the time until which a client's reads go to the primary
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
 
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """Middleware to add request ID to each request."""
@@ -67,3 +71,28 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                 }
             )
             raise
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Pin a client's reads to the primary database for a while after a write.
+
+    After a successful write request the client gets a cookie that expires
+    READ_YOUR_WRITES_WINDOW seconds later; get_read_db sends requests
+    carrying it to the primary, so replica lag never hides the client's
+    own writes. Disabled while the window is 0.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        response = await call_next(request)
+        window = settings.READ_YOUR_WRITES_WINDOW
+        if (window > 0 and request.method in WRITE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=max(int(window), 1),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a token cannot be granted before the caller's deadline."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Upstream rate limit exceeded, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket shared by all upstream calls.
+
+    Tokens refill continuously at ``rate_per_minute`` up to ``capacity``.
+    Callers reserve tokens in FIFO order on a timeline, one slot every
+    1/rate seconds once the burst is used up, and wait for their slot
+    without holding the lock; a caller whose slot would come after its
+    deadline is rejected right away. ``pause`` stops granting tokens until a
+    point in time, which is used to honour upstream ``Retry-After`` headers,
+    and moves every pending slot back by the pause so waiters stay spaced
+    1/rate apart after it instead of all firing when it ends.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        # Time at which all reserved tokens are refilled; tokens available
+        # at ``now`` are (now - _reserved_until) * rate, up to capacity, and
+        # negative while callers wait
+        self._reserved_until = time.monotonic() - capacity / self.rate
+        self._paused_until = 0.0
+        # Total time pending slots were moved back by pauses
+        self._shift = 0.0
+        self._lock = asyncio.Lock()
+        self.waiters = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+
+    def _tokens(self, now: float) -> float:
+        return min(self.capacity, (now - self._reserved_until) * self.rate)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Take one token, waiting for a refill if necessary.
+
+        Args:
+            timeout: Maximum seconds to wait; None waits indefinitely
+
+        Raises:
+            RateLimitExceeded: If no token is available within the timeout
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        self.waiters += 1
+        try:
+            # Only the reservation holds the lock, so every caller's deadline
+            # is checked as soon as it arrives, not after earlier waiters
+            async with self._lock:
+                now = time.monotonic()
+                reserved_until = max(
+                    self._reserved_until, now - self.capacity / self.rate
+                ) + 1 / self.rate
+                slot = max(reserved_until, self._paused_until)
+                if (slot > now and deadline is not None
+                        and slot > deadline):
+                    self.rejected += 1
+                    raise RateLimitExceeded(slot - now)
+                # Later callers get the slots after this one
+                self._reserved_until = reserved_until
+                shift = self._shift
+
+            while True:
+                # Pauses started meanwhile move the slot back
+                now = time.monotonic()
+                wait = max(slot + self._shift - shift,
+                           self._paused_until) - now
+                if wait <= 0:
+                    break
+                if deadline is not None and now + wait > deadline:
+                    self._release()
+                    self.rejected += 1
+                    raise RateLimitExceeded(wait)
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    self._release()
+                    raise
+
+            self.acquired += 1
+            self.total_wait_seconds += time.monotonic() - start
+        finally:
+            self.waiters -= 1
+
+    def _release(self) -> None:
+        """Give back a reserved token that will not be used."""
+        self._reserved_until -= 1 / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Stop granting tokens for ``seconds`` (e.g. after an upstream 429)."""
+        now = time.monotonic()
+        until = now + seconds
+        delay = until - max(now, self._paused_until)
+        if delay <= 0:
+            return
+        self._paused_until = until
+        if self._reserved_until > now:
+            # Move the pending slots back, keeping their spacing
+            self._shift += delay
+            self._reserved_until += delay
+        else:
+            # Nothing is pending: the first token is granted when it ends
+            self._reserved_until = until - 1 / self.rate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current bucket state and counters for monitoring."""
+        now = time.monotonic()
+        return {
+            "tokens": round(self._tokens(now), 3),
+            "capacity": self.capacity,
+            "rate_per_minute": self.rate * 60,
+            "paused_for_seconds": round(max(self._paused_until - now, 0.0), 3),
+            "waiters": self.waiters,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+
+coingecko_rate_limiter = TokenBucket(
+    rate_per_minute=settings.COINGECKO_RATE_LIMIT_PER_MINUTE,
+    capacity=settings.COINGECKO_RATE_LIMIT_BURST,
+)
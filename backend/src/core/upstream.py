@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.reporting.coingecko_reporter import ReporterSingleton
+
+from .circuit_breaker import CircuitBreaker
+from .config import get_settings
+from .http_client import HTTPClientManager, http_client_manager
+from .rate_limiter import TokenBucket, coingecko_rate_limiter
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+def is_upstream_failure(status_code: int) -> bool:
+    """Whether a response counts as a failure for the circuit breaker."""
+    return status_code == 429 or status_code >= 500
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either in seconds or as an HTTP date.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class UpstreamClient:
+    """
+    Rate-limited, retrying GET client for the CoinGecko API.
+
+    Every attempt takes a token from the shared bucket. Transport errors and
+    429/5xx responses are retried with exponential backoff and full jitter; a
+    Retry-After header overrides the backoff and pauses the bucket for all
+    callers. Retries never run past the per-call deadline. The final outcome
+    of each call (a transport error, 429 or any 5xx counts as a failure)
+    feeds the optional circuit breaker, which rejects calls immediately
+    while open.
+    """
+
+    def __init__(
+        self,
+        client_manager: HTTPClientManager,
+        rate_limiter: TokenBucket,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client_manager = client_manager
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.throttled_responses = 0
+        self.retries_exhausted = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def get(
+        self,
+        url: str,
+        timeout: float,
+        params: Optional[Dict[str, Any]] = None
+    ) -> httpx.Response:
+        """
+        GET an upstream URL within a total deadline.
+
+        Args:
+            url: Path relative to the CoinGecko base URL
+            timeout: Total seconds allowed, including waits and retries
+            params: Query parameters
+
+        Returns:
+            httpx.Response of the last attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            RateLimitExceeded: If the limiter cannot grant a token in time
+            httpx.HTTPError: If the last attempt failed at the transport level
+        """
+        if self.circuit_breaker is None:
+            return await self._get_with_retries(url, timeout, params)
+
+        self.circuit_breaker.before_call()
+        try:
+            response = await self._get_with_retries(url, timeout, params)
+        except httpx.HTTPError:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            self.circuit_breaker.record_ignored()
+            raise
+
+        if is_upstream_failure(response.status_code):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    async def _get_with_retries(
+        self,
+        url: str,
+        timeout: float,
+        params: Optional[Dict[str, Any]]
+    ) -> httpx.Response:
+        deadline = time.monotonic() + timeout
+        attempt = 0
+
+        while True:
+            await self.rate_limiter.acquire(
+                timeout=max(deadline - time.monotonic(), 0.0))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise httpx.TimeoutException(f"Deadline exceeded for {url}")
+
+            retry_after = None
+            try:
+                response = await self.client_manager.get(
+                    url, params=params, timeout=remaining)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    self.retries_exhausted += 1
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                retry_after = parse_retry_after(
+                    response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self.throttled_responses += 1
+                    self.rate_limiter.pause(
+                        retry_after if retry_after is not None
+                        else self._backoff(attempt))
+                if attempt >= self.max_retries:
+                    self.retries_exhausted += 1
+                    return response
+
+            delay = retry_after if retry_after is not None else self._backoff(
+                attempt)
+            if time.monotonic() + delay >= deadline:
+                # Retrying would blow the deadline; surface the last outcome.
+                self.retries_exhausted += 1
+                if response is None:
+                    raise httpx.TimeoutException(
+                        f"Deadline exceeded for {url}")
+                return response
+
+            attempt += 1
+            self.retries += 1
+            logger.info(
+                "Retrying upstream request",
+                extra={
+                    "url": url,
+                    "attempt": attempt,
+                    "delay": round(delay, 3),
+                    "status_code": response.status_code if response else None,
+                }
+            )
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter state and retry counters for monitoring."""
+        return {
+            "limiter": self.rate_limiter.get_stats(),
+            "retries": self.retries,
+            "throttled_responses": self.throttled_responses,
+            "retries_exhausted": self.retries_exhausted,
+            "max_retries": self.max_retries,
+        }
+
+
+def _report_state_change(
+    name: str,
+    old_state: str,
+    new_state: str,
+    details: Dict[str, Any]
+) -> None:
+    ReporterSingleton().get_instance().on_state_change(
+        name, old_state, new_state, details)
+
+
+coingecko_circuit_breaker = CircuitBreaker(
+    name="coingecko",
+    failure_rate_threshold=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+    minimum_calls=settings.CIRCUIT_BREAKER_MINIMUM_CALLS,
+    window_size=settings.CIRCUIT_BREAKER_WINDOW_SIZE,
+    open_duration=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+    half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+    on_state_change=_report_state_change,
+)
+
+
+coingecko_client = UpstreamClient(
+    client_manager=http_client_manager,
+    rate_limiter=coingecko_rate_limiter,
+    max_retries=settings.COINGECKO_MAX_RETRIES,
+    backoff_base=settings.COINGECKO_RETRY_BACKOFF_BASE,
+    backoff_max=settings.COINGECKO_RETRY_BACKOFF_MAX,
+    circuit_breaker=coingecko_circuit_breaker,
+)
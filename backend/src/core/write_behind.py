@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+Sink = Callable[[List[Any]], Awaitable[None]]
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue whose items are persisted in the background.
+
+    ``enqueue`` never waits: once ``max_size`` items are pending, the oldest
+    pending item (``drop_oldest``) or the new one (``drop_newest``) is
+    dropped. A background task hands up to ``batch_size`` items at a time to
+    ``sink``, waiting at most ``flush_interval`` seconds for a batch to fill,
+    and ``stop`` flushes what is left within ``shutdown_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sink: Sink,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        drop_policy: str = DROP_OLDEST,
+        shutdown_timeout: float = 10.0,
+    ):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.sink = sink
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.shutdown_timeout = shutdown_timeout
+        self._items: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_items = 0
+        self.flush_errors = 0
+        self.failed_items = 0
+        self.last_flush_latency: Optional[float] = None
+        self.max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush loop."""
+        if self.is_running:
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush pending items and stop, giving up after shutdown_timeout."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            lost = len(self._items)
+            self.dropped += lost
+            self._items.clear()
+            logger.error(
+                "Write-behind queue did not flush before shutdown",
+                extra={"queue": self.name, "dropped": lost}
+            )
+        self._task = None
+
+    def enqueue(self, item: Any) -> bool:
+        """
+        Queue an item for persistence without waiting.
+
+        Returns:
+            False if the item itself was dropped because the queue is full
+        """
+        if len(self._items) >= self.max_size:
+            self.dropped += 1
+            logger.warning(
+                "Write-behind queue full, dropping item",
+                extra={"queue": self.name, "policy": self.drop_policy}
+            )
+            if self.drop_policy == DROP_NEWEST:
+                return False
+            self._items.popleft()
+
+        self._items.append(item)
+        self.enqueued += 1
+        self._wakeup.set()
+        return True
+
+    async def flush(self) -> None:
+        """Persist every pending item now."""
+        while self._items:
+            await self._flush_batch()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._items:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Give the batch up to flush_interval to fill
+            deadline = loop.time() + self.flush_interval
+            while len(self._items) < self.batch_size and not self._closing:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush_batch()
+
+    async def _flush_batch(self) -> None:
+        batch = [
+            self._items.popleft()
+            for _ in range(min(self.batch_size, len(self._items)))
+        ]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.sink(batch)
+            self.flushes += 1
+            self.flushed_items += len(batch)
+        except Exception as e:
+            self.flush_errors += 1
+            self.failed_items += len(batch)
+            logger.error(
+                "Write-behind flush failed",
+                extra={"queue": self.name, "items": len(batch),
+                       "error": str(e)}
+            )
+        finally:
+            latency = time.perf_counter() - start
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self._total_flush_latency += latency
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, drop counts and flush latency for monitoring."""
+        attempts = self.flushes + self.flush_errors
+        return {
+            "name": self.name,
+            "running": self.is_running,
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "drop_policy": self.drop_policy,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flushed_items": self.flushed_items,
+            "flush_errors": self.flush_errors,
+            "failed_items": self.failed_items,
+            "last_flush_latency_ms": (
+                round(self.last_flush_latency * 1000, 2)
+                if self.last_flush_latency is not None else None
+            ),
+            "avg_flush_latency_ms": (
+                round(self._total_flush_latency / attempts * 1000, 2)
+                if attempts else None
+            ),
+            "max_flush_latency_ms": round(self.max_flush_latency * 1000, 2),
+        }
@@ -1,5 +1,3 @@
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
 from urllib.parse import urlparse
 import logging
@@ -8,7 +6,12 @@ logger = logging.getLogger(__name__)
 
 
 def create_database():
-    """Create the database if it doesn't exist."""
+    """
+    Create the database if it doesn't exist.
+
+    Run explicitly, by the application lifespan (DB_CREATE_ON_STARTUP) or
+    scripts/init_db.py; databases other than PostgreSQL are skipped.
+    """
 
     # Parse DATABASE_URL
     db_url = os.getenv("DATABASE_URL")
@@ -16,8 +19,14 @@ def create_database():
         raise ValueError("DATABASE_URL environment variable is not set")
 
     parsed = urlparse(db_url)
+    if not parsed.scheme.startswith("postgresql"):
+        logger.info("Not a PostgreSQL database, skipping creation.")
+        return
     db_name = parsed.path[1:]  # Remove leading '/'
 
+    import psycopg2
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
     # Connect to PostgreSQL server (not the database)
     conn = psycopg2.connect(
         host=parsed.hostname,
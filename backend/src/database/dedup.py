@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict
+
+from src.core.lazy import lazy_import
+
+pl = lazy_import("polars")
+
+
+class SnapshotFilter:
+    """
+    Remembers the newest stored ``last_updated`` of each coin.
+
+    Rows that are not newer than what was already stored are dropped before
+    they reach the database, so unchanged CoinGecko snapshots cost no insert.
+    The state is per process and starts empty; CoinPriceService still checks
+    the table for duplicates this filter misses.
+    """
+
+    def __init__(self):
+        self._latest: Dict[str, datetime] = {}
+        self.rows_seen = 0
+        self.rows_skipped_cached = 0
+        self.rows_skipped_existing = 0
+        self.rows_inserted = 0
+
+    def filter(self, rows: pl.DataFrame) -> pl.DataFrame:
+        """
+        Drop rows already stored, or older than the newest stored row.
+
+        Args:
+            rows: Frame with coin_id and last_updated columns
+
+        Returns:
+            pl.DataFrame: Remaining rows, one per (coin_id, last_updated)
+        """
+        self.rows_seen += len(rows)
+        fresh = rows.unique(
+            subset=["coin_id", "last_updated"], keep="first",
+            maintain_order=True
+        )
+        if self._latest:
+            known = pl.DataFrame(
+                {
+                    "coin_id": list(self._latest),
+                    "_known_updated": list(self._latest.values()),
+                },
+                schema={"coin_id": pl.Utf8,
+                        "_known_updated": rows.schema["last_updated"]}
+            )
+            fresh = (
+                fresh.join(known, on="coin_id", how="left")
+                .filter(
+                    pl.col("_known_updated").is_null()
+                    | (pl.col("last_updated") > pl.col("_known_updated"))
+                )
+                .drop("_known_updated")
+            )
+        self.rows_skipped_cached += len(rows) - len(fresh)
+        return fresh
+
+    def remember(self, rows: pl.DataFrame) -> None:
+        """Record stored rows as the newest known snapshot of their coins."""
+        latest = rows.group_by("coin_id").agg(pl.col("last_updated").max())
+        for coin_id, last_updated in latest.iter_rows():
+            known = self._latest.get(coin_id)
+            if known is None or last_updated > known:
+                self._latest[coin_id] = last_updated
+
+    def record_insert(self, attempted: int, inserted: int) -> None:
+        """Count rows inserted and rows found to be stored already."""
+        self.rows_inserted += inserted
+        self.rows_skipped_existing += attempted - inserted
+
+    def clear(self) -> None:
+        """Forget known snapshots (counters are kept)."""
+        self._latest.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get known coin count and inserted/skipped row counters."""
+        return {
+            "known_coins": len(self._latest),
+            "rows_seen": self.rows_seen,
+            "rows_inserted": self.rows_inserted,
+            "rows_skipped_cached": self.rows_skipped_cached,
+            "rows_skipped_existing": self.rows_skipped_existing,
+        }
+
+
+coin_price_snapshots = SnapshotFilter()
@@ -1,12 +1,46 @@
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-less DateTime column holding UTC.
+
+    Aware datetimes are converted to naive UTC before being bound, since
+    asyncpg refuses aware values for ``timestamp without time zone``.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_naive_utc(value)
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC; naive values are kept."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class CoinPrice(Base):
-    """Model for storing cryptocurrency price data."""
+    """
+    Model for storing cryptocurrency price data.
+
+    On PostgreSQL the table is range partitioned by created_at (see the
+    coin_prices_partitioned migration) and its primary key is
+    (id, created_at); id alone stays unique through its sequence.
+    """
 
     __tablename__ = "coin_prices"
 
@@ -22,14 +56,15 @@ class CoinPrice(Base):
     price_change_percentage_24h = Column(Float)
     market_dominance = Column(Float)
     volume_to_market_cap_ratio = Column(Float)
-    last_updated = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(
-        timezone.utc), nullable=False)
+    last_updated = Column(UTCDateTime, nullable=False)
+    created_at = Column(UTCDateTime, default=_utcnow, nullable=False)
 
     # Create indexes for common queries
     __table_args__ = (
         Index('idx_coin_price_date', 'coin_id', 'created_at'),
         Index('idx_market_cap_rank', 'market_cap_rank'),
+        Index('idx_coin_price_snapshot', 'coin_id', 'last_updated'),
+        Index('idx_coin_price_created_at', 'created_at'),
     )
 
     def to_dict(self):
@@ -58,3 +93,100 @@ class CoinPrice(Base):
                 else None
             )
         }
+
+
+class CoinLatest(Base):
+    """
+    Most recent stored snapshot of each coin, one row per coin.
+
+    Upserted in the same transaction as every insert into coin_prices, so
+    reads of current data are primary key (or small table) lookups no matter
+    how much history coin_prices holds. ``price_id`` is the id of the
+    coin_prices row it copies, returned as ``id`` like a CoinPrice.
+    """
+
+    __tablename__ = "coin_latest"
+
+    coin_id = Column(String, primary_key=True)
+    price_id = Column(Integer)
+    symbol = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    current_price = Column(Float)
+    market_cap = Column(Float)
+    market_cap_rank = Column(Integer)
+    total_volume = Column(Float)
+    price_change_24h = Column(Float)
+    price_change_percentage_24h = Column(Float)
+    market_dominance = Column(Float)
+    volume_to_market_cap_ratio = Column(Float)
+    last_updated = Column(UTCDateTime, nullable=False)
+    created_at = Column(UTCDateTime, default=_utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_coin_latest_rank', 'market_cap_rank'),
+    )
+
+    def to_dict(self):
+        """Convert model instance to dictionary."""
+        return {
+            "id": self.price_id,
+            "coin_id": self.coin_id,
+            "symbol": self.symbol,
+            "name": self.name,
+            "current_price": self.current_price,
+            "market_cap": self.market_cap,
+            "market_cap_rank": self.market_cap_rank,
+            "total_volume": self.total_volume,
+            "price_change_24h": self.price_change_24h,
+            "price_change_percentage_24h": self.price_change_percentage_24h,
+            "market_dominance": self.market_dominance,
+            "volume_to_market_cap_ratio": self.volume_to_market_cap_ratio,
+            "last_updated": (
+                self.last_updated.isoformat()
+                if self.last_updated
+                else None
+            ),
+            "created_at": (
+                self.created_at.isoformat()
+                if self.created_at
+                else None
+            )
+        }
+
+
+class CoinCandle(Base):
+    """
+    OHLC price candle of a coin at 1m, 1h or 1d resolution.
+
+    Built from coin_prices snapshots as they are inserted (see
+    CoinPriceService._upsert_candles); ``open_at``/``close_at`` are the
+    last_updated of the first and last snapshot in the bucket.
+    """
+
+    __tablename__ = "coin_candles"
+
+    coin_id = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True)
+    bucket_start = Column(UTCDateTime, primary_key=True)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    market_cap = Column(Float)
+    open_at = Column(UTCDateTime, nullable=False)
+    close_at = Column(UTCDateTime, nullable=False)
+    samples = Column(Integer, nullable=False)
+
+    def to_dict(self):
+        """Convert model instance to dictionary."""
+        return {
+            "bucket_start": self.bucket_start.isoformat(),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "market_cap": self.market_cap,
+            "samples": self.samples,
+        }
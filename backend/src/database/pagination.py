@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the (created_at, id) position of a row as an opaque cursor.
+
+    Args:
+        created_at: created_at of the last row of a page
+        row_id: id of that row
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
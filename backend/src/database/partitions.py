@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PARTITION_DAY = "day"
+PARTITION_MONTH = "month"
+
+RETENTION_DROP = "drop"
+RETENTION_DETACH = "detach"
+
+_NAME_FORMATS = {
+    PARTITION_DAY: "%Y%m%d",
+    PARTITION_MONTH: "%Y%m",
+}
+
+
+def partition_start(moment: datetime, interval: str) -> datetime:
+    """Start of the partition holding ``moment`` (naive UTC)."""
+    day = datetime(moment.year, moment.month, moment.day)
+    if interval == PARTITION_DAY:
+        return day
+    if interval == PARTITION_MONTH:
+        return day.replace(day=1)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_partition_start(start: datetime, interval: str) -> datetime:
+    """Start of the partition following the one starting at ``start``."""
+    if interval == PARTITION_DAY:
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_ranges(
+    first: datetime,
+    last: datetime,
+    interval: str
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Partition bounds covering ``first`` through ``last``.
+
+    Returns:
+        List of (start, end) tuples, end exclusive
+    """
+    ranges = []
+    start = partition_start(first, interval)
+    while start <= last:
+        end = next_partition_start(start, interval)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def partition_name(table: str, start: datetime, interval: str) -> str:
+    """Name of a partition, e.g. coin_prices_p202402 for a month."""
+    return f"{table}_p{start.strftime(_NAME_FORMATS[interval])}"
+
+
+def parse_partition_name(
+    table: str,
+    name: str,
+    interval: str
+) -> Optional[datetime]:
+    """Start of a partition from its name, or None if it is not ours."""
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], _NAME_FORMATS[interval])
+    except ValueError:
+        return None
+
+
+def create_partition_sql(
+    table: str,
+    start: datetime,
+    end: datetime,
+    interval: str
+) -> str:
+    """CREATE TABLE statement for one range partition."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start, interval)} "
+        f"PARTITION OF {table} FOR VALUES FROM ('{start:%Y-%m-%d}') "
+        f"TO ('{end:%Y-%m-%d}')"
+    )
+
+
+class PartitionMaintenance:
+    """
+    Keeps the range partitions of a table ahead of time and within retention.
+
+    Every ``run_interval`` seconds the partitions for the current period and
+    the next ``precreate`` periods are created, and partitions whose whole
+    range is older than ``retention_days`` are dropped or, with the detach
+    action, detached and kept as plain tables for archiving. Tables that are
+    not partitioned (e.g. SQLite in tests) are left alone.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        interval: str,
+        precreate: int,
+        retention_days: int,
+        retention_action: str,
+        run_interval: float,
+        engine: Optional[AsyncEngine] = None,
+    ):
+        if retention_action not in (RETENTION_DROP, RETENTION_DETACH):
+            raise ValueError(f"Unknown retention action: {retention_action}")
+        self.table = table
+        self.interval = interval
+        self.precreate = precreate
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+        self.run_interval = run_interval
+        self._engine = engine
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_created: List[str] = []
+        self.last_removed: List[str] = []
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            from src.database.session import get_async_engine
+            self._engine = get_async_engine()
+        return self._engine
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the maintenance loop in the background."""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the maintenance loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                logger.error(
+                    "Partition maintenance failed",
+                    extra={"table": self.table, "error": self.last_error}
+                )
+            await asyncio.sleep(self.run_interval)
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Create upcoming partitions and remove expired ones.
+
+        Args:
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            Dict with the created and removed partition names
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        created, removed = [], []
+
+        async with self.engine.begin() as connection:
+            if connection.dialect.name != "postgresql":
+                return {"created": created, "removed": removed}
+            partitioned = await connection.scalar(text(
+                "SELECT count(*) FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table"
+            ), {"table": self.table})
+            if not partitioned:
+                return {"created": created, "removed": removed}
+
+            result = await connection.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ), {"table": self.table})
+            existing = {row[0] for row in result}
+
+            last = partition_start(now, self.interval)
+            for _ in range(self.precreate):
+                last = next_partition_start(last, self.interval)
+            for start, end in partition_ranges(now, last, self.interval):
+                name = partition_name(self.table, start, self.interval)
+                if name not in existing:
+                    await connection.execute(text(create_partition_sql(
+                        self.table, start, end, self.interval)))
+                    created.append(name)
+
+            if self.retention_days > 0:
+                cutoff = now - timedelta(days=self.retention_days)
+                for name in sorted(existing):
+                    start = parse_partition_name(
+                        self.table, name, self.interval)
+                    if start is None:
+                        continue
+                    if next_partition_start(start, self.interval) > cutoff:
+                        continue
+                    await connection.execute(text(
+                        f"ALTER TABLE {self.table} DETACH PARTITION {name}"))
+                    if self.retention_action == RETENTION_DROP:
+                        await connection.execute(text(f"DROP TABLE {name}"))
+                    removed.append(name)
+
+        self.runs += 1
+        self.last_run_at = time.time()
+        self.last_error = None
+        self.last_created = created
+        self.last_removed = removed
+        if created or removed:
+            logger.info(
+                "Partition maintenance changed partitions",
+                extra={"table": self.table, "created": created,
+                       "removed": removed,
+                       "action": self.retention_action}
+            )
+        return {"created": created, "removed": removed}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get configuration and the outcome of the last maintenance run."""
+        return {
+            "table": self.table,
+            "running": self.is_running,
+            "interval": self.interval,
+            "precreate": self.precreate,
+            "retention_days": self.retention_days,
+            "retention_action": self.retention_action,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_at": (
+                datetime.fromtimestamp(
+                    self.last_run_at, timezone.utc).isoformat()
+                if self.last_run_at is not None else None
+            ),
+            "last_error": self.last_error,
+            "last_created": self.last_created,
+            "last_removed": self.last_removed,
+        }
+
+
+partition_maintenance = PartitionMaintenance(
+    table="coin_prices",
+    interval=settings.PARTITION_INTERVAL,
+    precreate=settings.PARTITION_PRECREATE,
+    retention_days=settings.PARTITION_RETENTION_DAYS,
+    retention_action=settings.PARTITION_RETENTION_ACTION,
+    run_interval=settings.PARTITION_MAINTENANCE_INTERVAL,
+)
@@ -0,0 +1,107 @@
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+
+class PoolMonitor:
+    """
+    Live statistics of a database engine's connection pool.
+
+    Checkouts, new connections and invalidated connections (e.g. dropped by
+    pre-ping after a failover) are counted through pool events. The time a
+    checkout takes to get a connection, waiting for a free one or opening a
+    new one, is measured by the pool class from ``pool_class``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._engine: Optional[Engine] = None
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.last_wait: Optional[float] = None
+        self.max_wait = 0.0
+        self._total_wait = 0.0
+        self._waits = 0
+
+    def pool_class(self, base: Type[Pool]) -> Type[Pool]:
+        """Subclass of a queue pool class that reports checkout wait times."""
+        monitor = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except exc.TimeoutError:
+                    monitor.record_wait(
+                        time.perf_counter() - start, timed_out=True)
+                    raise
+                monitor.record_wait(time.perf_counter() - start)
+                return connection
+
+        TimedPool.__name__ = f"Timed{base.__name__}"
+        return TimedPool
+
+    def attach(self, engine: Engine) -> None:
+        """Listen to the pool events of a (sync) engine."""
+        self._engine = engine
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_checkout(self, dbapi_connection, record, proxy) -> None:
+        self.checkouts += 1
+
+    def _on_connect(self, dbapi_connection, record) -> None:
+        self.connects += 1
+
+    def _on_invalidate(self, dbapi_connection, record, exception) -> None:
+        self.invalidations += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Record how long one checkout took to get a connection."""
+        self.last_wait = seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self._total_wait += seconds
+        self._waits += 1
+        if timed_out:
+            self.timeouts += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool occupancy, connection counters and checkout wait times."""
+        pool = self._engine.pool if self._engine is not None else None
+
+        def gauge(name: str) -> Optional[int]:
+            # Only queue pools keep a fixed size and an overflow
+            method = getattr(pool, name, None)
+            return method() if callable(method) else None
+
+        return {
+            "name": self.name,
+            "pool": type(pool).__name__ if pool is not None else None,
+            "size": gauge("size"),
+            "checked_out": gauge("checkedout"),
+            "checked_in": gauge("checkedin"),
+            "overflow": gauge("overflow"),
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "last_wait_ms": (
+                round(self.last_wait * 1000, 2)
+                if self.last_wait is not None else None
+            ),
+            "avg_wait_ms": (
+                round(self._total_wait / self._waits * 1000, 2)
+                if self._waits else None
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+db_pool_monitor = PoolMonitor("primary")
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.core.config import get_settings
+from src.core.middleware import READ_YOUR_WRITES_COOKIE
+from src.database.session import (
+    engine_options,
+    get_async_session_factory,
+    to_async_url,
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Errors that take a replica out of rotation
+REPLICA_ERRORS = (OSError, SQLAlchemyError, asyncio.TimeoutError)
+
+
+class ReplicaRouter:
+    """
+    Round-robin choice among the read replicas that are up.
+
+    A replica is taken out of rotation when a health check or a connection
+    to it fails and put back once a check succeeds; with none up, reads go
+    to the primary. Checks run every ``check_interval`` seconds once
+    ``start`` is called. Engines are created on first use.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        check_interval: float,
+        check_timeout: float,
+    ):
+        self.urls = urls
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._engines: Dict[int, AsyncEngine] = {}
+        self._up = [True] * len(urls)
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+        self.picks = [0] * len(urls)
+        self.failures = [0] * len(urls)
+        self.last_errors: List[Optional[str]] = [None] * len(urls)
+        self.primary_fallbacks = 0
+        self.last_checked_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.urls)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def engine(self, index: int) -> AsyncEngine:
+        """Get the engine of one replica."""
+        if index not in self._engines:
+            url = to_async_url(self.urls[index])
+            self._engines[index] = create_async_engine(
+                url, **engine_options(url))
+        return self._engines[index]
+
+    def pick(self) -> Optional[Tuple[int, AsyncEngine]]:
+        """
+        Choose the next replica that is up.
+
+        Returns:
+            (index, engine) of the replica, or None to use the primary
+        """
+        for _ in range(len(self.urls)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.urls)
+            if self._up[index]:
+                self.picks[index] += 1
+                return index, self.engine(index)
+        if self.enabled:
+            self.primary_fallbacks += 1
+        return None
+
+    def mark_down(self, index: int, error: BaseException) -> None:
+        """Take a replica out of rotation until its next successful check."""
+        if self._up[index]:
+            logger.warning(
+                "Read replica down",
+                extra={"replica": index, "error": str(error)}
+            )
+        self._up[index] = False
+        self.failures[index] += 1
+        self.last_errors[index] = str(error) or type(error).__name__
+
+    async def check(self) -> None:
+        """Run SELECT 1 on every replica and update which ones are up."""
+        for index in range(len(self.urls)):
+            try:
+                await asyncio.wait_for(self._ping(index), self.check_timeout)
+            except REPLICA_ERRORS as e:
+                self.mark_down(index, e)
+            else:
+                if not self._up[index]:
+                    logger.info("Read replica up", extra={"replica": index})
+                self._up[index] = True
+        self.last_checked_at = time.time()
+
+    async def _ping(self, index: int) -> None:
+        async with self.engine(index).connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def start(self) -> None:
+        """Start background health checks."""
+        if self.is_running or not self.enabled:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop health checks and close replica connections."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        for engine in self._engines.values():
+            await engine.dispose()
+
+    async def _loop(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-replica state and routing counters (URLs are omitted)."""
+        return {
+            "enabled": self.enabled,
+            "running": self.is_running,
+            "replicas": [
+                {
+                    "index": index,
+                    "up": self._up[index],
+                    "picks": self.picks[index],
+                    "failures": self.failures[index],
+                    "last_error": self.last_errors[index],
+                }
+                for index in range(len(self.urls))
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+            "last_checked_at": (
+                datetime.fromtimestamp(
+                    self.last_checked_at, timezone.utc).isoformat()
+                if self.last_checked_at is not None else None
+            ),
+        }
+
+
+replica_router = ReplicaRouter(
+    urls=[
+        url.strip()
+        for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()
+    ],
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+    check_timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT,
+)
+
+# Sessions bound to a replica engine per request
+replica_session_factory = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Whether the client wrote within its read-your-writes window."""
+    until = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    if until is None:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(
+    request: Request
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get database session for read-only endpoints.
+
+    The session is bound to a read replica unless none is configured or up,
+    or the client is within its read-your-writes window; then it is bound
+    to the primary. A replica that cannot be connected to is taken out of
+    rotation and the primary is used instead.
+
+    Yields:
+        SQLAlchemy async session
+    """
+    choice = None if reads_own_writes(request) else replica_router.pick()
+    if choice is not None:
+        index, engine = choice
+        db = replica_session_factory(bind=engine)
+        try:
+            await db.connection()
+        except REPLICA_ERRORS as e:
+            await db.close()
+            replica_router.mark_down(index, e)
+        else:
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+
+    async with get_async_session_factory()() as db:
+        yield db
@@ -1,67 +1,845 @@
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from src.database.models import CoinPrice
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import importlib
+from sqlalchemy import (
+    case,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Insert, Select
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from src.core.conditional import validator_cache
+from src.core.config import get_settings
+from src.core.lazy import lazy_import
+from src.database.dedup import coin_price_snapshots
+from src.database.models import CoinCandle, CoinLatest, CoinPrice, to_naive_utc
+from src.transformers.market_data import (
+    COIN_PRICE_COLUMNS,
+    MarketDataTransformer,
+    coin_price_schema,
+)
+
+pl = lazy_import("polars")
+settings = get_settings()
+
+# Snapshots are stored well within this time after their last_updated. It
+# bounds duplicate lookups on created_at, so only recent partitions are read.
+SNAPSHOT_MATCH_WINDOW = timedelta(days=1)
+
+# First key of the advisory locks serializing snapshot inserts per coin
+SNAPSHOT_LOCK_NAMESPACE = 0x636F696E  # "coin"
+
+# Dialects whose INSERT supports ON CONFLICT, used to upsert the rollups
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+# coin_prices rows read per query when candles are rebuilt
+CANDLE_REBUILD_CHUNK = 10_000
+
+# coin_prices columns that can be selected from a coin's history
+HISTORY_FIELDS = ["id"] + COIN_PRICE_COLUMNS
+
+# coin_prices rows read per query when history is exported
+EXPORT_CHUNK = 10_000
+
+
+def _upsert_insert(db: AsyncSession, table) -> Insert:
+    """INSERT with on_conflict_do_update() for the session's database."""
+    name = db.get_bind().dialect.name
+    if name not in UPSERT_DIALECTS:
+        raise NotImplementedError(f"Upserts are not supported on {name}")
+    # Imported on use, the dialect modules are slow to import
+    return importlib.import_module(f"sqlalchemy.dialects.{name}").insert(table)
+
+
+def history_schema(fields: List[str]) -> Dict[str, pl.DataType]:
+    """Types of the columns read for ``fields`` of a coin's history."""
+    types = {"id": pl.Int64, **coin_price_schema()}
+    return {
+        field: types[field]
+        for field in dict.fromkeys(["id", "created_at", *fields])
+    }
+
+
+def _history_query(
+    coin_ids: Optional[List[str]],
+    fields: List[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    after: Optional[Tuple[datetime, int]],
+    descending: bool
+) -> Select:
+    """
+    Select ``fields`` of stored snapshots ordered by (created_at, id).
+
+    Rows after the ``after`` position are selected with a created_at range,
+    which uses idx_coin_price_date, and an id tie-break filter.
+    """
+    selected = list(dict.fromkeys(["id", "created_at", *fields]))
+    query = select(*[getattr(CoinPrice, field) for field in selected])
+    if coin_ids is not None:
+        query = query.where(CoinPrice.coin_id.in_(coin_ids))
+    if start is not None:
+        query = query.where(CoinPrice.created_at >= to_naive_utc(start))
+    if end is not None:
+        query = query.where(CoinPrice.created_at < to_naive_utc(end))
+
+    if after is not None:
+        created_at, row_id = to_naive_utc(after[0]), after[1]
+        if descending:
+            query = query.where(
+                CoinPrice.created_at <= created_at,
+                or_(CoinPrice.created_at < created_at, CoinPrice.id < row_id)
+            )
+        else:
+            query = query.where(
+                CoinPrice.created_at >= created_at,
+                or_(CoinPrice.created_at > created_at, CoinPrice.id > row_id)
+            )
+
+    if descending:
+        return query.order_by(CoinPrice.created_at.desc(), CoinPrice.id.desc())
+    return query.order_by(CoinPrice.created_at.asc(), CoinPrice.id.asc())
 
 
 class CoinPriceService:
     """Service for handling coin price data in the database."""
 
     @staticmethod
-    async def create_coin_prices(
-        db: Session, 
-        market_data: List[Dict[str, Any]]
-    ) -> List[CoinPrice]:
+    async def bulk_insert_coin_prices(
+        db: AsyncSession,
+        rows: pl.DataFrame
+    ) -> int:
         """
-        Create multiple coin price records in the database.
+        Insert new coin price snapshots straight from a DataFrame.
+
+        Rows whose (coin_id, last_updated) is already stored are skipped:
+        first by coin_price_snapshots in memory, then by looking them up in
+        the table while holding a per-coin lock (coin_prices is partitioned
+        by created_at, so a unique constraint on the pair is not possible). On PostgreSQL with asyncpg
+        the rows are streamed with COPY into a temporary table and moved over
+        with INSERT ... SELECT ... WHERE NOT EXISTS; on other databases
+        (SQLite in tests) the stored pairs are fetched and a single Core
+        INSERT is executed with the rest. No ORM objects are created and
+        only the primary keys are fetched back. coin_latest and coin_candles
+        are updated with the inserted rows in the same transaction.
 
         Args:
             db: Database session
-            market_data: List of market data dictionaries
+            rows: COIN_PRICE_COLUMNS frame, see
+                MarketDataTransformer.to_coin_price_rows
 
         Returns:
-            List of created CoinPrice records
-        """
-        coin_prices = []
-        for data in market_data:
-            coin_price = CoinPrice(
-                coin_id=data["id"],
-                symbol=data["symbol"],
-                name=data["name"],
-                current_price=data["current_price"],
-                market_cap=data["market_cap"],
-                market_cap_rank=data["market_cap_rank"],
-                total_volume=data["total_volume"],
-                price_change_24h=data["price_change_24h"],
-                price_change_percentage_24h=data["price_change_percentage_24h"],
-                last_updated=datetime.fromisoformat(
-                    data["last_updated"].replace("Z", "+00:00")),
-                created_at=datetime.now(timezone.utc)
+            Number of inserted rows; skipped rows are counted in
+            coin_price_snapshots.get_stats()
+        """
+        rows = coin_price_snapshots.filter(rows.select(COIN_PRICE_COLUMNS))
+        if rows.is_empty():
+            return 0
+
+        await CoinPriceService._lock_snapshots(
+            db, rows["coin_id"].unique().to_list())
+        dialect = db.get_bind().dialect
+        if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+            new_rows = await CoinPriceService._copy_coin_prices(db, rows)
+        else:
+            new_rows = rows.join(
+                await CoinPriceService._stored_snapshots(db, rows),
+                on=["coin_id", "last_updated"],
+                how="anti"
             )
-            coin_prices.append(coin_price)
+            if not new_rows.is_empty():
+                ids = await db.scalars(
+                    insert(CoinPrice.__table__).returning(
+                        CoinPrice.__table__.c.id,
+                        sort_by_parameter_order=True),
+                    new_rows.to_dicts()
+                )
+                new_rows = new_rows.with_columns(
+                    pl.Series("id", ids.all(), dtype=pl.Int64))
 
-        db.add_all(coin_prices)
-        db.commit()
-        return coin_prices
+        await CoinPriceService.update_rollups(db, new_rows)
+        await db.commit()
+        if not new_rows.is_empty():
+            validator_cache.forget_coins(
+                new_rows["coin_id"].unique().to_list())
+        coin_price_snapshots.remember(rows)
+        coin_price_snapshots.record_insert(len(rows), len(new_rows))
+        return len(new_rows)
+
+    @staticmethod
+    async def batch_create_coin_prices(
+        db: AsyncSession,
+        records: List[Dict[str, Any]]
+    ) -> List[Optional[CoinPrice]]:
+        """
+        Create many coin price records in one transaction.
+
+        Records whose (coin_id, last_updated) is already stored, or repeats
+        one earlier in the batch, are skipped. Stored pairs are looked up
+        with one query and the rest are inserted with a single bulk INSERT
+        returning the new rows, instead of a flush and refresh per record.
+        coin_latest and coin_candles are updated in the same transaction.
+
+        Args:
+            db: Database session
+            records: CoinPriceCreate dumps
+
+        Returns:
+            The created CoinPrice for each record, in order, or None for
+            records that were skipped
+        """
+        keys = [
+            (record["coin_id"], to_naive_utc(record["last_updated"]))
+            for record in records
+        ]
+        stored = set()
+        if keys:
+            await CoinPriceService._lock_snapshots(
+                db, list({coin_id for coin_id, _ in keys}))
+            result = await db.execute(
+                select(CoinPrice.coin_id, CoinPrice.last_updated).where(
+                    tuple_(CoinPrice.coin_id, CoinPrice.last_updated)
+                    .in_(list(set(keys)))
+                )
+            )
+            stored = {tuple(row) for row in result}
+
+        new_positions, new_records = [], []
+        for position, (key, record) in enumerate(zip(keys, records)):
+            if key in stored:
+                continue
+            stored.add(key)
+            new_positions.append(position)
+            new_records.append(record)
+
+        created: List[Optional[CoinPrice]] = [None] * len(records)
+        if new_records:
+            result = await db.scalars(
+                insert(CoinPrice).returning(
+                    CoinPrice, sort_by_parameter_order=True),
+                new_records
+            )
+            for position, price in zip(new_positions, result.all()):
+                created[position] = price
+            await CoinPriceService.update_rollups(
+                db, CoinPriceService.price_rows(
+                    [price for price in created if price is not None]))
+        await db.commit()
+        if new_records:
+            validator_cache.forget_coins(
+                {record["coin_id"] for record in new_records})
+        return created
+
+    @staticmethod
+    async def batch_update_coin_prices(
+        db: AsyncSession,
+        changes: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, CoinPrice]:
+        """
+        Update many coin price records, by id, in one transaction.
+
+        The changes are applied with bulk UPDATE statements (one per set of
+        changed columns) and the rollups of the affected coins are rebuilt
+        once per coin.
+
+        Args:
+            db: Database session
+            changes: Changed columns (CoinPriceUpdate dumps) by record id
+
+        Returns:
+            Updated CoinPrice records by id; unknown ids are left out
+        """
+        found = await CoinPriceService._prices_by_id(db, list(changes))
+        if not found:
+            return {}
+
+        since: Dict[str, datetime] = {}
+        for row_id, price in found.items():
+            moments = [price.last_updated]
+            if changes[row_id].get("last_updated") is not None:
+                moments.append(to_naive_utc(changes[row_id]["last_updated"]))
+            earliest = min(moments)
+            since[price.coin_id] = min(
+                since.get(price.coin_id, earliest), earliest)
+
+        await db.execute(
+            update(CoinPrice),
+            [{"id": row_id, **changes[row_id]} for row_id in found]
+        )
+        await CoinPriceService._refresh_rollups(db, since)
+        await db.commit()
+        validator_cache.forget_coins(since)
+        return await CoinPriceService._prices_by_id(db, list(found))
 
     @staticmethod
-    async def get_latest_prices(
-        db: Session, 
-        limit: int = 100
-    ) -> List[CoinPrice]:
+    async def batch_delete_coin_prices(
+        db: AsyncSession,
+        ids: List[int]
+    ) -> Dict[int, CoinPrice]:
         """
-        Get the latest coin prices from the database.
+        Delete many coin price records, by id, in one transaction.
 
         Args:
             db: Database session
-            limit: Maximum number of records to return
+            ids: Record ids
 
         Returns:
-            List of CoinPrice records
+            Deleted CoinPrice records by id; unknown ids are left out
         """
+        found = await CoinPriceService._prices_by_id(db, ids)
+        if not found:
+            return {}
+
+        since: Dict[str, datetime] = {}
+        for price in found.values():
+            since[price.coin_id] = min(
+                since.get(price.coin_id, price.last_updated),
+                price.last_updated)
+
+        await db.execute(
+            delete(CoinPrice).where(CoinPrice.id.in_(list(found))))
+        await CoinPriceService._refresh_rollups(db, since)
+        await db.commit()
+        validator_cache.forget_coins(since)
+        return found
+
+    @staticmethod
+    async def _prices_by_id(
+        db: AsyncSession,
+        ids: List[int]
+    ) -> Dict[int, CoinPrice]:
+        """Stored CoinPrice records among ``ids``, read with one query."""
+        if not ids:
+            return {}
+        result = await db.scalars(
+            select(CoinPrice)
+            .where(CoinPrice.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        return {price.id: price for price in result}
+
+    @staticmethod
+    async def _refresh_rollups(
+        db: AsyncSession,
+        since: Dict[str, datetime]
+    ) -> None:
+        """Rebuild coin_latest and candles of coins edited directly."""
+        for coin_id, moment in since.items():
+            await CoinPriceService.sync_coin_latest(db, coin_id)
+            await CoinPriceService.rebuild_candles(db, coin_id, since=moment)
+
+    @staticmethod
+    def price_rows(prices: List[CoinPrice]) -> pl.DataFrame:
+        """
+        Shape CoinPrice records like a bulk insert frame.
+
+        Args:
+            prices: CoinPrice records, with id and created_at set
+
+        Returns:
+            pl.DataFrame: COIN_PRICE_COLUMNS with naive UTC timestamps, and
+                the primary keys as ``id``
+        """
+        return pl.DataFrame(
+            [
+                {
+                    **{
+                        column: (
+                            to_naive_utc(getattr(price, column))
+                            if column in ("last_updated", "created_at")
+                            else getattr(price, column)
+                        )
+                        for column in COIN_PRICE_COLUMNS
+                    },
+                    "id": price.id,
+                }
+                for price in prices
+            ],
+            schema={**coin_price_schema(), "id": pl.Int64}
+        )
+
+    @staticmethod
+    async def update_rollups(db: AsyncSession, rows: pl.DataFrame) -> None:
+        """
+        Fold newly stored coin_prices rows into coin_latest and coin_candles.
+
+        Must be given each stored row once, since candle sample counts are
+        added up. Does not commit.
+
+        Args:
+            db: Database session
+            rows: COIN_PRICE_COLUMNS frame of the rows just inserted, with
+                their primary keys as ``id``
+        """
+        if rows.is_empty():
+            return
+        await CoinPriceService._upsert_latest(db, rows)
+        await CoinPriceService._upsert_candles(db, rows)
+
+    @staticmethod
+    async def _upsert_latest(db: AsyncSession, rows: pl.DataFrame) -> None:
+        """
+        Make the newest of ``rows`` per coin its coin_latest row.
+
+        A stored row is only replaced by a newer last_updated, so replayed or
+        out-of-order batches never move coin_latest back in time.
+        """
+        newest = rows.sort("last_updated").unique(
+            subset=["coin_id"], keep="last")
+        columns = COIN_PRICE_COLUMNS + ["price_id"]
+
+        upsert = _upsert_insert(db, CoinLatest.__table__)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[CoinLatest.coin_id],
+            set_={
+                column: upsert.excluded[column]
+                for column in columns if column != "coin_id"
+            },
+            where=CoinLatest.last_updated < upsert.excluded.last_updated
+        )
+        await db.execute(upsert, newest.select(
+            *COIN_PRICE_COLUMNS, pl.col("id").alias("price_id")).to_dicts())
+
+    @staticmethod
+    async def _upsert_candles(db: AsyncSession, rows: pl.DataFrame) -> None:
+        """
+        Merge candles built from ``rows`` into the stored ones.
+
+        The open/close of a stored candle are replaced only by snapshots
+        before/after its open_at/close_at, high and low are extended and
+        samples added up, so batches can arrive in any order.
+        """
+        candles = MarketDataTransformer.to_candle_rows(rows)
+        table = CoinCandle.__table__
+        upsert = _upsert_insert(db, table)
+        new = upsert.excluded
+        opens_earlier = new.open_at < table.c.open_at
+        closes_later = new.close_at >= table.c.close_at
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c.coin_id, table.c.resolution,
+                            table.c.bucket_start],
+            set_={
+                "open": case((opens_earlier, new.open), else_=table.c.open),
+                "open_at": case(
+                    (opens_earlier, new.open_at), else_=table.c.open_at),
+                "high": case(
+                    (or_(table.c.high.is_(None), new.high > table.c.high),
+                     new.high),
+                    else_=table.c.high),
+                "low": case(
+                    (or_(table.c.low.is_(None), new.low < table.c.low),
+                     new.low),
+                    else_=table.c.low),
+                "close": case((closes_later, new.close), else_=table.c.close),
+                "volume": case(
+                    (closes_later, new.volume), else_=table.c.volume),
+                "market_cap": case(
+                    (closes_later, new.market_cap), else_=table.c.market_cap),
+                "close_at": case(
+                    (closes_later, new.close_at), else_=table.c.close_at),
+                "samples": table.c.samples + new.samples,
+            }
+        )
+        await db.execute(upsert, candles.to_dicts())
+
+    @staticmethod
+    async def sync_coin_latest(db: AsyncSession, coin_id: str) -> None:
+        """
+        Rebuild the coin_latest row of one coin from coin_prices.
+
+        Used after records are edited or deleted directly; does not commit.
+
+        Args:
+            db: Database session
+            coin_id: Coin whose coin_latest row is rebuilt
+        """
+        newest = await CoinPriceService.get_newest_price(db, coin_id)
+        await db.execute(
+            delete(CoinLatest).where(CoinLatest.coin_id == coin_id))
+        if newest is not None:
+            await db.execute(insert(CoinLatest.__table__).values({
+                **{column: getattr(newest, column)
+                   for column in COIN_PRICE_COLUMNS},
+                "price_id": newest.id,
+            }))
+
+    @staticmethod
+    async def rebuild_candles(
+        db: AsyncSession,
+        coin_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> int:
+        """
+        Recompute candles from the coin_prices history.
+
+        Candles from the start of the day of ``since`` onwards are deleted
+        and rebuilt from the snapshots, read CANDLE_REBUILD_CHUNK rows at a
+        time. Used to backfill existing history (scripts/backfill_candles.py)
+        and after records are edited or deleted directly. Does not commit.
+
+        Args:
+            db: Database session
+            coin_id: Only rebuild this coin (default: every coin)
+            since: Only rebuild from this time on (default: all history)
+
+        Returns:
+            Number of coin_prices rows read
+        """
+        filters, candle_filters = [], []
+        if coin_id is not None:
+            filters.append(CoinPrice.coin_id == coin_id)
+            candle_filters.append(CoinCandle.coin_id == coin_id)
+        if since is not None:
+            day = to_naive_utc(since).replace(
+                hour=0, minute=0, second=0, microsecond=0)
+            filters.append(CoinPrice.last_updated >= day)
+            candle_filters.append(CoinCandle.bucket_start >= day)
+
+        await db.execute(delete(CoinCandle).where(*candle_filters))
+
+        columns = [getattr(CoinPrice, column) for column in COIN_PRICE_COLUMNS]
+        read, last_id = 0, None
+        while True:
+            query = select(CoinPrice.id, *columns).where(*filters)
+            if last_id is not None:
+                query = query.where(CoinPrice.id > last_id)
+            result = await db.execute(
+                query.order_by(CoinPrice.id).limit(CANDLE_REBUILD_CHUNK))
+            chunk = result.all()
+            if not chunk:
+                return read
+            last_id = chunk[-1][0]
+            read += len(chunk)
+            await CoinPriceService._upsert_candles(db, pl.DataFrame(
+                [row[1:] for row in chunk],
+                schema=coin_price_schema(),
+                orient="row"
+            ))
+
+    @staticmethod
+    async def get_candles(
+        db: AsyncSession,
+        coin_id: str,
+        resolution: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 500
+    ) -> List[CoinCandle]:
+        """
+        Get the most recent candles of a coin in a time range.
+
+        Args:
+            db: Database session
+            coin_id: Coin identifier
+            resolution: One of CANDLE_INTERVALS
+            start: Earliest bucket start, inclusive
+            end: Latest bucket start, exclusive
+            limit: Maximum number of candles
+
+        Returns:
+            List of CoinCandle records, oldest first
+        """
+        query = select(CoinCandle).where(
+            CoinCandle.coin_id == coin_id,
+            CoinCandle.resolution == resolution
+        )
+        if start is not None:
+            query = query.where(CoinCandle.bucket_start >= to_naive_utc(start))
+        if end is not None:
+            query = query.where(CoinCandle.bucket_start < to_naive_utc(end))
+        result = await db.execute(
+            query.order_by(CoinCandle.bucket_start.desc()).limit(limit))
+        return list(reversed(result.scalars().all()))
+
+    @staticmethod
+    async def get_price_history(
+        db: AsyncSession,
+        coin_id: str,
+        fields: List[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        descending: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of a coin's stored snapshots, by created_at.
+
+        Pages are keyset paginated on (created_at, id): the next page starts
+        after the last row of the previous one instead of skipping OFFSET
+        rows, so with idx_coin_price_date (coin_id, created_at) every page
+        costs the same however deep it is.
+
+        Args:
+            db: Database session
+            coin_id: Coin identifier
+            fields: HISTORY_FIELDS to return; id and created_at are added
+            start: Earliest created_at, inclusive
+            end: Latest created_at, exclusive
+            after: (created_at, id) of the last row of the previous page
+            limit: Maximum number of rows
+            descending: Newest first (default) or oldest first
+
+        Returns:
+            List of row dicts with the requested fields
+        """
+        query = _history_query(
+            [coin_id], fields, start, end, after, descending)
+        result = await db.execute(query.limit(limit))
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def iter_price_frames(
+        db: AsyncSession,
+        fields: List[str],
+        coin_ids: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Read stored snapshots as DataFrames of at most ``chunk_size`` rows.
+
+        Chunks are read oldest first with the same (created_at, id) keyset
+        as get_price_history, so memory stays bounded however many rows
+        match and each query starts where the previous one stopped.
+
+        Args:
+            db: Database session
+            fields: HISTORY_FIELDS to read; id and created_at are added
+            coin_ids: Only these coins (default: every coin)
+            start: Earliest created_at, inclusive
+            end: Latest created_at, exclusive
+            chunk_size: Rows per frame (default EXPORT_CHUNK)
+
+        Yields:
+            pl.DataFrame: Chunk with the columns of history_schema(fields)
+        """
+        schema = history_schema(fields)
+        chunk_size = chunk_size or EXPORT_CHUNK
+        after = None
+        while True:
+            result = await db.execute(_history_query(
+                coin_ids, fields, start, end, after, descending=False
+            ).limit(chunk_size))
+            chunk = result.all()
+            if not chunk:
+                return
+            frame = pl.DataFrame(chunk, schema=schema, orient="row")
+            yield frame
+            if len(chunk) < chunk_size:
+                return
+            after = (frame["created_at"][-1], frame["id"][-1])
+
+    @staticmethod
+    async def get_newest_price(
+        db: AsyncSession,
+        coin_id: str
+    ) -> Optional[CoinPrice]:
+        """
+        Get the coin_prices record of a coin with the newest last_updated.
+
+        Args:
+            db: Database session
+            coin_id: Coin identifier
+
+        Returns:
+            CoinPrice record, or None if the coin has no records
+        """
+        result = await db.execute(
+            select(CoinPrice)
+            .where(CoinPrice.coin_id == coin_id)
+            .order_by(CoinPrice.last_updated.desc(),
+                      CoinPrice.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_coin_latest(
+        db: AsyncSession,
+        coin_id: str
+    ) -> Optional[CoinLatest]:
+        """
+        Get the latest stored snapshot of a coin (primary key lookup).
+
+        Args:
+            db: Database session
+            coin_id: Coin identifier
+
+        Returns:
+            CoinLatest record, or None if the coin was never stored
+        """
+        return await db.get(CoinLatest, coin_id)
+
+    @staticmethod
+    async def _lock_snapshots(db: AsyncSession, coin_ids: List[str]) -> None:
+        """
+        Serialize snapshot inserts of the same coins until commit.
+
+        coin_prices has no unique constraint on (coin_id, last_updated)
+        once partitioned, so two transactions could both find a snapshot
+        missing and insert it. On PostgreSQL a transaction-level advisory
+        lock per coin, taken in coin order to avoid deadlocks, makes the
+        second one wait and then see the first one's rows. Other databases
+        (SQLite in tests) serialize writers on their own.
+        """
+        if not coin_ids or db.get_bind().dialect.name != "postgresql":
+            return
+        await db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(:namespace, hashtext(coin_id)) "
+                "FROM (SELECT unnest(CAST(:coin_ids AS text[])) AS coin_id "
+                "ORDER BY 1) AS coins"
+            ),
+            {"namespace": SNAPSHOT_LOCK_NAMESPACE,
+             "coin_ids": sorted(coin_ids)}
+        )
+
+    @staticmethod
+    async def _stored_snapshots(
+        db: AsyncSession,
+        rows: pl.DataFrame
+    ) -> pl.DataFrame:
+        """(coin_id, last_updated) pairs of ``rows`` that are already stored."""
+        oldest = rows["last_updated"].min()
+        result = await db.execute(
+            select(CoinPrice.coin_id, CoinPrice.last_updated)
+            .where(
+                CoinPrice.coin_id.in_(rows["coin_id"].unique().to_list()),
+                CoinPrice.last_updated >= oldest,
+                CoinPrice.created_at >= oldest - SNAPSHOT_MATCH_WINDOW
+            )
+        )
+        return pl.DataFrame(
+            result.all(),
+            schema={"coin_id": rows.schema["coin_id"],
+                    "last_updated": rows.schema["last_updated"]},
+            orient="row"
+        )
+
+    @staticmethod
+    async def _copy_coin_prices(
+        db: AsyncSession,
+        rows: pl.DataFrame
+    ) -> pl.DataFrame:
+        """COPY rows into a staging table and insert (and return) new ones.
+
+        The returned rows have an ``id`` column with their primary keys.
+        """
+        staging = f"{CoinPrice.__tablename__}_staging"
+        columns = ", ".join(COIN_PRICE_COLUMNS)
+        await db.execute(text(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {CoinPrice.__tablename__} WITH NO DATA"
+        ))
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging,
+            records=rows.iter_rows(),
+            columns=COIN_PRICE_COLUMNS
+        )
+        result = await db.execute(text(
+            f"INSERT INTO {CoinPrice.__tablename__} ({columns}) "
+            f"SELECT {columns} FROM {staging} s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {CoinPrice.__tablename__} p "
+            "WHERE p.coin_id = s.coin_id "
+            "AND p.last_updated = s.last_updated "
+            "AND p.created_at >= s.last_updated - interval "
+            f"'{int(SNAPSHOT_MATCH_WINDOW.total_seconds())} seconds') "
+            f"RETURNING {columns}, id"
+        ))
+        return pl.DataFrame(
+            result.all(), schema={**rows.schema, "id": pl.Int64},
+            orient="row")
+
+    @staticmethod
+    async def _latest_snapshot_query(
+        db: AsyncSession,
+        *entities
+    ) -> Optional[Select]:
+        """
+        Select the current coin_latest rows, by market cap rank.
+
+        Returns:
+            The query, or None if nothing is stored
+        """
+        newest = await db.scalar(select(func.max(CoinLatest.created_at)))
+        if newest is None:
+            return None
+        since = newest - timedelta(hours=settings.STORED_DATA_LOOKBACK_HOURS)
         return (
-            db.query(CoinPrice)
-            .order_by(CoinPrice.created_at.desc())
-            .limit(limit)
-            .all()
+            select(*entities)
+            .where(CoinLatest.created_at >= since)
+            .order_by(CoinLatest.market_cap_rank.asc().nulls_last(),
+                      CoinLatest.coin_id)
         )
+
+    @staticmethod
+    async def get_latest_snapshot(
+        db: AsyncSession,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[CoinLatest]:
+        """
+        Get the most recent stored record of each coin, by market cap rank.
+
+        Reads coin_latest, so the cost does not grow with history. Coins last
+        stored more than STORED_DATA_LOOKBACK_HOURS before the newest row,
+        e.g. ones that dropped out of the tracked markets, are left out.
+
+        Args:
+            db: Database session
+            limit: Maximum number of coins to return
+            offset: Number of coins to skip (for pagination)
+
+        Returns:
+            List of CoinLatest records, one per coin
+        """
+        query = await CoinPriceService._latest_snapshot_query(
+            db, CoinLatest)
+        if query is None:
+            return []
+        result = await db.execute(query.offset(offset).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def stream_latest_snapshot(
+        db: AsyncSession,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Stream every coin of the latest snapshot, in get_latest_snapshot order.
+
+        Rows are fetched through a server-side cursor (yield_per), so only
+        ``chunk_size`` rows are held in memory at a time and the first chunk
+        is available as soon as the database sends it.
+
+        Args:
+            db: Database session
+            chunk_size: Rows per frame (default EXPORT_CHUNK)
+
+        Yields:
+            pl.DataFrame: Chunk of COIN_PRICE_COLUMNS rows
+        """
+        query = await CoinPriceService._latest_snapshot_query(
+            db, *[getattr(CoinLatest, column) for column in COIN_PRICE_COLUMNS])
+        if query is None:
+            return
+        result = await db.stream(
+            query.execution_options(yield_per=chunk_size or EXPORT_CHUNK))
+        try:
+            async for rows in result.partitions():
+                yield pl.DataFrame(
+                    rows, schema=coin_price_schema(), orient="row")
+        finally:
+            await result.close()
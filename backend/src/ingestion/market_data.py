@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import market_data_cache
+from src.core.coalescing import market_data_flight
+from src.core.config import get_settings
+from src.core.lazy import lazy_import
+from src.core.upstream import coingecko_client
+from src.core.write_behind import WriteBehindQueue
+from src.database.services import CoinPriceService
+from src.database.session import get_async_session_factory
+from src.models import MarketUniverseResponse
+from src.reporting.coingecko_reporter import ReporterSingleton
+from src.transformers.market_data import (
+    MARKET_RESPONSE_COLUMNS,
+    MarketDataTransformer,
+)
+
+pl = lazy_import("polars")
+settings = get_settings()
+
+PAGE_ERROR_RETRY = "retry"
+PAGE_ERROR_PARTIAL = "partial"
+
+
+async def store_coin_price_batch(batches: List[pl.DataFrame]) -> None:
+    """Insert several to_coin_price_rows frames in one transaction."""
+    async with get_async_session_factory()() as db:
+        await CoinPriceService.bulk_insert_coin_prices(db, pl.concat(batches))
+
+
+coin_price_writer = WriteBehindQueue(
+    name="coin_prices",
+    sink=store_coin_price_batch,
+    max_size=settings.WRITE_BEHIND_MAX_SIZE,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    drop_policy=settings.WRITE_BEHIND_DROP_POLICY,
+    shutdown_timeout=settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT,
+)
+
+
+async def request_market_page(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    sparkline: bool
+) -> httpx.Response:
+    """
+    Request one page of /coins/markets from CoinGecko.
+
+    Raises:
+        httpx.HTTPError: If the upstream request fails
+        RateLimitExceeded: If the upstream rate limit cannot be met in time
+    """
+    reporter = ReporterSingleton().get_instance()
+    start_time = time.time()
+
+    # Log the request
+    reporter.on_request(
+        endpoint="/coins/markets",
+        params={"vs_currency": vs_currency,
+                "page": page, "per_page": per_page}
+    )
+
+    response = await coingecko_client.get(
+        "/coins/markets",
+        params={
+            "vs_currency": vs_currency,
+            "per_page": per_page,
+            "page": page,
+            "sparkline": sparkline,
+            "order": "market_cap_desc"
+        },
+        timeout=settings.COINGECKO_MARKETS_TIMEOUT
+    )
+    response.raise_for_status()
+
+    # Log the response
+    reporter.on_response(
+        endpoint="/coins/markets",
+        status_code=response.status_code,
+        response_time=time.time() - start_time
+    )
+
+    return response
+
+
+async def fetch_market_page(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    sparkline: bool
+) -> List[Dict[str, Any]]:
+    """Fetch one page of /coins/markets as a list of dictionaries."""
+    response = await request_market_page(
+        vs_currency, page, per_page, sparkline)
+    return response.json()
+
+
+def build_market_data_payload(
+    df: pl.DataFrame,
+    page: int,
+    per_page: int
+) -> bytes:
+    """
+    Serialize a MarketDataResponse straight from a typed market data frame.
+
+    Produces the same JSON document as MarketDataResponse.model_dump_json()
+    without building a CoinMarketData model per row.
+    """
+    rows = MarketDataTransformer.to_json_rows(df, MARKET_RESPONSE_COLUMNS)
+    return (
+        b'{"data":' + rows
+        + b',"total_count":' + str(len(df)).encode()
+        + b',"page":' + str(page).encode()
+        + b',"per_page":' + str(per_page).encode()
+        + b',"stale":false,"as_of":null}'
+    )
+
+
+async def load_market_data(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    sparkline: bool,
+    db: AsyncSession
+) -> bytes:
+    """
+    Fetch, transform and store one page of market data.
+
+    The upstream body is parsed directly into a typed Polars frame and the
+    response is serialized from that frame, so no per-coin Python dicts or
+    Pydantic models are built on this path. Only STORED_DATA_CURRENCY
+    prices are stored, as stored rows carry no currency. With
+    WRITE_BEHIND_ENABLED the rows are handed to coin_price_writer instead of
+    being inserted before returning.
+
+    Returns:
+        bytes: Serialized MarketDataResponse ready to be sent to the client
+    """
+    reporter = ReporterSingleton().get_instance()
+    response = await request_market_page(
+        vs_currency, page, per_page, sparkline)
+
+    # Transform data using Polars
+    transformer = MarketDataTransformer()
+    df = transformer.add_market_metrics(
+        transformer.parse_market_data(response.content))
+
+    if vs_currency != settings.STORED_DATA_CURRENCY:
+        return build_market_data_payload(df, page, per_page)
+
+    # store the data
+    rows = transformer.to_coin_price_rows(df)
+    if settings.WRITE_BEHIND_ENABLED:
+        coin_price_writer.enqueue(rows)
+        return build_market_data_payload(df, page, per_page)
+
+    try:
+        await CoinPriceService.bulk_insert_coin_prices(db, rows)
+    except Exception as e:
+        await db.rollback()
+        reporter.on_error(
+            "Error storing market data in database",
+            cause=e,
+            stack=None
+        )
+
+    return build_market_data_payload(df, page, per_page)
+
+
+async def refresh_market_data(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    sparkline: bool
+) -> bytes:
+    """
+    Reload market data outside of a request.
+
+    Used by background cache refreshes and the ingestion scheduler; the
+    result replaces the cached response for the same parameters.
+    """
+    return await fetch_market_data(vs_currency, page, per_page, sparkline)
+
+
+async def fetch_market_data(
+    vs_currency: str,
+    page: int,
+    per_page: int,
+    sparkline: bool
+) -> bytes:
+    """
+    Load market data on a cache miss, coalescing concurrent identical calls.
+
+    Concurrent requests with the same parameters share one upstream fetch,
+    transform and DB insert; its result or error is returned to all of them.
+    The shared work uses its own DB session rather than the session of the
+    request that started it, which may finish or disconnect while the other
+    requests still wait.
+    """
+    cache_key = (vs_currency, page, per_page, sparkline)
+
+    async def load():
+        async with get_async_session_factory()() as db:
+            payload = await load_market_data(
+                vs_currency, page, per_page, sparkline, db)
+        if settings.MARKET_CACHE_ENABLED:
+            market_data_cache.set(cache_key, payload)
+        return payload
+
+    return await market_data_flight.do(cache_key, load)
+
+
+async def load_market_universe(
+    vs_currency: str,
+    pages: int,
+    per_page: int,
+    on_page_error: str
+) -> MarketUniverseResponse:
+    """
+    Fetch pages 1..pages concurrently and compute metrics over all of them.
+
+    At most FANOUT_CONCURRENCY pages are in flight at once. With
+    on_page_error="retry" failed pages are fetched again once and the call
+    fails if any page still fails; with "partial" the successful pages are
+    returned and the failed ones are listed in the response.
+
+    Returns:
+        MarketUniverseResponse: Coins of all fetched pages with their metrics
+    """
+    semaphore = asyncio.Semaphore(settings.FANOUT_CONCURRENCY)
+
+    async def fetch(page: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await fetch_market_page(vs_currency, page, per_page, False)
+
+    async def fetch_all(page_numbers: List[int]) -> Dict[int, Any]:
+        results = await asyncio.gather(
+            *(fetch(page) for page in page_numbers),
+            return_exceptions=True
+        )
+        return dict(zip(page_numbers, results))
+
+    results = await fetch_all(list(range(1, pages + 1)))
+    failed = [page for page, r in results.items() if isinstance(r, Exception)]
+
+    if failed and on_page_error == PAGE_ERROR_RETRY:
+        results.update(await fetch_all(failed))
+        failed = [page for page in failed
+                  if isinstance(results[page], Exception)]
+        if failed:
+            raise results[failed[0]]
+
+    fetched = sorted(page for page in results if page not in failed)
+    if not fetched:
+        raise results[failed[0]]
+
+    df = MarketDataTransformer.transform_market_universe(
+        [results[page] for page in fetched])
+
+    return MarketUniverseResponse(
+        data=df.to_dicts(),
+        total_count=len(df),
+        pages_requested=pages,
+        pages_fetched=fetched,
+        failed_pages=failed,
+        per_page=per_page,
+        total_market_cap=df["market_cap"].sum() or 0.0,
+        partial=bool(failed)
+    )
+
+
+async def fetch_market_universe(
+    vs_currency: str,
+    pages: int,
+    per_page: int,
+    on_page_error: str
+) -> bytes:
+    """
+    Load the multi-page market universe, coalescing identical calls.
+
+    Complete results are cached; partial results are returned but not cached.
+    """
+    cache_key = ("universe", vs_currency, pages, per_page, on_page_error)
+
+    async def load():
+        universe = await load_market_universe(
+            vs_currency, pages, per_page, on_page_error)
+        payload = universe.model_dump_json().encode()
+        if settings.MARKET_CACHE_ENABLED and not universe.partial:
+            market_data_cache.set(cache_key, payload)
+        return payload
+
+    return await market_data_flight.do(cache_key, load)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.core.config import get_settings
+from src.ingestion.market_data import refresh_market_data
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[str, int, int, bool], Awaitable[Any]]
+
+
+def parse_page_range(value: str) -> List[int]:
+    """
+    Parse a page specification such as "1", "1-4" or "1,3,5-6".
+
+    Returns:
+        Sorted list of unique page numbers
+    """
+    pages = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = (int(p) for p in part.split("-", 1))
+            pages.update(range(first, last + 1))
+        else:
+            pages.add(int(part))
+    return sorted(p for p in pages if p >= 1)
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@dataclass
+class IngestionJob:
+    """One (vs_currency, page) combination polled by the scheduler."""
+
+    vs_currency: str
+    page: int
+    per_page: int
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    running: bool = False
+    last_started_at: Optional[float] = None
+    last_finished_at: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_success_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.vs_currency}:page={self.page}:per_page={self.per_page}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job state to a dictionary."""
+        return {
+            "name": self.name,
+            "vs_currency": self.vs_currency,
+            "page": self.page,
+            "per_page": self.per_page,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started_at": _isoformat(self.last_started_at),
+            "last_finished_at": _isoformat(self.last_finished_at),
+            "last_duration": (
+                round(self.last_duration, 3)
+                if self.last_duration is not None else None
+            ),
+            "last_success_at": _isoformat(self.last_success_at),
+            "last_error": self.last_error,
+        }
+
+
+class IngestionScheduler:
+    """
+    Periodically ingests market data so reads do not depend on traffic.
+
+    Every ``interval`` seconds (plus up to ``jitter`` seconds) each job is
+    started in its own task. A job still running from the previous tick is
+    skipped rather than started twice, and each run is bounded by
+    ``job_timeout``. Results land in the database and the market data cache,
+    which /coingecko/markets serves from.
+    """
+
+    def __init__(
+        self,
+        jobs: List[IngestionJob],
+        interval: float,
+        jitter: float,
+        job_timeout: float,
+        runner: JobRunner = refresh_market_data,
+    ):
+        self.jobs = jobs
+        self.interval = interval
+        self.jitter = jitter
+        self.job_timeout = job_timeout
+        self.runner = runner
+        self.ticks = 0
+        self._task: Optional[asyncio.Task] = None
+        self._job_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the scheduling loop in the background."""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "Ingestion scheduler started",
+            extra={"jobs": [job.name for job in self.jobs],
+                   "interval": self.interval}
+        )
+
+    async def stop(self) -> None:
+        """Stop the loop and cancel jobs that are still running."""
+        tasks = list(self._job_tasks.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._job_tasks.clear()
+        logger.info("Ingestion scheduler stopped")
+
+    async def _loop(self) -> None:
+        while True:
+            self.tick()
+            await asyncio.sleep(
+                self.interval + random.uniform(0, self.jitter))
+
+    def tick(self) -> List[asyncio.Task]:
+        """
+        Start every job that is not already running.
+
+        Returns:
+            Tasks of the jobs started by this tick
+        """
+        self.ticks += 1
+        started = []
+        for job in self.jobs:
+            if job.running:
+                job.skipped += 1
+                logger.warning(
+                    "Skipping ingestion job, previous run still in progress",
+                    extra={"job": job.name}
+                )
+                continue
+            task = asyncio.create_task(self._run_job(job))
+            self._job_tasks[job.name] = task
+            started.append(task)
+        return started
+
+    async def _run_job(self, job: IngestionJob) -> None:
+        job.running = True
+        job.runs += 1
+        job.last_started_at = time.time()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self.runner(job.vs_currency, job.page, job.per_page, False),
+                timeout=self.job_timeout
+            )
+            job.last_success_at = time.time()
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e) or type(e).__name__
+            logger.error(
+                "Ingestion job failed",
+                extra={"job": job.name, "error": job.last_error}
+            )
+        finally:
+            job.last_duration = time.perf_counter() - start
+            job.last_finished_at = time.time()
+            job.running = False
+            self._job_tasks.pop(job.name, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get scheduler configuration and per-job timing for monitoring."""
+        return {
+            "enabled": settings.INGESTION_ENABLED,
+            "running": self.is_running,
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "job_timeout_seconds": self.job_timeout,
+            "ticks": self.ticks,
+            "jobs": [job.to_dict() for job in self.jobs],
+        }
+
+
+def build_jobs_from_settings() -> List[IngestionJob]:
+    """Create one job per configured (vs_currency, page) combination."""
+    currencies = [
+        c.strip().lower()
+        for c in settings.INGESTION_CURRENCIES.split(",")
+        if c.strip()
+    ]
+    return [
+        IngestionJob(
+            vs_currency=currency,
+            page=page,
+            per_page=settings.INGESTION_PER_PAGE
+        )
+        for currency in currencies
+        for page in parse_page_range(settings.INGESTION_PAGES)
+    ]
+
+
+ingestion_scheduler = IngestionScheduler(
+    jobs=build_jobs_from_settings(),
+    interval=settings.INGESTION_INTERVAL,
+    jitter=settings.INGESTION_JITTER,
+    job_timeout=settings.INGESTION_JOB_TIMEOUT,
+)
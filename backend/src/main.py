@@ -1,17 +1,65 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import (
+    Depends,
     FastAPI,
     status,
 )
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.coingecko import coingecko_route  # fetch and store
 from src.api.database_operations import database_route  # CRUD
-from src.core.middleware import RequestIDMiddleware, ErrorHandlerMiddleware
+from src.api.metrics import metrics_route  # monitoring
+from src.core.http_client import http_client_manager
+from src.core.cache import market_data_cache
+from src.core.health import STATUS_DOWN, coingecko_health
+from src.database.partitions import partition_maintenance
+from src.database.replicas import replica_router
+from src.database.create_db import create_database
+from src.database.session import dispose_engines, get_db
+from src.ingestion.market_data import coin_price_writer
+from src.ingestion.scheduler import ingestion_scheduler
+from src.core.middleware import (
+    ErrorHandlerMiddleware,
+    ReadYourWritesMiddleware,
+    RequestIDMiddleware,
+)
 from src.core.logging import setup_logging
 from src.core.config import get_settings
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    if settings.DB_CREATE_ON_STARTUP:
+        await asyncio.to_thread(create_database)
+    http_client_manager.start()
+    replica_router.start()
+    if settings.WRITE_BEHIND_ENABLED:
+        coin_price_writer.start()
+    if settings.HEALTH_PROBE_ENABLED:
+        coingecko_health.start()
+    if settings.PARTITION_MAINTENANCE_ENABLED:
+        partition_maintenance.start()
+    if settings.INGESTION_ENABLED:
+        ingestion_scheduler.start()
+    try:
+        yield
+    finally:
+        await ingestion_scheduler.stop()
+        await coingecko_health.stop()
+        await partition_maintenance.stop()
+        await coin_price_writer.stop()
+        await replica_router.stop()
+        await market_data_cache.close()
+        await http_client_manager.close()
+        await dispose_engines()
+
+
 app = FastAPI(
     title="CoinGecko",
     version="0.1.0",
@@ -26,6 +74,7 @@ app = FastAPI(
     - Perform CRUD operations on stored data
     - Data transformation using Polars
     """,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -36,11 +85,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(ErrorHandlerMiddleware)
 
 app.include_router(coingecko_route)  # fetch and store
 app.include_router(database_route)  # CRUD
+app.include_router(metrics_route)  # monitoring
 
 
 @app.get(
@@ -48,5 +99,38 @@ app.include_router(database_route)  # CRUD
     summary="API health check",
 )
 def health_check():
-    """Returns a 200 response to indicate the API is healthy."""
-    return Response(status_code=status.HTTP_200_OK)
+    """
+    Returns a 200 response to indicate the API is healthy.
+
+    The body carries the last CoinGecko probe result; it is read from memory
+    and does not call upstream.
+    """
+    return {"status": "ok", "coingecko": coingecko_health.get_status()}
+
+
+@app.get(
+    "/health/ready",
+    summary="API readiness check",
+)
+async def readiness_check(db: AsyncSession = Depends(get_db)):
+    """
+    Returns 200 when a database connection can be checked out and used.
+
+    CoinGecko being down does not make the API unready, since cached and
+    stored data are still served; its last probe result is included.
+    """
+    checks = {"coingecko": coingecko_health.get_status()}
+    try:
+        await db.execute(text("SELECT 1"))
+        checks["database"] = {"status": "up"}
+    except Exception as e:
+        checks["database"] = {"status": STATUS_DOWN, "error": str(e)}
+
+    ready = checks["database"]["status"] == "up"
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={"status": "ready" if ready else "not_ready", **checks}
+    )
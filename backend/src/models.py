@@ -10,11 +10,14 @@ class CoinMarketData(BaseModel):
     id: str = Field(..., description="Coin identifier (e.g., 'bitcoin')")
     symbol: str = Field(..., description="Coin symbol (e.g., 'btc')")
     name: str = Field(..., description="Coin name (e.g., 'Bitcoin')")
-    current_price: float = Field(...,
-                                 description="Current price in specified currency")
-    market_cap: float = Field(..., description="Market capitalization")
-    market_cap_rank: int = Field(..., description="Market cap rank")
-    total_volume: float = Field(..., description="24h trading volume")
+    current_price: Optional[float] = Field(
+        None, description="Current price in specified currency")
+    market_cap: Optional[float] = Field(
+        None, description="Market capitalization")
+    market_cap_rank: Optional[int] = Field(
+        None, description="Market cap rank, null for unranked coins")
+    total_volume: Optional[float] = Field(
+        None, description="24h trading volume")
     price_change_24h: Optional[float] = Field(
         None, description="24h price change")
     price_change_percentage_24h: Optional[float] = Field(
@@ -22,6 +25,13 @@ class CoinMarketData(BaseModel):
     last_updated: str = Field(..., description="Last update timestamp")
 
 
+class CoinMarketMetrics(CoinMarketData):
+    market_dominance: Optional[float] = Field(
+        None, description="Share of the total market cap of all returned coins (%)")
+    volume_to_market_cap_ratio: Optional[float] = Field(
+        None, description="24h trading volume divided by market cap")
+
+
 class MarketDataRequest(BaseModel):
     vs_currency: str = Field(
         default="usd",
@@ -49,6 +59,22 @@ class MarketDataResponse(BaseModel):
     total_count: int
     page: int
     per_page: int
+    stale: bool = Field(
+        False, description="True when served from stored data because "
+                           "CoinGecko is unavailable")
+    as_of: Optional[str] = Field(
+        None, description="Creation time of the stored data when stale")
+
+
+class MarketUniverseResponse(BaseModel):
+    data: List[CoinMarketMetrics]
+    total_count: int
+    pages_requested: int
+    pages_fetched: List[int]
+    failed_pages: List[int]
+    per_page: int
+    total_market_cap: float
+    partial: bool
 
 
 class ErrorResponse(BaseModel):
@@ -104,6 +104,33 @@ class CoinGeckoReporter:
             extra=error_info
         )
 
+    def on_state_change(
+        self,
+        name: str,
+        old_state: str,
+        new_state: str,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Log a circuit breaker state transition.
+
+        Args:
+            name: Name of the circuit breaker
+            old_state: State before the transition
+            new_state: State after the transition
+            details: Additional transition details (reason, failure rate)
+        """
+        self.logger.warning(
+            f"CoinGecko Circuit Breaker - {name}: {old_state} -> {new_state}",
+            extra={
+                "circuit_breaker": name,
+                "old_state": old_state,
+                "new_state": new_state,
+                "details": details or {},
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+        )
+
 
 class ReporterSingleton:
     """Singleton pattern for the CoinGecko reporter."""
@@ -26,3 +26,6 @@ class CoinPriceUpdate(BaseModel):
     market_dominance: Optional[float] = None
     volume_to_market_cap_ratio: Optional[float] = None
     last_updated: Optional[datetime] = None
+
+class CoinPriceBatchUpdate(CoinPriceUpdate):
+    id: int
@@ -1,5 +1,5 @@
 import logging
-from database.session import engine
+from database.session import get_engine
 from database.models import Base
 from database.create_db import create_database
 import sys
@@ -22,7 +22,7 @@ def init_db():
         create_database()
 
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+
+from fastapi.responses import StreamingResponse
+
+from src.core.lazy import lazy_import
+
+pl = lazy_import("polars")
+
+# Export formats and their media types
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# File name extension of each export format
+EXPORT_EXTENSIONS = {
+    "arrow": "arrows",
+    "parquet": "parquet",
+    "ndjson": "ndjson",
+    "csv": "csv",
+}
+
+# Formats written with pyarrow
+ARROW_FORMATS = ("arrow", "parquet")
+
+# Timestamps in text formats, like datetime.isoformat()
+ISO_DATETIME = "%Y-%m-%dT%H:%M:%S%.f"
+
+
+def pyarrow_available() -> bool:
+    """Whether pyarrow (the ``export`` extra) is installed."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class _ChunkSink:
+    """
+    Write-only file collecting what a pyarrow writer wrote since last drained.
+
+    tell() reports the total bytes written, as Parquet footers hold absolute
+    offsets, while only the undrained bytes are kept in memory.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def encode_frames(
+    frames: AsyncIterator[pl.DataFrame],
+    export_format: str,
+    schema: Dict[str, pl.DataType]
+) -> AsyncIterator[bytes]:
+    """
+    Encode DataFrames as one export file, chunk by chunk.
+
+    Each frame becomes an Arrow record batch, a Parquet row group or a run
+    of NDJSON/CSV lines and its bytes are yielded before the next frame is
+    read, so only one frame is held in memory. The Arrow formats need
+    pyarrow (the ``export`` extra).
+
+    Args:
+        frames: DataFrames with the columns and types of ``schema``
+        export_format: One of EXPORT_FORMATS
+        schema: Column types, used for the header even if there are no rows
+
+    Yields:
+        bytes: Encoded output, in order
+    """
+    if export_format not in ARROW_FORMATS:
+        async for data in _encode_text(frames, export_format, schema):
+            yield data
+        return
+
+    import pyarrow as pa
+
+    arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode="w")
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, arrow_schema, compression="zstd")
+    elif export_format == "arrow":
+        writer = pa.ipc.new_stream(output, arrow_schema)
+    else:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    try:
+        async for frame in frames:
+            writer.write_table(frame.to_arrow().cast(arrow_schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+async def _encode_text(
+    frames: AsyncIterator[pl.DataFrame],
+    export_format: str,
+    schema: Dict[str, pl.DataType]
+) -> AsyncIterator[bytes]:
+    """Encode DataFrames as NDJSON lines, or CSV rows after one header."""
+    if export_format == "csv":
+        # Sent right away, before the first rows are read
+        yield pl.DataFrame(schema=schema).write_csv().encode()
+    elif export_format != "ndjson":
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    async for frame in frames:
+        if frame.is_empty():
+            continue
+        frame = frame.with_columns(
+            pl.col(pl.Datetime).dt.to_string(ISO_DATETIME))
+        if export_format == "csv":
+            yield frame.write_csv(include_header=False).encode()
+        else:
+            yield frame.write_ndjson().encode()
+
+
+def export_response(
+    chunks: AsyncIterator[bytes],
+    export_format: str,
+    filename: str,
+    on_close: Callable[[], Awaitable[None]]
+) -> StreamingResponse:
+    """
+    Stream encoded chunks as a file download.
+
+    Args:
+        chunks: Output of encode_frames
+        export_format: One of EXPORT_FORMATS
+        filename: File name without extension
+        on_close: Called once the body is sent or the client went away,
+            e.g. to close the database session the rows are read with
+    """
+    async def body():
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+            await on_close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename={filename}."
+                f"{EXPORT_EXTENSIONS[export_format]}")
+        }
+    )
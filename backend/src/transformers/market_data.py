@@ -1,11 +1,223 @@
-from datetime import datetime, timezone
-import polars as pl
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import io
 from typing import List, Dict, Any
 
+from src.core.lazy import lazy_import
+
+# Loaded on first use, so importing the application does not import Polars
+pl = lazy_import("polars")
+
+# Fields of the CoinMarketData response model, in order
+MARKET_RESPONSE_COLUMNS = [
+    "id", "symbol", "name", "current_price", "market_cap", "market_cap_rank",
+    "total_volume", "price_change_24h", "price_change_percentage_24h",
+    "last_updated",
+]
+
+# Columns of the coin_prices table filled by bulk inserts, in order
+COIN_PRICE_COLUMNS = [
+    "coin_id", "symbol", "name", "current_price", "market_cap",
+    "market_cap_rank", "total_volume", "price_change_24h",
+    "price_change_percentage_24h", "market_dominance",
+    "volume_to_market_cap_ratio", "last_updated", "created_at",
+]
+
+
+@lru_cache
+def market_data_schema() -> Dict[str, pl.DataType]:
+    """
+    Explicit types of the upstream /coins/markets fields we use.
+
+    Other fields (image, roi, sparkline, ...) are dropped while parsing.
+    """
+    return {
+        "id": pl.Utf8,
+        "symbol": pl.Utf8,
+        "name": pl.Utf8,
+        "current_price": pl.Float64,
+        "market_cap": pl.Float64,
+        "market_cap_rank": pl.Int64,
+        "total_volume": pl.Float64,
+        "price_change_24h": pl.Float64,
+        "price_change_percentage_24h": pl.Float64,
+        "last_updated": pl.Utf8,
+    }
+
+
+@lru_cache
+def coin_price_schema() -> Dict[str, pl.DataType]:
+    """Types of the COIN_PRICE_COLUMNS, in order."""
+    return {
+        "coin_id": pl.Utf8,
+        "symbol": pl.Utf8,
+        "name": pl.Utf8,
+        "current_price": pl.Float64,
+        "market_cap": pl.Float64,
+        "market_cap_rank": pl.Int64,
+        "total_volume": pl.Float64,
+        "price_change_24h": pl.Float64,
+        "price_change_percentage_24h": pl.Float64,
+        "market_dominance": pl.Float64,
+        "volume_to_market_cap_ratio": pl.Float64,
+        "last_updated": pl.Datetime("us"),
+        "created_at": pl.Datetime("us"),
+    }
+
+
+# Candle resolutions of the coin_candles table and their bucket widths
+CANDLE_INTERVALS = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Columns of the coin_candles table, in order
+CANDLE_COLUMNS = [
+    "coin_id", "resolution", "bucket_start", "open", "high", "low", "close",
+    "volume", "market_cap", "open_at", "close_at", "samples",
+]
+
 
 class MarketDataTransformer:
     """Transformer class for CoinGecko market data using Polars."""
 
+    @staticmethod
+    def parse_market_data(content: bytes) -> pl.DataFrame:
+        """
+        Parse a raw /coins/markets response body into a typed DataFrame.
+
+        The body is parsed by Polars' native JSON reader against
+        market_data_schema(), without building Python objects per coin.
+
+        Args:
+            content: Raw JSON response body from CoinGecko
+
+        Returns:
+            pl.DataFrame: One row per coin with market_data_schema() columns
+        """
+        if not content.strip().strip(b"[]").strip():
+            return pl.DataFrame(schema=market_data_schema())
+        return pl.read_json(io.BytesIO(content), schema=market_data_schema())
+
+    @staticmethod
+    def add_market_metrics(df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Add market dominance, volume/market cap ratio and processing time.
+
+        Args:
+            df: Typed market data DataFrame
+
+        Returns:
+            pl.DataFrame: Market data with the calculated columns
+        """
+        return df.with_columns([
+            # Calculate market dominance (market cap / total market cap)
+            (pl.col("market_cap") / pl.col("market_cap").sum() * 100)
+            .alias("market_dominance"),
+
+            # Calculate volume to market cap ratio
+            (pl.col("total_volume") / pl.col("market_cap"))
+            .alias("volume_to_market_cap_ratio"),
+
+            # Add timestamp for when the transformation occurred
+            pl.lit(datetime.now(timezone.utc).isoformat()).alias("processed_at")
+        ])
+
+    @staticmethod
+    def to_coin_price_rows(
+        df: pl.DataFrame,
+        created_at: datetime = None
+    ) -> pl.DataFrame:
+        """
+        Shape market data into coin_prices rows for a bulk insert.
+
+        ``last_updated`` is parsed in Polars and both timestamps are naive
+        UTC, matching the table's timezone-less DateTime columns.
+
+        Args:
+            df: Market data, with or without the add_market_metrics columns
+            created_at: Insert time (defaults to now)
+
+        Returns:
+            pl.DataFrame: COIN_PRICE_COLUMNS, one row per coin
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(
+                tzinfo=None)
+
+        for column in ("market_dominance", "volume_to_market_cap_ratio"):
+            if column not in df.columns:
+                df = df.with_columns(pl.lit(None, pl.Float64).alias(column))
+
+        return df.select(
+            pl.col("id").alias("coin_id"),
+            *COIN_PRICE_COLUMNS[1:-2],
+            pl.col("last_updated")
+            .str.to_datetime(time_zone="UTC", time_unit="us")
+            .dt.replace_time_zone(None),
+            pl.lit(created_at, pl.Datetime("us")).alias("created_at"),
+        )
+
+    @staticmethod
+    def to_candle_rows(rows: pl.DataFrame) -> pl.DataFrame:
+        """
+        Aggregate coin_prices rows into OHLC candles at every resolution.
+
+        Snapshots are bucketed by ``last_updated``. Volume and market cap are
+        the last values of the bucket: CoinGecko's total_volume is already a
+        rolling 24h sum, so adding snapshots up would count it many times.
+        ``open_at``/``close_at`` and ``samples`` let candles built from
+        different batches be merged, see CoinPriceService._upsert_candles.
+
+        Args:
+            rows: COIN_PRICE_COLUMNS frame
+
+        Returns:
+            pl.DataFrame: CANDLE_COLUMNS, one row per coin, resolution and
+            bucket
+        """
+        ordered = rows.sort("last_updated")
+        candles = [
+            ordered.group_by(
+                "coin_id",
+                pl.col("last_updated").dt.truncate(width).alias("bucket_start"),
+                maintain_order=True
+            ).agg(
+                pl.col("current_price").first().alias("open"),
+                pl.col("current_price").max().alias("high"),
+                pl.col("current_price").min().alias("low"),
+                pl.col("current_price").last().alias("close"),
+                pl.col("total_volume").last().alias("volume"),
+                pl.col("market_cap").last(),
+                pl.col("last_updated").min().alias("open_at"),
+                pl.col("last_updated").max().alias("close_at"),
+                pl.len().cast(pl.Int64).alias("samples"),
+            ).with_columns(pl.lit(resolution).alias("resolution"))
+            for resolution, width in CANDLE_INTERVALS.items()
+        ]
+        return pl.concat(candles).select(CANDLE_COLUMNS)
+
+    @staticmethod
+    def to_json_rows(df: pl.DataFrame, columns: List[str]) -> bytes:
+        """
+        Serialize selected columns as a JSON array of row objects.
+
+        Args:
+            df: DataFrame to serialize
+            columns: Columns to include, in output order
+
+        Returns:
+            bytes: JSON array, e.g. b'[{"id": ...}, ...]'
+        """
+        if df.is_empty():
+            return b"[]"
+        rows = df.select(columns).write_ndjson().encode().rstrip(b"\n")
+        return b"[" + rows.replace(b"\n", b",") + b"]"
+
     @staticmethod
     def transform_market_data(raw_data: List[Dict[str, Any]]) -> pl.DataFrame:
         """
@@ -47,18 +259,7 @@ class MarketDataTransformer:
             ])
 
         # Add additional calculated columns
-        df = df.with_columns([
-            # Calculate market dominance (market cap / total market cap)
-            (pl.col("market_cap") / pl.col("market_cap").sum() * 100)
-            .alias("market_dominance"),
-
-            # Calculate volume to market cap ratio
-            (pl.col("total_volume") / pl.col("market_cap"))
-            .alias("volume_to_market_cap_ratio"),
-
-            # Add timestamp for when the transformation occurred
-            pl.lit(datetime.now(timezone.utc).isoformat()).alias("processed_at")
-        ])
+        df = MarketDataTransformer.add_market_metrics(df)
 
         # Select and order final columns
         final_columns = [
@@ -70,6 +271,34 @@ class MarketDataTransformer:
 
         return df.select(final_columns)
 
+    @staticmethod
+    def transform_market_universe(
+        pages: List[List[Dict[str, Any]]]
+    ) -> pl.DataFrame:
+        """
+        Transform several pages of market data as one universe.
+
+        Pages are concatenated and coins repeated across page boundaries
+        (ranks can shift between requests) are kept once, so market dominance
+        and ratios are computed over every coin in a single vectorized pass.
+
+        Args:
+            pages: Raw CoinGecko pages in page order
+
+        Returns:
+            pl.DataFrame: Transformed market data sorted by market cap rank
+        """
+        seen = set()
+        raw_data = []
+        for page in pages:
+            for record in page:
+                if record.get("id") not in seen:
+                    seen.add(record.get("id"))
+                    raw_data.append(record)
+
+        df = MarketDataTransformer.transform_market_data(raw_data)
+        return df.sort("market_cap_rank", nulls_last=True)
+
     @ staticmethod
     def get_market_summary(df: pl.DataFrame) -> Dict[str, Any]:
         """
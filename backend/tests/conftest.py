@@ -1,47 +1,104 @@
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep the shared upstream rate limiter out of the way of the test suite
+os.environ.setdefault("COINGECKO_RATE_LIMIT_PER_MINUTE", "60000")
+os.environ.setdefault("COINGECKO_RATE_LIMIT_BURST", "1000")
+# Probe upstream on demand only, so tests never reach the real API
+os.environ.setdefault("HEALTH_PROBE_ENABLED", "false")
+# Store market data inline, so it is in the database when a request returns
+os.environ.setdefault("WRITE_BEHIND_ENABLED", "false")
+os.environ.setdefault("PARTITION_MAINTENANCE_ENABLED", "false")
+# The test database is set up by the fixtures below
+os.environ.setdefault("DB_CREATE_ON_STARTUP", "false")
+
+from benchmarks.fake_coingecko import FakeCoinGeckoConfig, create_app
+from src.core.cache import market_data_cache
+from src.core.health import coingecko_health
+from src.core.http_client import http_client_manager
+from src.core.upstream import coingecko_circuit_breaker
+from src.database.dedup import coin_price_snapshots
+from src.database.replicas import get_read_db
 from src.database.session import get_db
+from src.ingestion import market_data
 from src.database.models import Base
 from src.main import app
 
-# Create test database
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
 
-engine = create_engine(
-    SQLALCHEMY_TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="function")
+def database_path(tmp_path):
+    """SQLite file shared by the sync test session and the app's async one."""
+    return tmp_path / "test.db"
+
 
 @pytest.fixture(scope="function")
-def db_session():
+def db_session(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    coin_price_snapshots.clear()
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
     try:
         yield db
     finally:
-        db.rollback()  # Add rollback before close
+        db.rollback()
         db.close()
-        Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture(scope="function")  # Change to function scope
-def client(db_session):
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            db_session.rollback()  # Add rollback here too
-    
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def async_session_factory(db_session, database_path):
+    """
+    Async sessions on the test database.
+
+    NullPool keeps connections from outliving the event loop that opened
+    them (tests and the TestClient each run their own loop).
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture(scope="function")
+def client(async_session_factory, monkeypatch):
+    # Ingestion and write-behind open their own sessions, outside requests
+    monkeypatch.setattr(
+        market_data, "get_async_session_factory", lambda: async_session_factory)
+
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def fake_coingecko():
+    """
+    Route upstream calls to the local fake CoinGecko app.
+
+    Request it before ``client`` so the app lifespan reuses this client.
+    """
+    fake_app = create_app(FakeCoinGeckoConfig(total_coins=250))
+    market_data_cache.clear()
+    coingecko_circuit_breaker.reset()
+    coingecko_health.reset()
+    http_client_manager.start(
+        transport=httpx.ASGITransport(app=fake_app),
+        base_url="http://fake-coingecko"
+    )
+    yield fake_app
+    market_data_cache.clear()
+    coingecko_circuit_breaker.reset()
@@ -1,35 +1,65 @@
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import Mock
-from datetime import datetime, timezone
-
-@pytest.mark.asyncio
-async def test_get_market_data(client):
-    # Create a mock response
-    mock_data = [
-        {
-            "coin_id": "test-coin",
-            "symbol": "TEST",
-            "name": "Test Coin",
-            "current_price": 100.0,
-            "market_cap": 1000000.0,
-            "market_cap_rank": 1,
-            "total_volume": 50000.0,
-            "price_change_24h": 5.0,
-            "price_change_percentage_24h": 5.0,
-            "market_dominance": 0.0,
-            "volume_to_market_cap_ratio": 0.0,
-            "last_updated": datetime.now(timezone.utc).isoformat()
-        }
-    ]
-
-    with pytest.MonkeyPatch().context() as m:
-        # Mock the external API call
-        m.setattr("src.api.coingecko.coingecko_route", lambda: mock_data)
-        
-        # Make request to your endpoint
-        response = client.get("/coingecko/markets")
-        
-        # Assert response
-        assert response.status_code == 200
-        assert "data" in response.json()
\ No newline at end of file
+
+from src.database.models import CoinLatest, CoinPrice
+
+
+def test_get_market_data(fake_coingecko, client):
+    response = client.get("/coingecko/markets?per_page=50&page=2")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] == 50
+    assert body["page"] == 2
+    assert body["data"][0]["market_cap_rank"] == 51
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_get_market_data_is_cached(fake_coingecko, client):
+    first = client.get("/coingecko/markets")
+    second = client.get("/coingecko/markets")
+
+    assert second.status_code == 200
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert fake_coingecko.state.requests == 1
+
+
+@pytest.mark.parametrize("rate_limit_rate, error_rate", [(1.0, 0.0), (0.0, 1.0)])
+def test_get_market_data_upstream_failure(
+    fake_coingecko, client, rate_limit_rate, error_rate
+):
+    fake_coingecko.state.config.rate_limit_rate = rate_limit_rate
+    fake_coingecko.state.config.error_rate = error_rate
+    fake_coingecko.state.config.retry_after = 0
+
+    response = client.get("/coingecko/markets")
+
+    assert response.status_code == 503
+
+
+def test_ping(fake_coingecko, client):
+    response = client.get("/coingecko/ping")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "CoinGecko API is operational"
+
+
+def test_get_stored_data(fake_coingecko, client):
+    client.get("/coingecko/markets", params={"per_page": 5})
+
+    response = client.get("/coingecko/stored-data")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 5
+
+
+def test_only_stored_currency_is_stored(fake_coingecko, client, db_session):
+    response = client.get(
+        "/coingecko/markets", params={"vs_currency": "eur", "per_page": 5})
+
+    assert response.status_code == 200
+    assert db_session.query(CoinPrice).count() == 0
+    assert db_session.query(CoinLatest).count() == 0
+
+    client.get("/coingecko/markets", params={"per_page": 5})
+    assert db_session.query(CoinPrice).count() == 5
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.core import cache as cache_module
+from src.core.cache import CACHE_HIT, CACHE_MISS, CACHE_STALE, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entry_goes_from_hit_to_stale_to_miss(clock):
+    cache = TTLCache(ttl=10, stale_ttl=5, max_entries=10)
+    cache.set("key", b"payload")
+
+    assert cache.get("key") == (b"payload", CACHE_HIT)
+    clock[0] += 12
+    assert cache.get("key") == (b"payload", CACHE_STALE)
+    clock[0] += 5
+    assert cache.get("key") == (None, CACHE_MISS)
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(ttl=10, stale_ttl=5, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") == (None, CACHE_MISS)
+    assert cache.get("a") == (1, CACHE_HIT)
+    assert cache.get_stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_runs_once_per_key():
+    cache = TTLCache(ttl=10, stale_ttl=5, max_entries=10)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return "fresh"
+
+    cache.refresh("key", loader)
+    cache.refresh("key", loader)
+    await asyncio.sleep(0.01)
+
+    assert calls == 1
+    assert cache.get("key") == ("fresh", CACHE_HIT)
+    assert cache.get_stats()["refreshes"] == 1
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+from src.core import circuit_breaker as breaker_module
+from src.core.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from src.core.upstream import coingecko_circuit_breaker
+from src.database.models import CoinLatest
+
+
+def _breaker(transitions=None):
+    return CircuitBreaker(
+        name="test",
+        failure_rate_threshold=0.5,
+        minimum_calls=4,
+        window_size=10,
+        open_duration=30,
+        on_state_change=lambda name, old, new, details: (
+            transitions.append((old, new)) if transitions is not None else None
+        ),
+    )
+
+
+def test_opens_when_failure_rate_reaches_threshold():
+    breaker = _breaker()
+    for _ in range(2):
+        breaker.record_success()
+        breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    try:
+        breaker.before_call()
+        raise AssertionError("expected CircuitOpenError")
+    except CircuitOpenError as e:
+        assert e.retry_after > 0
+    assert breaker.get_stats()["rejected_calls"] == 1
+
+
+def test_half_open_trial_closes_or_reopens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now[0])
+    transitions = []
+    breaker = _breaker(transitions)
+    for _ in range(4):
+        breaker.record_failure()
+
+    now[0] += 31
+    breaker.before_call()
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+    now[0] += 31
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert transitions == [
+        (STATE_CLOSED, STATE_OPEN),
+        (STATE_OPEN, STATE_HALF_OPEN),
+        (STATE_HALF_OPEN, STATE_OPEN),
+        (STATE_OPEN, STATE_HALF_OPEN),
+        (STATE_HALF_OPEN, STATE_CLOSED),
+    ]
+
+
+def _store_latest(db_session, coins):
+    """Store coin_latest rows of (rank, coin_id); created_at is returned."""
+    created_at = datetime(2024, 2, 20, 12, 0, 5)
+    for rank, coin_id in coins:
+        db_session.add(CoinLatest(
+            coin_id=coin_id, symbol=coin_id[:3], name=coin_id.title(),
+            current_price=10.0, market_cap=1000.0 / rank if rank else None,
+            market_cap_rank=rank, total_volume=5.0, price_change_24h=0.1,
+            price_change_percentage_24h=0.1,
+            last_updated=datetime(2024, 2, 20, 12, 0, tzinfo=timezone.utc),
+            created_at=created_at
+        ))
+    db_session.commit()
+    return created_at
+
+
+def test_markets_falls_back_to_stored_data_when_open(
+    fake_coingecko, client, db_session
+):
+    created_at = _store_latest(db_session, [(2, "ethereum"), (1, "bitcoin")])
+    for _ in range(coingecko_circuit_breaker.minimum_calls):
+        coingecko_circuit_breaker.record_failure()
+
+    response = client.get("/coingecko/markets")
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "FALLBACK"
+    body = response.json()
+    assert body["stale"] is True
+    assert body["as_of"] == created_at.isoformat()
+    assert [coin["id"] for coin in body["data"]] == ["bitcoin", "ethereum"]
+    assert fake_coingecko.state.requests == 0
+    assert client.get("/metrics/circuit-breaker").json()["state"] == "open"
+
+
+def test_upstream_500s_open_the_circuit(fake_coingecko, client, db_session):
+    _store_latest(db_session, [(1, "bitcoin"), (None, "unranked")])
+    fake_coingecko.state.config.error_rate = 1.0
+
+    for _ in range(coingecko_circuit_breaker.minimum_calls):
+        assert client.get("/coingecko/markets").status_code == 503
+
+    stats = client.get("/metrics/circuit-breaker").json()
+    assert stats["state"] == "open"
+    assert stats["failure_rate"] == 1.0
+    response = client.get("/coingecko/markets")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "FALLBACK"
+    data = response.json()["data"]
+    assert [coin["id"] for coin in data] == ["bitcoin", "unranked"]
+    assert data[1]["market_cap"] is None
+    assert data[1]["market_cap_rank"] is None
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from src.core.coalescing import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"payload"
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+
+    assert calls == 1
+    assert results == [b"payload"] * 10
+    assert flight.get_stats() == {
+        "in_flight": 0, "leaders": 1, "followers": 9, "errors": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_error_is_propagated_to_all_callers():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        *(flight.do("key", fetch) for _ in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.get_stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
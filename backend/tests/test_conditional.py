@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from src.core.conditional import (
+    Validators,
+    cache_control,
+    is_not_modified,
+    make_etag,
+    validator_cache,
+)
+from src.database.models import CoinLatest
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(k.replace("_", "-").encode(), v.encode())
+                    for k, v in headers.items()],
+    })
+
+
+@pytest.fixture(autouse=True)
+def clear_validators():
+    validator_cache.clear()
+    yield
+    validator_cache.clear()
+
+
+def test_if_none_match_uses_weak_comparison():
+    validators = Validators(etag=make_etag("a"), cache_control="no-cache")
+    opaque = validators.etag[2:]
+
+    assert is_not_modified(make_request(if_none_match=opaque), validators)
+    assert is_not_modified(
+        make_request(if_none_match=f'"other", {validators.etag}'), validators)
+    assert is_not_modified(make_request(if_none_match="*"), validators)
+    assert not is_not_modified(
+        make_request(if_none_match=make_etag("b")), validators)
+
+
+def test_if_modified_since_is_ignored_with_if_none_match():
+    validators = Validators(
+        etag=make_etag("a"),
+        cache_control="no-cache",
+        last_modified=datetime(2024, 2, 20, 12, 0, 0, 500000)
+    )
+    since = "Tue, 20 Feb 2024 12:00:00 GMT"
+
+    assert is_not_modified(make_request(if_modified_since=since), validators)
+    assert not is_not_modified(
+        make_request(if_modified_since="Tue, 20 Feb 2024 11:59:59 GMT"),
+        validators)
+    assert not is_not_modified(
+        make_request(if_modified_since=since, if_none_match='"other"'),
+        validators)
+    assert not is_not_modified(
+        make_request(if_modified_since="yesterday"), validators)
+
+
+def test_cache_control():
+    assert cache_control(4.7) == "public, max-age=4"
+    assert cache_control(-1, 30) == (
+        "public, max-age=0, stale-while-revalidate=30")
+
+
+def test_market_data_revalidates_with_etag(fake_coingecko, client):
+    first = client.get("/coingecko/markets")
+    etag = first.headers["ETag"]
+
+    second = client.get(
+        "/coingecko/markets", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert second.headers["X-Cache"] == "HIT"
+    assert "max-age=" in first.headers["Cache-Control"]
+    assert fake_coingecko.state.requests == 1
+
+
+def _store_latest(db_session, price):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db_session.merge(CoinLatest(
+        coin_id="test-coin", symbol="TEST", name="Test Coin",
+        current_price=price, market_cap=1000.0, market_cap_rank=1,
+        total_volume=5.0, price_change_24h=0.1,
+        price_change_percentage_24h=0.1,
+        last_updated=now, created_at=now
+    ))
+    db_session.commit()
+
+
+def test_stored_data_revalidates(client, db_session):
+    _store_latest(db_session, 100.0)
+    first = client.get("/coingecko/stored-data")
+    etag = first.headers["ETag"]
+
+    assert first.headers["Cache-Control"] == "public, max-age=5"
+    assert "Last-Modified" in first.headers
+    assert client.get(
+        "/coingecko/stored-data",
+        headers={"If-None-Match": etag}).status_code == 304
+
+    # Answered from the remembered validators, the new row is not seen yet
+    _store_latest(db_session, 200.0)
+    assert client.get(
+        "/coingecko/stored-data",
+        headers={"If-None-Match": etag}).status_code == 304
+
+    validator_cache.clear()
+    changed = client.get(
+        "/coingecko/stored-data", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["data"][0]["current_price"] == 200.0
+
+
+def test_coin_revalidates_without_database(client, db_session):
+    _store_latest(db_session, 100.0)
+    first = client.get("/db/coins/test-coin")
+    hits = validator_cache.get_stats()["hits"]
+
+    second = client.get(
+        "/db/coins/test-coin", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 304
+    assert validator_cache.get_stats()["hits"] == hits + 1
+    assert client.get("/db/coins/other").status_code == 404
+
+
+def _price(price, minute):
+    return {
+        "coin_id": "test-coin", "symbol": "TEST", "name": "Test Coin",
+        "current_price": price, "market_cap": 1000.0, "market_cap_rank": 1,
+        "total_volume": 5.0, "price_change_24h": 0.1,
+        "price_change_percentage_24h": 0.1,
+        "last_updated": f"2024-02-20T12:{minute:02d}:00",
+    }
+
+
+def test_writes_forget_remembered_validators(client, db_session):
+    client.post("/db/coins", json=_price(100.0, 0))
+    coin_etag = client.get("/db/coins/test-coin").headers["ETag"]
+    stored_etag = client.get("/coingecko/stored-data").headers["ETag"]
+
+    def revalidate():
+        coin = client.get(
+            "/db/coins/test-coin", headers={"If-None-Match": coin_etag})
+        stored = client.get(
+            "/coingecko/stored-data", headers={"If-None-Match": stored_etag})
+        return coin, stored
+
+    writes = [
+        lambda: client.post("/db/coins", json=_price(200.0, 1)),
+        lambda: client.put("/db/coins/test-coin", json={"current_price": 300.0}),
+        lambda: client.post("/db/coins/batch", json=[_price(400.0, 2)]),
+        lambda: client.delete("/db/coins/test-coin"),
+    ]
+    for write in writes:
+        assert all(r.status_code == 304 for r in revalidate())
+
+        assert write().status_code == 200
+        coin, stored = revalidate()
+        assert coin.status_code == 200
+        assert stored.status_code == 200
+        coin_etag, stored_etag = coin.headers["ETag"], stored.headers["ETag"]
+
+
+def test_ingestion_forgets_stored_data_validators(fake_coingecko, client):
+    client.get("/coingecko/markets", params={"per_page": 5})
+    etag = client.get("/coingecko/stored-data").headers["ETag"]
+
+    # Stores a sixth coin
+    client.get("/coingecko/markets", params={"per_page": 6})
+
+    response = client.get(
+        "/coingecko/stored-data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["count"] == 6
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
 
+from src.database.models import CoinPrice
+
 
 def test_create_coin_price(client, db_session):
     test_data = {
@@ -39,11 +41,12 @@ def test_read_coin_price(client, db_session):
         "volume_to_market_cap_ratio": 0.0,
         "last_updated": datetime.now(timezone.utc).isoformat()
     }
-    client.post("/db/coins", json=test_data)
+    created = client.post("/db/coins", json=test_data).json()["data"]
 
     response = client.get("/db/coins/test-coin")
     assert response.status_code == 200
     assert response.json()["coin_id"] == "test-coin"
+    assert response.json()["id"] == created["id"]
 
 
 def test_update_coin_price(client, db_session):
@@ -98,3 +101,255 @@ def test_delete_coin_price(client, db_session):
     # Verify deletion
     get_response = client.get("/db/coins/test-coin")
     assert get_response.status_code == 404
+
+
+def test_create_coin_price_stores_naive_utc(client, db_session):
+    test_data = {
+        "coin_id": "test-coin",
+        "symbol": "TEST",
+        "name": "Test Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": "2024-02-20T14:00:00+02:00"
+    }
+
+    response = client.post("/db/coins", json=test_data)
+
+    assert response.status_code == 200
+    data = client.get("/db/coins/test-coin").json()
+    assert data["last_updated"] == "2024-02-20T12:00:00"
+    assert datetime.fromisoformat(data["created_at"]).tzinfo is None
+
+
+def test_create_duplicate_snapshot_conflicts(client, db_session):
+    test_data = {
+        "coin_id": "test-coin",
+        "symbol": "TEST",
+        "name": "Test Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": "2024-02-20T12:00:00+00:00"
+    }
+
+    assert client.post("/db/coins", json=test_data).status_code == 200
+    assert client.post("/db/coins", json=test_data).status_code == 409
+
+
+def test_read_returns_newest_record_after_delete_falls_back(client, db_session):
+    test_data = {
+        "coin_id": "test-coin",
+        "symbol": "TEST",
+        "name": "Test Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": "2024-02-20T13:00:00+00:00"
+    }
+    newest = client.post("/db/coins", json=test_data).json()["data"]
+    older = client.post("/db/coins", json={
+        **test_data,
+        "current_price": 80.0,
+        "last_updated": "2024-02-20T12:00:00+00:00"
+    }).json()["data"]
+
+    data = client.get("/db/coins/test-coin").json()
+    assert data["current_price"] == 100.0
+    assert data["id"] == newest["id"]
+
+    client.delete("/db/coins/test-coin")
+
+    data = client.get("/db/coins/test-coin").json()
+    assert data["id"] == older["id"]
+    assert data["current_price"] == 80.0
+    assert data["last_updated"] == "2024-02-20T12:00:00"
+
+
+def test_read_coin_candles(client, db_session):
+    test_data = {
+        "coin_id": "test-coin",
+        "symbol": "TEST",
+        "name": "Test Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": "2024-02-20T12:10:00+00:00"
+    }
+    for minute, price in [(10, 100.0), (40, 120.0), (20, 90.0)]:
+        client.post("/db/coins", json={
+            **test_data,
+            "current_price": price,
+            "last_updated": f"2024-02-20T12:{minute}:00+00:00"
+        })
+
+    response = client.get(
+        "/db/coins/test-coin/candles", params={"interval": "1h"})
+
+    assert response.status_code == 200
+    assert response.json()["data"] == [{
+        "bucket_start": "2024-02-20T12:00:00",
+        "open": 100.0,
+        "high": 120.0,
+        "low": 90.0,
+        "close": 120.0,
+        "volume": 50000.0,
+        "market_cap": 1000000.0,
+        "samples": 3,
+    }]
+    assert client.get(
+        "/db/coins/test-coin/candles", params={"interval": "5m"}
+    ).status_code == 422
+
+
+def _store_history(db_session, created_ats):
+    for index, created_at in enumerate(created_ats):
+        db_session.add(CoinPrice(
+            coin_id="test-coin", symbol="TEST", name="Test Coin",
+            current_price=100.0 + index, market_cap=1000.0,
+            market_cap_rank=1, total_volume=5.0, price_change_24h=0.1,
+            price_change_percentage_24h=0.1,
+            last_updated=datetime(2024, 2, 20, 12, index),
+            created_at=created_at
+        ))
+    db_session.commit()
+
+
+def test_read_coin_history_pages_with_cursor(client, db_session):
+    # Two snapshots share a created_at, the id breaks the tie
+    _store_history(db_session, [
+        datetime(2024, 2, 20, 12, 0), datetime(2024, 2, 20, 12, 1),
+        datetime(2024, 2, 20, 12, 1), datetime(2024, 2, 20, 12, 2),
+        datetime(2024, 2, 20, 12, 3),
+    ])
+
+    prices, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "current_price"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/db/coins/test-coin/history", params=params).json()
+        prices += [row["current_price"] for row in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert prices == [104.0, 103.0, 102.0, 101.0, 100.0]
+    assert set(body["data"][0]) == {"id", "created_at", "current_price"}
+
+
+def test_read_coin_history_time_range_and_order(client, db_session):
+    _store_history(db_session, [
+        datetime(2024, 2, 20, 12, minute) for minute in range(4)])
+
+    response = client.get("/db/coins/test-coin/history", params={
+        "start": "2024-02-20T12:01:00",
+        "end": "2024-02-20T12:03:00",
+        "order": "asc",
+    })
+
+    assert [row["current_price"] for row in response.json()["data"]] == [
+        101.0, 102.0]
+
+
+def test_read_coin_history_rejects_bad_parameters(client, db_session):
+    url = "/db/coins/test-coin/history"
+
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(url, params={"fields": "secret"}).status_code == 400
+
+
+def _batch_item(coin_id, minute, price=100.0):
+    return {
+        "coin_id": coin_id, "symbol": coin_id.upper(), "name": coin_id,
+        "current_price": price, "market_cap": 1000.0, "market_cap_rank": 1,
+        "total_volume": 5.0, "price_change_24h": 0.1,
+        "price_change_percentage_24h": 0.1,
+        "last_updated": f"2024-02-20T12:{minute:02d}:00+00:00",
+    }
+
+
+def test_batch_create_reports_each_item(client, db_session):
+    client.post("/db/coins", json=_batch_item("coin-a", 0))
+
+    response = client.post("/db/coins/batch", json=[
+        _batch_item("coin-a", 0),
+        _batch_item("coin-a", 1),
+        _batch_item("coin-b", 1),
+        _batch_item("coin-b", 1),
+    ])
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["created"] == 2
+    assert [r["status"] for r in body["results"]] == [
+        "conflict", "created", "created", "conflict"]
+    assert body["results"][1]["data"]["id"] is not None
+    assert db_session.query(CoinPrice).count() == 3
+    assert client.get("/db/coins/coin-b").json()["current_price"] == 100.0
+
+
+def test_batch_update_and_delete_by_id(client, db_session):
+    created = client.post("/db/coins/batch", json=[
+        _batch_item("coin-a", 0), _batch_item("coin-a", 1),
+    ]).json()["results"]
+    first, second = (r["data"]["id"] for r in created)
+
+    response = client.put("/db/coins/batch", json=[
+        {"id": second, "current_price": 250.0},
+        {"id": second, "current_price": 1.0},
+        {"id": 999999, "current_price": 1.0},
+    ])
+    body = response.json()
+    assert body["updated"] == 1
+    assert [r["status"] for r in body["results"]] == [
+        "updated", "duplicate", "not_found"]
+    assert body["results"][0]["data"]["current_price"] == 250.0
+    assert client.get("/db/coins/coin-a").json()["current_price"] == 250.0
+
+    response = client.request(
+        "DELETE", "/db/coins/batch", json=[second, 999999])
+    body = response.json()
+    assert body["deleted"] == 1
+    assert [r["status"] for r in body["results"]] == ["deleted", "not_found"]
+    assert [p.id for p in db_session.query(CoinPrice).all()] == [first]
+    # coin_latest falls back to the remaining record
+    assert client.get("/db/coins/coin-a").json()["current_price"] == 100.0
+
+
+def test_batch_rejects_oversized_batches(client, db_session, monkeypatch):
+    from src.api import database_operations
+
+    monkeypatch.setattr(database_operations.settings, "DB_BATCH_MAX_SIZE", 1)
+
+    response = client.post("/db/coins/batch", json=[
+        _batch_item("coin-a", 0), _batch_item("coin-a", 1)])
+
+    assert response.status_code == 413
+    assert db_session.query(CoinPrice).count() == 0
+
+
+def test_read_returns_id_of_ingested_record(fake_coingecko, client, db_session):
+    client.get("/coingecko/markets", params={"per_page": 3})
+    stored = db_session.query(CoinPrice).first()
+
+    data = client.get(f"/db/coins/{stored.coin_id}").json()
+
+    assert data["id"] == stored.id
+    response = client.put("/db/coins/batch", json=[
+        {"id": data["id"], "current_price": 1.0}])
+    assert response.json()["updated"] == 1
+    assert client.get(
+        f"/db/coins/{stored.coin_id}").json()["current_price"] == 1.0
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.database.pool import PoolMonitor
+from src.database.session import engine_options
+
+
+@pytest.mark.parametrize("url, connect_args", [
+    ("postgresql+asyncpg://db/coingecko",
+     {"server_settings": {"statement_timeout": "30000"}}),
+    ("postgresql://db/coingecko",
+     {"options": "-c statement_timeout=30000"}),
+])
+def test_engine_options_for_postgresql(url, connect_args):
+    options = engine_options(url)
+
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == connect_args
+
+
+def test_engine_options_for_sqlite_skip_pool_sizing():
+    options = engine_options("sqlite+aiosqlite:///./test.db")
+
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+
+@pytest.mark.asyncio
+async def test_monitor_reports_checkouts_and_timeouts(database_path):
+    monitor = PoolMonitor("test")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}",
+        poolclass=monitor.pool_class(AsyncAdaptedQueuePool),
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    monitor.attach(engine.sync_engine)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            assert monitor.get_stats()["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    stats = monitor.get_stats()
+    assert stats["checkouts"] == 1
+    assert stats["connects"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 50
+
+
+def test_db_pool_metrics(client):
+    response = client.get("/metrics/db-pool")
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "primary"
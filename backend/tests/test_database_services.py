@@ -0,0 +1,182 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from benchmarks.fake_coingecko import FakeCoinGeckoConfig, synthetic_coin
+from src.database.dedup import coin_price_snapshots
+from src.database.models import CoinCandle, CoinLatest, CoinPrice
+from src.database.services import CoinPriceService
+from src.database.session import to_async_url
+from src.transformers.market_data import MarketDataTransformer
+
+
+def _market_frame(count, bucket=1):
+    config = FakeCoinGeckoConfig()
+    body = json.dumps([
+        synthetic_coin(rank, "usd", bucket, config)
+        for rank in range(1, count + 1)
+    ]).encode()
+    transformer = MarketDataTransformer()
+    return transformer.add_market_metrics(transformer.parse_market_data(body))
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_stores_frame_rows(db_session, async_session_factory):
+    created_at = datetime(2024, 2, 20, 12, 0, 5)
+    df = _market_frame(3)
+    rows = MarketDataTransformer.to_coin_price_rows(df, created_at=created_at)
+
+    async with async_session_factory() as db:
+        inserted = await CoinPriceService.bulk_insert_coin_prices(db, rows)
+
+    assert inserted == 3
+    stored = (
+        db_session.query(CoinPrice).order_by(CoinPrice.market_cap_rank).all()
+    )
+    assert [row.coin_id for row in stored] == ["coin-1", "coin-2", "coin-3"]
+    first = df.row(0, named=True)
+    assert stored[0].current_price == first["current_price"]
+    assert stored[0].market_dominance == pytest.approx(first["market_dominance"])
+    assert stored[0].last_updated == datetime(1970, 1, 1, 0, 1)
+    assert all(row.created_at == created_at for row in stored)
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_skips_empty_frame(db_session, async_session_factory):
+    rows = MarketDataTransformer.to_coin_price_rows(
+        MarketDataTransformer.parse_market_data(b"[]"))
+
+    async with async_session_factory() as db:
+        assert await CoinPriceService.bulk_insert_coin_prices(db, rows) == 0
+    assert db_session.query(CoinPrice).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_skips_unchanged_snapshots(
+    db_session, async_session_factory
+):
+    rows = MarketDataTransformer.to_coin_price_rows(_market_frame(3))
+    newer = MarketDataTransformer.to_coin_price_rows(_market_frame(3, bucket=2))
+    # Counters are kept across tests
+    before = coin_price_snapshots.get_stats()
+
+    async with async_session_factory() as db:
+        assert await CoinPriceService.bulk_insert_coin_prices(db, rows) == 3
+        # Filtered in memory
+        assert await CoinPriceService.bulk_insert_coin_prices(db, rows) == 0
+        # Found in the table, e.g. after a restart
+        coin_price_snapshots.clear()
+        assert await CoinPriceService.bulk_insert_coin_prices(db, rows) == 0
+        assert await CoinPriceService.bulk_insert_coin_prices(db, newer) == 3
+
+    assert db_session.query(CoinPrice).count() == 6
+    stats = coin_price_snapshots.get_stats()
+    assert stats["rows_skipped_cached"] - before["rows_skipped_cached"] == 3
+    assert stats["rows_skipped_existing"] - before["rows_skipped_existing"] == 3
+
+
+@pytest.mark.asyncio
+async def test_latest_snapshot_returns_newest_row_per_coin(
+    db_session, async_session_factory
+):
+    async with async_session_factory() as db:
+        for minute in (1, 2):
+            await CoinPriceService.bulk_insert_coin_prices(
+                db, MarketDataTransformer.to_coin_price_rows(
+                    _market_frame(2, bucket=minute),
+                    created_at=datetime(2024, 2, 20, 12, minute)))
+
+        snapshot = await CoinPriceService.get_latest_snapshot(db, limit=10)
+
+    assert [row.coin_id for row in snapshot] == ["coin-1", "coin-2"]
+    assert {row.created_at for row in snapshot} == {datetime(2024, 2, 20, 12, 2)}
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_keeps_coin_latest_current(
+    db_session, async_session_factory
+):
+    older = MarketDataTransformer.to_coin_price_rows(_market_frame(2))
+    newer = MarketDataTransformer.to_coin_price_rows(_market_frame(2, bucket=2))
+
+    async with async_session_factory() as db:
+        await CoinPriceService.bulk_insert_coin_prices(db, newer)
+        # An older batch arriving late does not move coin_latest back
+        coin_price_snapshots.clear()
+        await CoinPriceService.bulk_insert_coin_prices(db, older)
+        latest = await CoinPriceService.get_coin_latest(db, "coin-1")
+
+    assert db_session.query(CoinLatest).count() == 2
+    assert latest.last_updated == newer["last_updated"][0]
+
+
+@pytest.mark.asyncio
+async def test_candles_merge_batches_in_any_order(
+    db_session, async_session_factory
+):
+    frames = {bucket: _market_frame(1, bucket=bucket) for bucket in (1, 2, 3)}
+    prices = [frames[bucket]["current_price"][0] for bucket in (1, 2, 3)]
+
+    def hourly_candle():
+        db_session.expire_all()
+        return db_session.query(CoinCandle).filter_by(
+            coin_id="coin-1", resolution="1h").one()
+
+    async with async_session_factory() as db:
+        for bucket in (3, 1, 2):
+            coin_price_snapshots.clear()
+            await CoinPriceService.bulk_insert_coin_prices(
+                db, MarketDataTransformer.to_coin_price_rows(frames[bucket]))
+        incremental = hourly_candle()
+        incremental = (incremental.open, incremental.high, incremental.low,
+                       incremental.close, incremental.samples)
+
+        assert await CoinPriceService.rebuild_candles(db) == 3
+        await db.commit()
+
+    assert incremental == (prices[0], max(prices), min(prices), prices[2], 3)
+    rebuilt = hourly_candle()
+    assert (rebuilt.open, rebuilt.high, rebuilt.low, rebuilt.close,
+            rebuilt.samples) == incremental
+    assert db_session.query(CoinCandle).filter_by(resolution="1m").count() == 3
+
+
+class _RecordingSession:
+    """Just enough of an AsyncSession to see the statements sent."""
+
+    def __init__(self, dialect):
+        self.dialect = type("Dialect", (), {"name": dialect})()
+        self.executed = []
+
+    def get_bind(self):
+        return self
+
+    async def execute(self, statement, params=None):
+        self.executed.append((str(statement), params))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_inserts_lock_coins_in_order():
+    db = _RecordingSession("postgresql")
+
+    await CoinPriceService._lock_snapshots(db, ["solana", "bitcoin"])
+
+    [(sql, params)] = db.executed
+    assert "pg_advisory_xact_lock" in sql
+    assert params["coin_ids"] == ["bitcoin", "solana"]
+
+    sqlite = _RecordingSession("sqlite")
+    await CoinPriceService._lock_snapshots(sqlite, ["bitcoin"])
+    assert sqlite.executed == []
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://user:secret@db:5432/coingecko",
+     "postgresql+asyncpg://user:secret@db:5432/coingecko"),
+    ("postgresql+psycopg2://user@db/coingecko",
+     "postgresql+asyncpg://user@db/coingecko"),
+    ("sqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+])
+def test_to_async_url(url, expected):
+    assert to_async_url(url) == expected
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from src.database import services
+from src.database.models import CoinLatest, CoinPrice
+from src.transformers import export
+from src.transformers.market_data import COIN_PRICE_COLUMNS
+
+
+def _store_prices(db_session, count):
+    for index in range(count):
+        db_session.add(CoinPrice(
+            coin_id="coin-a" if index % 2 else "coin-b",
+            symbol="TEST", name="Test Coin",
+            current_price=float(index), market_cap=1000.0,
+            market_cap_rank=1, total_volume=5.0, price_change_24h=0.1,
+            price_change_percentage_24h=0.1,
+            last_updated=datetime(2024, 2, 20, 12, index),
+            created_at=datetime(2024, 2, 20, 12, index)
+        ))
+    db_session.commit()
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(services, "EXPORT_CHUNK", 2)
+
+
+@pytest.fixture
+def pa():
+    return pytest.importorskip("pyarrow")
+
+
+def test_export_arrow_stream_in_chunks(client, db_session, small_chunks, pa):
+    _store_prices(db_session, 5)
+
+    response = client.get("/db/export", params={
+        "format": "arrow", "fields": "coin_id,current_price"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == export.EXPORT_FORMATS["arrow"]
+    reader = pa.ipc.open_stream(response.content)
+    batches = list(reader)
+    table = pa.Table.from_batches(batches)
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert table.column_names == ["id", "created_at", "coin_id", "current_price"]
+    assert table["current_price"].to_pylist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_export_parquet_with_filters(client, db_session, small_chunks, pa):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _store_prices(db_session, 6)
+
+    response = client.get("/db/export", params={
+        "coin_ids": "coin-a",
+        "start": "2024-02-20T12:02:00",
+        "end": "2024-02-20T12:06:00",
+    })
+
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 1
+    table = parquet.read()
+    assert table["coin_id"].to_pylist() == ["coin-a", "coin-a"]
+    assert table["current_price"].to_pylist() == [3.0, 5.0]
+
+
+def test_export_without_rows_has_schema(client, db_session, pa):
+    response = client.get("/db/export", params={"format": "arrow"})
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 0
+    assert table.column_names == ["id", "created_at"] + [
+        column for column in COIN_PRICE_COLUMNS if column != "created_at"]
+
+
+def test_export_needs_pyarrow(client, db_session, monkeypatch):
+    from src.api import database_operations
+
+    monkeypatch.setattr(
+        database_operations, "pyarrow_available", lambda: False)
+
+    assert client.get("/db/export").status_code == 501
+    assert client.get("/db/export?format=csv").status_code == 200
+
+
+def test_export_ndjson(client, db_session, small_chunks):
+    _store_prices(db_session, 3)
+
+    response = client.get("/db/export", params={
+        "format": "ndjson", "fields": "current_price"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["current_price"] for line in lines] == [0.0, 1.0, 2.0]
+    assert lines[0]["created_at"] == "2024-02-20T12:00:00"
+
+
+def _store_latest(db_session, count):
+    for rank in range(1, count + 1):
+        db_session.add(CoinLatest(
+            coin_id=f"coin-{rank}", symbol="TEST", name="Test Coin",
+            current_price=float(rank), market_cap=1000.0,
+            market_cap_rank=count + 1 - rank, total_volume=5.0,
+            price_change_24h=0.1, price_change_percentage_24h=0.1,
+            last_updated=datetime(2024, 2, 20, 12),
+            created_at=datetime(2024, 2, 20, 12)
+        ))
+    db_session.commit()
+
+
+def test_stored_data_streams_ndjson(client, db_session, small_chunks):
+    _store_latest(db_session, 15)
+
+    response = client.get("/coingecko/stored-data", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # Every coin, not only the first 10 of the JSON response
+    assert len(rows) == 15
+    assert [row["market_cap_rank"] for row in rows] == list(range(1, 16))
+    assert set(rows[0]) == set(COIN_PRICE_COLUMNS)
+
+
+def test_stored_data_streams_csv(client, db_session, small_chunks):
+    response = client.get("/coingecko/stored-data", params={"format": "csv"})
+    assert response.text == ",".join(COIN_PRICE_COLUMNS) + "\n"
+
+    _store_latest(db_session, 3)
+    response = client.get("/coingecko/stored-data", params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "stored_data.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["coin_id"] for row in rows] == ["coin-3", "coin-2", "coin-1"]
+    assert rows[0]["last_updated"] == "2024-02-20T12:00:00"
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from src.core.health import (
+    STATUS_DOWN,
+    STATUS_UNKNOWN,
+    STATUS_UP,
+    UpstreamHealthProbe,
+)
+
+
+def test_probe_records_status_latency_and_last_success():
+    outcomes = [None, RuntimeError("boom")]
+
+    async def probe():
+        outcome = outcomes.pop(0)
+        if outcome is not None:
+            raise outcome
+
+    async def scenario():
+        health = UpstreamHealthProbe(probe, interval=30, max_age=90)
+        assert health.status == STATUS_UNKNOWN
+        assert await health.check() == STATUS_UP
+        last_success = health.last_success_at
+        assert await health.check() == STATUS_DOWN
+        return health, last_success
+
+    health, last_success = asyncio.run(scenario())
+
+    status = health.get_status()
+    assert status["status"] == STATUS_DOWN
+    assert status["last_error"] == "boom"
+    assert status["consecutive_failures"] == 1
+    assert status["checks"] == 2
+    assert status["last_latency_ms"] is not None
+    assert health.last_success_at == last_success
+
+
+def test_ensure_fresh_reuses_recent_result_and_shares_probe():
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        health = UpstreamHealthProbe(probe, interval=30, max_age=90)
+        await asyncio.gather(*(health.ensure_fresh() for _ in range(5)))
+        await health.ensure_fresh()
+        health.max_age = 0
+        await asyncio.sleep(0.001)
+        await health.ensure_fresh()
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 2
+
+
+def test_ping_answers_from_cached_probe(fake_coingecko, client):
+    for _ in range(3):
+        response = client.get("/coingecko/ping")
+        assert response.status_code == 200
+
+    assert fake_coingecko.state.requests == 1
+
+
+def test_ping_reports_unavailable_upstream(fake_coingecko, client):
+    fake_coingecko.state.config.error_rate = 1.0
+
+    response = client.get("/coingecko/ping")
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["details"]["last_success_at"] is None
+
+
+@pytest.mark.parametrize("path", ["/health", "/health/ready"])
+def test_health_does_not_call_upstream(fake_coingecko, client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.json()["coingecko"]["status"] == STATUS_UNKNOWN
+    assert fake_coingecko.state.requests == 0
+
+
+def test_readiness_checks_database(client):
+    body = client.get("/health/ready").json()
+
+    assert body["status"] == "ready"
+    assert body["database"] == {"status": STATUS_UP}
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+from src.core.http_client import HTTPClientManager
+
+
+def _transport():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/ping"):
+            return httpx.Response(200, json={"gecko_says": "(V3) To the Moon!"})
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_between_requests():
+    manager = HTTPClientManager()
+    client = manager.start(transport=_transport(), base_url="http://upstream")
+
+    await manager.get("/ping")
+    await manager.get("/ping")
+
+    assert manager.get_client() is client
+    stats = manager.get_stats()
+    assert stats["started"] is True
+    assert stats["requests_total"] == 2
+    assert stats["errors_total"] == 0
+    assert stats["in_flight"] == 0
+
+    await manager.close()
+    assert manager.get_stats()["started"] is False
+
+
+@pytest.mark.asyncio
+async def test_error_responses_are_counted():
+    manager = HTTPClientManager()
+    manager.start(transport=_transport(), base_url="http://upstream")
+
+    response = await manager.get("/missing")
+
+    assert response.status_code == 404
+    assert manager.get_stats()["errors_total"] == 1
+    await manager.close()
+
+
+def test_http_client_stats_endpoint(client):
+    response = client.get("/metrics/http-client")
+    assert response.status_code == 200
+    assert response.json()["started"] is True
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from src.ingestion.scheduler import (
+    IngestionJob,
+    IngestionScheduler,
+    parse_page_range,
+)
+
+
+def test_parse_page_range():
+    assert parse_page_range("1") == [1]
+    assert parse_page_range("1-3") == [1, 2, 3]
+    assert parse_page_range("5, 1-2, 2") == [1, 2, 5]
+
+
+@pytest.mark.asyncio
+async def test_tick_runs_every_job_and_records_timing():
+    calls = []
+
+    async def runner(vs_currency, page, per_page, sparkline):
+        calls.append((vs_currency, page, per_page, sparkline))
+
+    scheduler = IngestionScheduler(
+        jobs=[IngestionJob("usd", 1, 100), IngestionJob("eur", 1, 100)],
+        interval=60, jitter=0, job_timeout=1, runner=runner
+    )
+    await asyncio.gather(*scheduler.tick())
+
+    assert sorted(calls) == [("eur", 1, 100, False), ("usd", 1, 100, False)]
+    job = scheduler.get_status()["jobs"][0]
+    assert job["runs"] == 1
+    assert job["last_success_at"] is not None
+    assert job["last_duration"] is not None
+
+
+@pytest.mark.asyncio
+async def test_overlapping_runs_are_skipped():
+    release = asyncio.Event()
+
+    async def runner(vs_currency, page, per_page, sparkline):
+        await release.wait()
+
+    job = IngestionJob("usd", 1, 100)
+    scheduler = IngestionScheduler(
+        jobs=[job], interval=60, jitter=0, job_timeout=1, runner=runner
+    )
+    first = scheduler.tick()
+    await asyncio.sleep(0)
+    assert scheduler.tick() == []
+    release.set()
+    await asyncio.gather(*first)
+
+    assert (job.runs, job.skipped) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_recorded():
+    async def runner(vs_currency, page, per_page, sparkline):
+        await asyncio.sleep(1)
+
+    job = IngestionJob("usd", 1, 100)
+    scheduler = IngestionScheduler(
+        jobs=[job], interval=60, jitter=0, job_timeout=0.01, runner=runner
+    )
+    await asyncio.gather(*scheduler.tick())
+
+    assert job.failures == 1
+    assert job.last_error == "TimeoutError"
+    assert job.running is False
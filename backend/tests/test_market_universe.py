@@ -0,0 +1,103 @@
+import time
+
+import httpx
+import pytest
+
+from src.core.cache import market_data_cache
+from src.core.http_client import http_client_manager
+from src.transformers.market_data import MarketDataTransformer
+
+
+def _coin(rank, market_cap):
+    return {
+        "id": f"coin-{rank}",
+        "symbol": f"c{rank}",
+        "name": f"Coin {rank}",
+        "current_price": 1.0,
+        "market_cap": market_cap,
+        "market_cap_rank": rank,
+        "total_volume": market_cap / 10,
+        "price_change_24h": 0.0,
+        "price_change_percentage_24h": 0.0,
+        "last_updated": "2024-02-20T12:00:00.000Z",
+    }
+
+
+PAGES = {
+    1: [_coin(1, 600.0), _coin(2, 200.0)],
+    2: [_coin(3, 150.0), _coin(4, 50.0)],
+}
+
+
+@pytest.fixture
+def upstream():
+    failing_pages = set()
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        if page in failing_pages:
+            return httpx.Response(404)
+        return httpx.Response(200, json=PAGES.get(page, []))
+
+    market_data_cache.clear()
+    # Started before the app lifespan, which then reuses this client
+    http_client_manager.start(
+        transport=httpx.MockTransport(handler), base_url="http://upstream")
+    yield failing_pages
+    market_data_cache.clear()
+
+
+def test_dominance_is_computed_over_all_pages():
+    df = MarketDataTransformer.transform_market_universe(
+        [PAGES[1], PAGES[2] + [PAGES[1][1]]])
+
+    assert df["id"].to_list() == ["coin-1", "coin-2", "coin-3", "coin-4"]
+    assert df["market_dominance"].to_list() == [60.0, 20.0, 15.0, 5.0]
+
+
+def test_universe_endpoint_fetches_all_pages(upstream, client):
+    response = client.get("/coingecko/markets/universe?pages=2&per_page=2")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] == 4
+    assert body["pages_fetched"] == [1, 2]
+    assert body["total_market_cap"] == 1000.0
+    assert body["data"][0]["market_dominance"] == 60.0
+
+
+def test_universe_endpoint_partial_results(upstream, client):
+    upstream.add(2)
+
+    partial = client.get(
+        "/coingecko/markets/universe?pages=2&per_page=2&on_page_error=partial")
+    strict = client.get("/coingecko/markets/universe?pages=2&per_page=2")
+
+    assert partial.status_code == 200
+    assert partial.json()["failed_pages"] == [2]
+    assert partial.json()["data"][0]["market_dominance"] == 75.0
+    assert strict.status_code == 503
+
+
+def test_stale_refresh_does_not_cache_partial_universe(upstream, client):
+    url = "/coingecko/markets/universe?pages=2&per_page=2&on_page_error=partial"
+    assert client.get(url).json()["partial"] is False
+
+    key = ("universe", "usd", 2, 2, "partial")
+    market_data_cache.get_entry(key).fresh_until = time.monotonic() - 1
+    upstream.add(2)
+    refreshes = market_data_cache.get_stats()["refreshes"]
+
+    stale = client.get(url)
+    deadline = time.monotonic() + 5
+    while (market_data_cache.get_stats()["refreshes"] == refreshes
+           and time.monotonic() < deadline):
+        time.sleep(0.01)
+    after_refresh = client.get(url)
+
+    assert stale.headers["X-Cache"] == "STALE"
+    assert market_data_cache.get_stats()["refreshes"] > refreshes
+    # The partial refresh result was not stored over the complete universe
+    assert after_refresh.headers["X-Cache"] == "STALE"
+    assert after_refresh.json()["partial"] is False
+    assert after_refresh.json()["pages_fetched"] == [1, 2]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.partitions import (
+    PARTITION_DAY,
+    PARTITION_MONTH,
+    RETENTION_DROP,
+    PartitionMaintenance,
+    create_partition_sql,
+    parse_partition_name,
+    partition_name,
+    partition_ranges,
+)
+
+
+def test_monthly_ranges_cross_year_boundary():
+    ranges = partition_ranges(
+        datetime(2024, 11, 15, 8), datetime(2025, 1, 2), PARTITION_MONTH)
+
+    assert ranges == [
+        (datetime(2024, 11, 1), datetime(2024, 12, 1)),
+        (datetime(2024, 12, 1), datetime(2025, 1, 1)),
+        (datetime(2025, 1, 1), datetime(2025, 2, 1)),
+    ]
+
+
+def test_daily_ranges():
+    ranges = partition_ranges(
+        datetime(2024, 2, 28, 23), datetime(2024, 3, 1), PARTITION_DAY)
+
+    assert [start.day for start, _ in ranges] == [28, 29, 1]
+
+
+@pytest.mark.parametrize("interval, start, name", [
+    (PARTITION_MONTH, datetime(2024, 2, 1), "coin_prices_p202402"),
+    (PARTITION_DAY, datetime(2024, 2, 20), "coin_prices_p20240220"),
+])
+def test_partition_name_round_trip(interval, start, name):
+    assert partition_name("coin_prices", start, interval) == name
+    assert parse_partition_name("coin_prices", name, interval) == start
+    assert parse_partition_name("coin_prices", "coin_prices_old", interval) is None
+
+
+def test_create_partition_sql():
+    assert create_partition_sql(
+        "coin_prices", datetime(2024, 2, 1), datetime(2024, 3, 1),
+        PARTITION_MONTH
+    ) == (
+        "CREATE TABLE IF NOT EXISTS coin_prices_p202402 PARTITION OF "
+        "coin_prices FOR VALUES FROM ('2024-02-01') TO ('2024-03-01')"
+    )
+
+
+@pytest.mark.asyncio
+async def test_maintenance_leaves_unpartitioned_database_alone():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    maintenance = PartitionMaintenance(
+        table="coin_prices", interval=PARTITION_MONTH, precreate=3,
+        retention_days=30, retention_action=RETENTION_DROP, run_interval=60,
+        engine=engine,
+    )
+    try:
+        result = await maintenance.run_once(datetime(2024, 2, 20))
+    finally:
+        await engine.dispose()
+
+    assert result == {"created": [], "removed": []}
+    assert maintenance.get_status()["failures"] == 0
+
+
+def test_partition_metrics(client):
+    response = client.get("/metrics/partitions")
+
+    assert response.status_code == 200
+    assert response.json()["table"] == "coin_prices"
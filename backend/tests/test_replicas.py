@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from sqlalchemy import text
+from starlette.requests import Request
+
+from src.core import middleware
+from src.core.middleware import READ_YOUR_WRITES_COOKIE
+from src.database import replicas
+from src.database.replicas import ReplicaRouter, get_read_db
+
+
+def _router(*urls):
+    return ReplicaRouter(list(urls), check_interval=60, check_timeout=1)
+
+
+def _request(cookie=None):
+    headers = []
+    if cookie is not None:
+        value = f"{READ_YOUR_WRITES_COOKIE}={cookie}"
+        headers.append((b"cookie", value.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+async def _read_database(request):
+    """Name of the database the session of get_read_db points at."""
+    dependency = get_read_db(request)
+    db = await anext(dependency)
+    try:
+        result = await db.execute(text("SELECT file FROM pragma_database_list"))
+        return result.scalar().rsplit("/", 1)[-1]
+    finally:
+        await dependency.aclose()
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    return [f"sqlite:///{tmp_path}/replica-{index}.db" for index in range(2)]
+
+
+@pytest.fixture
+def route_reads(monkeypatch, async_session_factory):
+    """Route get_read_db through a test router, with the test DB as primary."""
+    def install(router):
+        monkeypatch.setattr(replicas, "replica_router", router)
+        monkeypatch.setattr(replicas, "get_async_session_factory",
+                            lambda: async_session_factory)
+        return router
+    return install
+
+
+@pytest.mark.asyncio
+async def test_pick_round_robins_over_replicas_that_are_up(replica_urls):
+    router = _router(*replica_urls, replica_urls[0])
+    router.mark_down(1, RuntimeError("down"))
+
+    picks = [router.pick()[0] for _ in range(4)]
+    await router.stop()
+
+    assert picks == [0, 2, 0, 2]
+    assert router.get_status()["replicas"][1]["up"] is False
+
+
+@pytest.mark.asyncio
+async def test_check_takes_failing_replica_out_and_back(replica_urls, tmp_path):
+    router = _router(replica_urls[0], f"sqlite:///{tmp_path}/missing/x.db")
+
+    await router.check()
+    assert [r["up"] for r in router.get_status()["replicas"]] == [True, False]
+
+    (tmp_path / "missing").mkdir()
+    await router.check()
+    await router.stop()
+
+    assert [r["up"] for r in router.get_status()["replicas"]] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_read_db_uses_replica_or_falls_back_to_primary(
+    route_reads, replica_urls, tmp_path
+):
+    router = route_reads(_router(
+        replica_urls[0], f"sqlite:///{tmp_path}/missing/x.db"))
+
+    assert await _read_database(_request()) == "replica-0.db"
+    # Unreachable replica: taken out of rotation, primary used instead
+    assert await _read_database(_request()) == "test.db"
+    assert await _read_database(_request()) == "replica-0.db"
+    await router.stop()
+
+    assert router.get_status()["replicas"][1]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_db_uses_primary_within_read_your_writes_window(
+    route_reads, replica_urls
+):
+    router = route_reads(_router(replica_urls[0]))
+
+    recent_write = _request(cookie=f"{time.time() + 5:.3f}")
+    old_write = _request(cookie=f"{time.time() - 5:.3f}")
+    assert await _read_database(recent_write) == "test.db"
+    assert await _read_database(old_write) == "replica-0.db"
+    await router.stop()
+
+
+def test_writes_set_read_your_writes_cookie(client, monkeypatch):
+    monkeypatch.setattr(middleware.settings, "READ_YOUR_WRITES_WINDOW", 5.0)
+
+    response = client.post("/db/coins", json={
+        "coin_id": "test-coin",
+        "symbol": "TEST",
+        "name": "Test Coin",
+        "current_price": 100.0,
+        "market_cap": 1000000.0,
+        "market_cap_rank": 1,
+        "total_volume": 50000.0,
+        "price_change_24h": 5.0,
+        "price_change_percentage_24h": 5.0,
+        "last_updated": "2024-02-20T12:00:00+00:00"
+    })
+
+    assert float(response.cookies[READ_YOUR_WRITES_COOKIE]) > time.time()
+    read = client.get("/db/coins/test-coin")
+    assert READ_YOUR_WRITES_COOKIE not in read.cookies
@@ -0,0 +1,11 @@
+from benchmarks.startup import measure_startup
+
+
+def test_startup_loads_no_heavy_modules(monkeypatch):
+    # Neither import nor startup may need a database
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    result = measure_startup()
+
+    assert result["status"] == 200
+    assert result["heavy_modules"] == []
@@ -0,0 +1,82 @@
+import json
+
+from src.ingestion.market_data import build_market_data_payload
+from src.models import CoinMarketData, MarketDataResponse
+from src.transformers.market_data import MarketDataTransformer
+
+RAW_DATA = [
+    {
+        "id": "bitcoin",
+        "symbol": "btc",
+        "name": "Bitcoin",
+        "image": "https://example.com/btc.png",
+        "current_price": 50000,
+        "market_cap": 1000000000.5,
+        "market_cap_rank": 1,
+        "total_volume": 25000000.0,
+        "price_change_24h": -12.5,
+        "price_change_percentage_24h": None,
+        "last_updated": "2024-02-20T12:00:00.000Z",
+        "sparkline_in_7d": {"price": [1.0, 2.0]},
+    },
+    {
+        "id": "ethereum",
+        "symbol": "eth",
+        "name": "Ethereum \"Ether\"\n",
+        "current_price": 3000.25,
+        "market_cap": 300000000.0,
+        "market_cap_rank": 2,
+        "total_volume": 15000000.0,
+        "price_change_24h": 10.0,
+        "price_change_percentage_24h": 0.33,
+        "last_updated": "2024-02-20T12:00:01.000Z",
+    },
+]
+
+
+def test_fast_path_matches_pydantic_response():
+    df = MarketDataTransformer.add_market_metrics(
+        MarketDataTransformer.parse_market_data(json.dumps(RAW_DATA).encode()))
+
+    payload = build_market_data_payload(df, page=1, per_page=100)
+
+    expected = MarketDataResponse(
+        data=[
+            CoinMarketData(**record)
+            for record in MarketDataTransformer.transform_market_data(
+                RAW_DATA).to_dicts()
+        ],
+        total_count=2,
+        page=1,
+        per_page=100
+    )
+    assert MarketDataResponse.model_validate_json(payload) == expected
+
+
+def test_fast_path_keeps_unranked_coins():
+    unranked = dict(RAW_DATA[1], id="new-coin", market_cap=None,
+                    market_cap_rank=None, total_volume=None)
+    df = MarketDataTransformer.add_market_metrics(
+        MarketDataTransformer.parse_market_data(
+            json.dumps(RAW_DATA + [unranked]).encode()))
+
+    payload = build_market_data_payload(df, page=1, per_page=100)
+
+    response = MarketDataResponse.model_validate_json(payload)
+    assert response.total_count == 3
+    assert response.data[2].market_cap is None
+    assert response.data[2].market_cap_rank is None
+    assert response.data[2] == CoinMarketData(
+        **MarketDataTransformer.transform_market_data(
+            RAW_DATA + [unranked]).to_dicts()[2])
+
+
+def test_fast_path_handles_empty_page():
+    df = MarketDataTransformer.parse_market_data(b"[]")
+
+    payload = build_market_data_payload(df, page=9, per_page=100)
+
+    assert json.loads(payload) == {
+        "data": [], "total_count": 0, "page": 9, "per_page": 100,
+        "stale": False, "as_of": None
+    }
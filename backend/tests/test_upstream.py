@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.core.http_client import HTTPClientManager
+from src.core.rate_limiter import RateLimitExceeded, TokenBucket
+from src.core.upstream import UpstreamClient, parse_retry_after
+
+
+def _client(handler, max_retries=3, rate_per_minute=6000, capacity=10):
+    manager = HTTPClientManager()
+    manager.start(transport=httpx.MockTransport(handler),
+                  base_url="http://upstream")
+    return UpstreamClient(
+        client_manager=manager,
+        rate_limiter=TokenBucket(rate_per_minute, capacity),
+        max_retries=max_retries,
+        backoff_base=0.001,
+        backoff_max=0.01,
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_bucket_rejects_when_deadline_too_short():
+    bucket = TokenBucket(rate_per_minute=1, capacity=1)
+    await bucket.acquire(timeout=0)
+
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(timeout=0.01)
+    assert bucket.get_stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_short_deadline_fails_within_budget_behind_queue():
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)
+    await bucket.acquire(timeout=0)
+    queued = [asyncio.create_task(bucket.acquire(timeout=30))
+              for _ in range(3)]
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(timeout=0.5)
+    elapsed = time.monotonic() - start
+
+    for task in queued:
+        task.cancel()
+    await asyncio.gather(*queued, return_exceptions=True)
+    assert elapsed < 0.5
+    assert bucket.get_stats()["waiters"] == 0
+    # Cancelled reservations are given back
+    assert bucket.get_stats()["tokens"] > -1
+
+
+@pytest.mark.asyncio
+async def test_waiters_stay_spaced_after_pause():
+    bucket = TokenBucket(rate_per_minute=1200, capacity=2)
+    start = time.monotonic()
+    woke = []
+
+    async def waiter():
+        await bucket.acquire()
+        woke.append(time.monotonic() - start)
+
+    tasks = [asyncio.create_task(waiter()) for _ in range(8)]
+    await asyncio.sleep(0)
+    bucket.pause(0.3)
+    await asyncio.gather(*tasks)
+
+    # The burst went out before the pause, the queue is spaced 1/rate after it
+    assert woke[1] < 0.05
+    for position in range(2, 8):
+        assert woke[position] >= 0.3 + (position - 2) * 0.05
+    assert bucket.get_stats()["tokens"] < 1
+
+
+@pytest.mark.asyncio
+async def test_429_is_retried_honoring_retry_after():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json=[])
+
+    client = _client(handler)
+    response = await client.get("/coins/markets", timeout=5)
+
+    assert response.status_code == 200
+    assert len(attempts) == 3
+    stats = client.get_stats()
+    assert stats["retries"] == 2
+    assert stats["throttled_responses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_at_deadline():
+    def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "30"})
+
+    client = _client(handler)
+    response = await client.get("/coins/markets", timeout=1)
+
+    assert response.status_code == 429
+    assert client.get_stats()["retries"] == 0
+    assert client.get_stats()["retries_exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(404)
+
+    client = _client(handler)
+    response = await client.get("/coins/markets", timeout=5)
+
+    assert response.status_code == 404
+    assert len(attempts) == 1
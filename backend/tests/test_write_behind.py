@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.write_behind import DROP_NEWEST, DROP_OLDEST, WriteBehindQueue
+from src.database.models import CoinLatest, CoinPrice
+from src.database.session import get_db
+from src.ingestion import market_data
+from src.main import app
+
+
+def _queue(sink, **kwargs):
+    options = dict(name="test", sink=sink, max_size=10, batch_size=3,
+                   flush_interval=0.01, shutdown_timeout=1)
+    options.update(kwargs)
+    return WriteBehindQueue(**options)
+
+
+@pytest.mark.asyncio
+async def test_background_flush_batches_items():
+    batches = []
+
+    async def sink(batch):
+        batches.append(batch)
+
+    queue = _queue(sink)
+    queue.start()
+    for item in range(7):
+        queue.enqueue(item)
+    await asyncio.sleep(0.05)
+    await queue.stop()
+
+    assert [item for batch in batches for item in batch] == list(range(7))
+    assert max(len(batch) for batch in batches) == 3
+    stats = queue.get_stats()
+    assert stats["depth"] == 0
+    assert stats["flushed_items"] == 7
+    assert stats["last_flush_latency_ms"] is not None
+
+
+@pytest.mark.parametrize("policy, kept", [
+    (DROP_OLDEST, [2, 3, 4]),
+    (DROP_NEWEST, [0, 1, 2]),
+])
+def test_full_queue_applies_drop_policy(policy, kept):
+    async def sink(batch):
+        pass
+
+    queue = _queue(sink, max_size=3, drop_policy=policy)
+    accepted = [queue.enqueue(item) for item in range(5)]
+
+    assert list(queue._items) == kept
+    assert queue.dropped == 2
+    assert accepted == [True] * 3 + [policy == DROP_OLDEST] * 2
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_items_and_counts_failures():
+    batches = []
+
+    async def sink(batch):
+        if 0 in batch:
+            raise RuntimeError("db down")
+        batches.append(batch)
+
+    queue = _queue(sink, flush_interval=60)
+    queue.start()
+    for item in range(5):
+        queue.enqueue(item)
+    await queue.stop()
+
+    assert batches == [[3, 4]]
+    assert queue.flush_errors == 1
+    assert queue.failed_items == 3
+    assert queue.depth == 0
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    """
+    Store market data through coin_price_writer, as by default.
+
+    Request it before ``client`` so the app lifespan starts the writer. The
+    flush interval is long enough that rows only reach the database when
+    the queue is flushed or stopped.
+    """
+    monkeypatch.setattr(market_data.settings, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(market_data.coin_price_writer, "flush_interval", 60)
+    monkeypatch.setattr(market_data.coin_price_writer, "batch_size", 10)
+
+
+def test_markets_enqueues_rows_for_background_insert(
+    write_behind, fake_coingecko, client, db_session
+):
+    flushed = market_data.coin_price_writer.flushed_items
+
+    response = client.get("/coingecko/markets", params={"per_page": 5})
+
+    assert response.status_code == 200
+    assert market_data.coin_price_writer.is_running
+    assert market_data.coin_price_writer.depth == 1
+    assert db_session.query(CoinPrice).count() == 0
+
+    client.portal.call(market_data.coin_price_writer.flush)
+
+    assert db_session.query(CoinPrice).count() == 5
+    stored = client.get("/coingecko/stored-data").json()["data"]
+    assert [coin["coin_id"] for coin in stored] == [
+        coin["id"] for coin in response.json()["data"]]
+    stats = client.get("/metrics/write-behind").json()
+    assert stats["flushed_items"] == flushed + 1
+    assert stats["depth"] == 0
+
+
+def test_shutdown_flushes_pending_rows(
+    write_behind, fake_coingecko, async_session_factory, db_session,
+    monkeypatch
+):
+    # Like the client fixture, but the app is shut down within the test
+    monkeypatch.setattr(
+        market_data, "get_async_session_factory", lambda: async_session_factory)
+
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    with TestClient(app) as client:
+        response = client.get("/coingecko/markets", params={"per_page": 5})
+        assert response.status_code == 200
+        assert market_data.coin_price_writer.depth == 1
+        assert db_session.query(CoinPrice).count() == 0
+
+    assert not market_data.coin_price_writer.is_running
+    assert market_data.coin_price_writer.depth == 0
+    assert db_session.query(CoinPrice).count() == 5
+    assert db_session.query(CoinLatest).count() == 5